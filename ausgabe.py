@@ -0,0 +1,234 @@
+# ausgabe.py
+import json
+import os
+
+from docx import Document
+from docx.shared import RGBColor
+
+from utils import max_seiten_pro_word_datei, output_txt_file
+
+
+def ausgaben_erstellen(formate, output_dir, highlight=False):
+    """Legt die Schreiber für den kompletten Scan an (alle mit seite_beginnen/zeile/fundstelle/seite_beenden/schliessen)."""
+    ausgaben = []
+    if "docx" in formate:
+        ausgaben.append(WordAusgabe(output_dir, highlight))
+    if "txt" in formate:
+        ausgaben.append(TextAusgabe(output_dir))
+    if "jsonl" in formate:
+        ausgaben.append(JsonlAusgabe(output_dir))
+    return ausgaben
+
+
+def sichere_datei_speichern(doc, dateiname, output_dir):
+    base_name = os.path.splitext(dateiname)[0]
+    ext = ".docx"
+    full_path = os.path.join(output_dir, dateiname)
+    counter = 1
+    while True:
+        try:
+            doc.save(full_path)
+            return full_path
+        except PermissionError:
+            full_path = os.path.join(output_dir, f"{base_name}_{counter}{ext}")
+            counter += 1
+        except Exception as e:
+            print(f"[!] Fehler beim Speichern von {full_path}: {e}")
+            return None
+
+
+def bereiche_zusammenfassen(fundstellen):
+    """
+    Fasst alle Fundstellen einer Zeile (alle Begriffe, alle Vorkommen) zu sortierten,
+    überschneidungsfreien Bereichen zusammen; angrenzende Bereiche werden verbunden.
+    """
+    bereiche = []
+    for start_idx, ende_idx, *_ in sorted(fundstellen):
+        if bereiche and start_idx <= bereiche[-1][1]:
+            if ende_idx > bereiche[-1][1]:
+                bereiche[-1][1] = ende_idx
+        else:
+            bereiche.append([start_idx, ende_idx])
+    return [tuple(b) for b in bereiche]
+
+
+# ---------- Kompletter Scan als Word (in Teilen) ----------
+class WordAusgabe:
+    """
+    Schreibt den kompletten Scan als ocr_ausgabe_1.docx, ocr_ausgabe_2.docx, ...
+    - nach max_seiten Seiten wird der Teil sofort gespeichert und aus dem Speicher entfernt
+    - der Speicherbedarf hängt so nur von max_seiten ab, nicht von der Größe des Stapels
+    """
+
+    def __init__(self, output_dir, highlight=False, max_seiten=max_seiten_pro_word_datei):
+        self.output_dir = output_dir
+        self.highlight = highlight
+        self.max_seiten = max(1, max_seiten)
+        self.doc = None
+        self.seiten = 0
+        self.teil = 0
+        self.dateien = []
+
+    def seite_beginnen(self, datei, seite):
+        if self.doc is None:
+            self.doc = Document()
+            self.seiten = 0
+            self.teil += 1
+        elif self.doc.paragraphs:
+            self.doc.add_page_break()
+        self.doc.add_heading(os.path.basename(datei), level=1)
+
+    def zeile(self, line, fundstellen=(), treffer=()):
+        """fundstellen: [(start, ende, index_des_begriffs), ...] in line"""
+        if not self.highlight or not fundstellen:
+            self.doc.add_paragraph(line)
+            return
+        # Absatz einmal aufbauen: je Abschnitt ohne/mit Treffer genau ein Run
+        p = self.doc.add_paragraph()
+        pos = 0
+        for start_idx, ende_idx in bereiche_zusammenfassen(fundstellen):
+            if start_idx > pos:
+                p.add_run(line[pos:start_idx])
+            run = p.add_run(line[start_idx:ende_idx])
+            run.font.color.rgb = RGBColor(255, 0, 0)
+            pos = ende_idx
+        if pos < len(line):
+            p.add_run(line[pos:])
+
+    def fundstelle(self, eintrag):
+        pass  # die Trefferliste speichert starte_ocr als ocr_treffer.docx
+
+    def seite_beenden(self):
+        self.seiten += 1
+        if self.seiten >= self.max_seiten:
+            self._speichern()
+
+    def _speichern(self):
+        if self.doc is not None and self.doc.paragraphs:
+            gespeichert = sichere_datei_speichern(self.doc, f"ocr_ausgabe_{self.teil}.docx", self.output_dir)
+            if gespeichert:
+                self.dateien.append(gespeichert)
+        self.doc = None
+
+    def schliessen(self):
+        self._speichern()
+        return self.dateien
+
+
+# ---------- Kompletter Scan als Text / JSONL (zeilenweise) ----------
+class TextAusgabe:
+    """
+    Schreibt den erkannten Text fortlaufend nach ocr_ausgabe.txt und die Trefferzeilen
+    nach treffer_ausgabe.txt; nach jeder Seite wird auf die Platte geschrieben.
+    """
+
+    def __init__(self, output_dir):
+        self.pfad = os.path.join(output_dir, "ocr_ausgabe.txt")
+        self.treffer_pfad = os.path.join(output_dir, output_txt_file)
+        self.f = open(self.pfad, "w", encoding="utf-8")
+        self.treffer_f = open(self.treffer_pfad, "w", encoding="utf-8")
+        self.dateien = [self.pfad, self.treffer_pfad]
+
+    def seite_beginnen(self, datei, seite):
+        self.f.write(f"=== {os.path.basename(datei)} – Seite {seite} ===\n")
+
+    def zeile(self, line, fundstellen=(), treffer=()):
+        self.f.write(line + "\n")
+
+    def fundstelle(self, eintrag):
+        self.treffer_f.write(eintrag + "\n")
+
+    def seite_beenden(self):
+        self.f.flush()
+        self.treffer_f.flush()
+
+    def schliessen(self):
+        self.f.close()
+        self.treffer_f.close()
+        return self.dateien
+
+
+class JsonlAusgabe:
+    """
+    Schreibt je Textzeile ein JSON-Objekt nach ocr_ausgabe.jsonl:
+    {"datei": ..., "seite": 1, "zeile": 3, "text": ..., "treffer": [...]}
+    Zum Weiterverarbeiten mit Skripten, auch während der Lauf noch läuft.
+    """
+
+    def __init__(self, output_dir):
+        self.pfad = os.path.join(output_dir, "ocr_ausgabe.jsonl")
+        self.f = open(self.pfad, "w", encoding="utf-8")
+        self.datei = None
+        self.seite = None
+        self.nr = 0
+
+    def seite_beginnen(self, datei, seite):
+        self.datei, self.seite, self.nr = datei, seite, 0
+
+    def zeile(self, line, fundstellen=(), treffer=()):
+        self.nr += 1
+        eintrag = {"datei": self.datei, "seite": self.seite, "zeile": self.nr, "text": line}
+        if treffer:
+            eintrag["treffer"] = treffer
+        self.f.write(json.dumps(eintrag, ensure_ascii=False) + "\n")
+
+    def fundstelle(self, eintrag):
+        pass  # Treffer stehen schon in der jeweiligen Zeile
+
+    def seite_beenden(self):
+        self.f.flush()
+
+    def schliessen(self):
+        self.f.close()
+        return [self.pfad]
+
+
+# ---------- Trefferpositionen und Ausschnitte ----------
+class TrefferPositionen:
+    """
+    Schreibt je Trefferzeile ein JSON-Objekt nach ocr_treffer.jsonl:
+    {"datei": ..., "seite": 3, "zeile": 12, "text": ..., "treffer": [{"begriff", "start", "ende", "box", "konfidenz"}]}
+    box = [x0, y0, x1, y1] in Pixeln der Seite (PDF: bei pdf_dpi), None ohne Wortpositionen.
+    Mit ausschnitte=True wird je Fundstelle ein Bildausschnitt nach treffer_ausschnitte/ gespeichert.
+    """
+    rand = 20  # Pixel rund um den Treffer
+
+    def __init__(self, output_dir, ausschnitte=False):
+        self.pfad = os.path.join(output_dir, "ocr_treffer.jsonl")
+        self.f = open(self.pfad, "w", encoding="utf-8")
+        self.ausschnitt_ordner = os.path.join(output_dir, "treffer_ausschnitte") if ausschnitte else None
+        if self.ausschnitt_ordner:
+            os.makedirs(self.ausschnitt_ordner, exist_ok=True)
+
+    def zeile(self, name, datei, seite, zeile_nr, line, treffer, seitenbild=None):
+        """
+        treffer: Liste von Dicts wie oben; seitenbild: Funktion, die das Seitenbild liefert
+        (wird nur aufgerufen, wenn wirklich ein Ausschnitt gespeichert wird).
+        """
+        for n, t in enumerate(treffer, start=1):
+            if self.ausschnitt_ordner and t["box"] and seitenbild:
+                bild = seitenbild()
+                if bild is not None:
+                    dateiname = f"{os.path.splitext(name)[0]}_z{zeile_nr}_{n}.png"
+                    t["ausschnitt"] = self.ausschnitt_speichern(bild, t["box"], dateiname)
+        eintrag = {"datei": datei, "seite": seite, "zeile": zeile_nr, "text": line, "treffer": treffer}
+        self.f.write(json.dumps(eintrag, ensure_ascii=False) + "\n")
+
+    def ausschnitt_speichern(self, bild, box, dateiname):
+        x0, y0, x1, y1 = box
+        rahmen = (max(0, x0 - self.rand), max(0, y0 - self.rand),
+                  min(bild.width, x1 + self.rand), min(bild.height, y1 + self.rand))
+        pfad = os.path.join(self.ausschnitt_ordner, dateiname)
+        try:
+            bild.crop(rahmen).save(pfad)
+        except Exception as e:
+            print(f"[!] Ausschnitt konnte nicht gespeichert werden: {pfad}: {e}")
+            return None
+        return pfad
+
+    def seite_beenden(self):
+        self.f.flush()
+
+    def schliessen(self):
+        self.f.close()
+        return [self.pfad]
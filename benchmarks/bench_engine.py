@@ -0,0 +1,80 @@
+# benchmarks/bench_engine.py
+"""
+Latenz pro Seite: pytesseract (ein tesseract-Prozess je Seite) gegen tesserocr (API bleibt offen).
+Beide Engines erkennen dieselben synthetischen Seiten; die erste Seite enthält das Laden des Modells.
+Aufruf: python benchmarks/bench_engine.py [--seiten 20] [--sprache deu]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+import ocr_engine  # setzt den Tesseract-Pfad
+from ocr_backend import PytesseractEngine, TesserocrEngine
+
+TEXT = ("Im Jahre des Herrn wurde dem Bauern Johann Müller ein Sohn geboren und am "
+        "folgenden Sonntag in der Kirche zu Hohenstein getauft. Pate war der Schmied.")
+
+
+def seite_erzeugen(nummer, breite=2480, hoehe=3508):
+    # A4 bei 300 dpi, Fließtext in mehreren Zeilen
+    bild = Image.new("L", (breite, hoehe), 255)
+    zeichnen = ImageDraw.Draw(bild)
+    try:
+        schrift = ImageFont.truetype("DejaVuSans.ttf", 42)
+    except OSError:
+        schrift = ImageFont.load_default()
+    y = 200
+    for zeile in range(40):
+        zeichnen.text((180, y), f"{nummer}.{zeile} {TEXT[(zeile * 7) % 40:][:70]}", fill=0, font=schrift)
+        y += 80
+    return bild
+
+
+def messen(engine, seiten, sprache):
+    latenzen = []
+    for bild in seiten:
+        start = time.perf_counter()
+        engine.text(bild.copy(), sprache)
+        latenzen.append(time.perf_counter() - start)
+    return latenzen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seiten", type=int, default=20)
+    parser.add_argument("--sprache", default="deu")
+    args = parser.parse_args()
+
+    engines = []
+    if ocr_engine.tesseract_version("pytesseract") != "unbekannt":
+        engines.append(PytesseractEngine())
+    else:
+        print("[!] Tesseract nicht gefunden, pytesseract wird übersprungen.")
+    try:
+        engines.append(TesserocrEngine(ocr_engine.tessdata_pfad))
+    except ImportError:
+        print("[!] tesserocr ist nicht installiert" + (", es wird nur pytesseract gemessen." if engines else "."))
+    if not engines:
+        print("[!] Keine OCR-Engine verfügbar, Messung übersprungen.")
+        return
+
+    seiten = [seite_erzeugen(i) for i in range(args.seiten)]
+
+    print(f"{'Engine':<12} | {'1. Seite':>9} | {'Mittel':>8} | {'p50':>8} | {'p95':>8} | Seiten/s")
+    for engine in engines:
+        latenzen = messen(engine, seiten, args.sprache)
+        rest = latenzen[1:] or latenzen
+        p95 = sorted(rest)[max(0, int(len(rest) * 0.95) - 1)]
+        print(f"{engine.name:<12} | {latenzen[0] * 1000:>6.0f} ms | {statistics.mean(rest) * 1000:>5.0f} ms | "
+              f"{statistics.median(rest) * 1000:>5.0f} ms | {p95 * 1000:>5.0f} ms | {len(latenzen) / sum(latenzen):.2f}")
+        engine.schliessen()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_matcher.py
+"""
+Micro-Benchmark: ist_treffer (Teilstring-Suche je Begriff) gegen StichwortMatcher (Aho-Corasick).
+Aufruf: python benchmarks/bench_matcher.py [--zeilen 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ist_treffer, StichwortMatcher
+
+# Fließtext wie in Kirchenbüchern, Suchbegriffe wie aus einem Namensregister
+WOERTER = ["den", "der", "die", "und", "ist", "geboren", "getauft", "gestorben", "Sohn", "Tochter",
+           "des", "Bauern", "Tagelöhners", "Ehefrau", "Jahre", "alt", "im", "Monat", "Januar",
+           "April", "Pate", "war", "zu", "in", "dem", "Dorfe", "Kirche", "begraben", "am", "Tage"]
+SILBEN = ["ber", "ger", "mann", "mül", "ler", "schmi", "dt", "hof", "stein", "wald",
+          "kirch", "bach", "au", "el", "ri", "ch", "ter", "er", "an", "ka", "tha", "rina"]
+
+
+def zufallswort(rng):
+    return "".join(rng.choice(SILBEN) for _ in range(rng.randint(2, 4)))
+
+
+def zeilen_erzeugen(anzahl, rng, namen, namensanteil=0.05):
+    zeilen = []
+    for _ in range(anzahl):
+        woerter = [rng.choice(WOERTER) for _ in range(rng.randint(6, 12))]
+        if rng.random() < namensanteil:
+            woerter.insert(rng.randrange(len(woerter)), rng.choice(namen).capitalize())
+        zeilen.append(" ".join(woerter))
+    return zeilen
+
+
+def messen(funktion, zeilen):
+    start = time.perf_counter()
+    treffer = 0
+    for zeile in zeilen:
+        if funktion(zeile):
+            treffer += 1
+    return time.perf_counter() - start, treffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--zeilen", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    namen = sorted({zufallswort(rng) for _ in range(5000)})
+
+    print(f"{'Begriffe':>8} | {'ist_treffer':>12} | {'Matcher':>12} | {'Aufbau':>9} | {'Faktor':>6} | Trefferzeilen")
+    for anzahl in (10, 100, 1000):
+        begriffe = rng.sample(namen, anzahl)
+        zeilen = zeilen_erzeugen(args.zeilen, rng, begriffe)
+
+        dauer_alt, treffer_alt = messen(lambda z: ist_treffer(z, begriffe), zeilen)
+
+        start = time.perf_counter()
+        matcher = StichwortMatcher(begriffe)
+        aufbau = time.perf_counter() - start
+        dauer_neu, treffer_neu = messen(matcher.treffer, zeilen)
+
+        if treffer_alt != treffer_neu:
+            raise SystemExit(f"[!] Abweichende Ergebnisse bei {anzahl} Begriffen: {treffer_alt} ≠ {treffer_neu}")
+
+        print(f"{anzahl:>8} | {dauer_alt * 1000:>9.1f} ms | {dauer_neu * 1000:>9.1f} ms | "
+              f"{aufbau * 1000:>6.1f} ms | {dauer_alt / dauer_neu:>5.1f}x | {treffer_neu}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+# benchmarks/bench_pipeline.py
+"""
+Reproduzierbarer Benchmark der OCR-Pipeline auf synthetischen Seiten.
+- erzeugt deutsche Seiten (Antiqua) und Fraktur-artige Seiten (langes ſ; echte Frakturschrift
+  mit --fraktur-schrift) mit Rauschen, Schräglage und verschiedenen Auflösungen (200–400 dpi)
+- Namen aus einem Register stehen an bekannten Stellen: daraus Trefferquote (Recall) und
+  Anteil der Treffer, deren Wortrahmen an der richtigen Stelle liegt
+- misst die Einzelstufen (pdf_seiten, preprocess_pillow, preprocess_opencv, Pipelines,
+  ist_treffer, StichwortMatcher, Word-Ausgabe) und starte_ocr als Ganzes
+- Durchsatz, Latenz-Perzentile, Speicher (tracemalloc: Python- und NumPy-Allokationen, Pillow-interne
+  Puffer zählen nicht; für starte_ocr der Spitzen-RSS aus dem Laufbericht)
+- Vergleich mit einer gespeicherten Baseline (Median je Stufe und Recall); Exit-Code 1 bei Verschlechterung
+- die Baseline (Standard: benchmarks/baseline.json) einmal je Maschine mit Tesseract über
+  --baseline-speichern anlegen; Zeiten werden nur auf gleicher Umgebung (System, CPUs, Tesseract)
+  verglichen, sonst nur der Recall
+Aufruf: python benchmarks/bench_pipeline.py [--seiten 8] [--seed 1] [--baseline-speichern] [--toleranz 0.5]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import ocr_engine
+from ausgabe import WordAusgabe
+from utils import ist_treffer, StichwortMatcher, preprocess_pillow, preprocess_opencv, preprocess_pipeline
+
+baseline_standard = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Fließtext wie in Kirchenbüchern; die Namen sind die Suchbegriffe und werden gezielt platziert
+WOERTER = ["den", "der", "die", "und", "ist", "geboren", "getauft", "gestorben", "Sohn", "Tochter",
+           "des", "Bauern", "Tagelöhners", "Ehefrau", "Jahre", "alt", "im", "Monat", "Januar",
+           "April", "Pate", "war", "zu", "in", "dem", "Dorfe", "Kirche", "begraben", "am", "Tage",
+           "Schneiders", "Wittwe", "Gemeinde", "Hause", "Vater", "Mutter", "Zeugen", "selbigen"]
+NAMEN = ["müller", "schmidt", "becker", "hoffmann", "wagner", "krüger", "lehmann", "köhler",
+         "zimmermann", "braun", "hartmann", "fuchs"]
+SILBEN = ["ber", "ger", "mann", "mül", "ler", "schmi", "dt", "hof", "stein", "wald",
+          "kirch", "bach", "au", "el", "ri", "ch", "ter", "er", "an", "ka", "tha", "rina"]
+
+# (Schriftart, dpi) reihum je Seite
+SEITENARTEN = [("antiqua", 300), ("fraktur", 300), ("antiqua", 200), ("fraktur", 400)]
+FRAKTUR_SCHRIFTEN = ["UnifrakturMaguntia.ttf", "UnifrakturCook.ttf", "DejaVuSerif.ttf"]
+
+
+# ---------- Synthetische Seiten ----------
+def schrift_laden(namen, groesse):
+    for name in namen:
+        try:
+            return ImageFont.truetype(name, groesse)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def lang_s(text):
+    # ſ im Wortinneren und -anfang, rundes s am Wortende (wie im Fraktursatz)
+    return re.sub(r"s(?=\w)", "ſ", text)
+
+
+def drehen_punkt(x, y, winkel, mitte):
+    # Punkt so drehen wie Image.rotate(winkel) (gegen den Uhrzeigersinn, um die Bildmitte)
+    a = math.radians(winkel)
+    dx, dy = x - mitte[0], y - mitte[1]
+    return (mitte[0] + dx * math.cos(a) + dy * math.sin(a),
+            mitte[1] - dx * math.sin(a) + dy * math.cos(a))
+
+
+def seite_erzeugen(art, dpi, rng, np_rng, fraktur_schrift=None):
+    """
+    A4-Seite bei `dpi` mit 12-pt-Text. Liefert (Bild, Zeilen, platzierte Namen als
+    [(name, (x0, y0, x1, y1))] in Pixeln nach Schräglage).
+    """
+    breite, hoehe = int(8.27 * dpi), int(11.69 * dpi)
+    groesse = int(dpi * 12 / 72)
+    schriften = [fraktur_schrift] + FRAKTUR_SCHRIFTEN if art == "fraktur" and fraktur_schrift else \
+        FRAKTUR_SCHRIFTEN if art == "fraktur" else ["DejaVuSans.ttf"]
+    schrift = schrift_laden(schriften, groesse)
+
+    bild = Image.new("L", (breite, hoehe), 255)
+    zeichnen = ImageDraw.Draw(bild)
+    rand, y = int(dpi * 0.8), int(dpi * 0.9)
+    zeilen, namen = [], []
+    while y + groesse * 2 < hoehe - dpi * 0.9:
+        woerter = [rng.choice(WOERTER) for _ in range(rng.randint(5, 8))]
+        if art == "fraktur":
+            woerter = [lang_s(w) for w in woerter]
+        name = None
+        if rng.random() < 0.35:
+            # Namen ohne ſ, damit der Suchbegriff bei fehlerfreier Erkennung passt
+            name = rng.choice(NAMEN).capitalize()
+            woerter.insert(rng.randrange(len(woerter) + 1), name)
+        zeile = " ".join(woerter)
+        zeichnen.text((rand, y), zeile, fill=0, font=schrift)
+        if name:
+            x = rand + zeichnen.textlength(zeile[:zeile.index(name)], font=schrift)
+            namen.append((name.lower(), zeichnen.textbbox((x, y), name, font=schrift)))
+        zeilen.append(zeile)
+        y += int(groesse * 1.7)
+
+    # Schräglage wie beim Scannen, die Namensrahmen wandern mit
+    winkel = rng.uniform(-1.5, 1.5)
+    bild = bild.rotate(winkel, resample=Image.BICUBIC, fillcolor=255)
+    mitte = (breite / 2, hoehe / 2)
+    gedreht = []
+    for name, (x0, y0, x1, y1) in namen:
+        ecken = [drehen_punkt(x, y, winkel, mitte) for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))]
+        xs, ys = [e[0] for e in ecken], [e[1] for e in ecken]
+        gedreht.append((name, (min(xs), min(ys), max(xs), max(ys))))
+
+    # Rauschen: leichtes Grundrauschen plus Staub (Salz und Pfeffer)
+    a = np.asarray(bild, dtype=np.float32) + np_rng.normal(0, 10, (hoehe, breite))
+    staub = np_rng.random((hoehe, breite))
+    anteil = rng.uniform(0.001, 0.006)
+    a[staub < anteil / 2] = 0
+    a[staub > 1 - anteil / 2] = 255
+    bild = Image.fromarray(np.clip(a, 0, 255).astype(np.uint8))
+    return bild, zeilen, gedreht
+
+
+def seiten_erzeugen(anzahl, seed, ordner, fraktur_schrift=None):
+    rng, np_rng = random.Random(seed), np.random.default_rng(seed)
+    seiten = []
+    for i in range(anzahl):
+        art, dpi = SEITENARTEN[i % len(SEITENARTEN)]
+        bild, zeilen, namen = seite_erzeugen(art, dpi, rng, np_rng, fraktur_schrift)
+        pfad = os.path.join(ordner, f"seite_{i + 1:03d}_{art}_{dpi}.png")
+        bild.save(pfad, dpi=(dpi, dpi), compress_level=1)  # verrauschte Seiten komprimieren schlecht
+        seiten.append({"pfad": pfad, "art": art, "dpi": dpi, "bild": bild, "zeilen": zeilen, "namen": namen})
+    return seiten
+
+
+# ---------- Messen ----------
+def perzentil(werte, p):
+    werte = sorted(werte)
+    return werte[min(len(werte) - 1, max(0, math.ceil(p / 100 * len(werte)) - 1))]
+
+
+def kennzahlen(latenzen, einheiten, speicher_mb):
+    gesamt = sum(latenzen)
+    return {
+        "n": len(latenzen),
+        "p50_ms": round(perzentil(latenzen, 50) * 1000, 4),
+        "p95_ms": round(perzentil(latenzen, 95) * 1000, 4),
+        "max_ms": round(max(latenzen) * 1000, 4),
+        "pro_s": round(einheiten / gesamt, 2) if gesamt else None,
+        "speicher_mb": speicher_mb,
+    }
+
+
+def streuung(runden):
+    """Spannweite der Mediane einzelner Durchgänge relativ zu deren Median: das Rauschen der Messung."""
+    mediane = [perzentil(r, 50) for r in runden if r]
+    if len(mediane) < 2 or not perzentil(mediane, 50):
+        return None
+    return round((max(mediane) - min(mediane)) / perzentil(mediane, 50), 3)
+
+
+def stufe_messen(funktion, eingaben, wiederholungen=1, einheiten_je_aufruf=1, schleifen=1):
+    """
+    Latenz je Aufruf ohne tracemalloc (verfälscht reinen Python-Code), danach ein Aufruf für den Spitzenspeicher.
+    Jeder der `wiederholungen` Durchgänge ruft alle Eingaben `schleifen`-mal auf (für sehr schnelle Stufen).
+    """
+    funktion(eingaben[0])  # Aufwärmen (Importe, Caches)
+    runden = []
+    for _ in range(wiederholungen):
+        runde = []
+        for _ in range(schleifen):
+            for eingabe in eingaben:
+                start = time.perf_counter()
+                funktion(eingabe)
+                runde.append(time.perf_counter() - start)
+        runden.append(runde)
+    tracemalloc.start()
+    funktion(eingaben[0])
+    spitze = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    latenzen = [l for runde in runden for l in runde]
+    werte = kennzahlen(latenzen, len(latenzen) * einheiten_je_aufruf, round(spitze / 2 ** 20, 1))
+    werte["streuung"] = streuung(runden)
+    return werte
+
+
+def einzelstufen(seiten, begriffe, ordner, wiederholungen):
+    ergebnisse = {}
+    bilder = [s["bild"] for s in seiten]
+    seitenzeilen = [s["zeilen"] for s in seiten]
+
+    pdf_pfad = os.path.join(ordner, "seiten.pdf")
+    bilder[0].save(pdf_pfad, save_all=True, append_images=bilder[1:], resolution=300)
+    try:
+        latenzen, start = [], time.perf_counter()
+        for _ in ocr_engine.pdf_seiten(pdf_pfad):
+            latenzen.append(time.perf_counter() - start)
+            start = time.perf_counter()
+        ergebnisse["pdf_seiten"] = kennzahlen(latenzen, len(latenzen), None)
+    except Exception as e:
+        print(f"[!] pdf_seiten übersprungen (Poppler?): {e}")
+
+    ergebnisse["preprocess_pillow"] = stufe_messen(preprocess_pillow, bilder, wiederholungen)
+    try:
+        ergebnisse["preprocess_opencv"] = stufe_messen(preprocess_opencv, bilder, wiederholungen)
+    except Exception as e:
+        print(f"[!] preprocess_opencv übersprungen: {e}")
+    for optimierung in ("pillow", "opencv", "kombiniert"):
+        ergebnisse[f"pipeline_{optimierung}"] = stufe_messen(
+            lambda b: preprocess_pipeline(b, optimierung), bilder, wiederholungen)
+
+    matcher = StichwortMatcher(begriffe)
+    zeilen_je_seite = sum(map(len, seitenzeilen)) / len(seitenzeilen)
+    ergebnisse["ist_treffer"] = stufe_messen(
+        lambda zeilen: [ist_treffer(z, begriffe) for z in zeilen], seitenzeilen, wiederholungen, schleifen=100)
+    ergebnisse["stichwort_matcher"] = stufe_messen(
+        lambda zeilen: [matcher.finde(z) for z in zeilen], seitenzeilen, wiederholungen, schleifen=100)
+    for name in ("ist_treffer", "stichwort_matcher"):
+        ergebnisse[name]["zeilen_pro_s"] = round(ergebnisse[name]["pro_s"] * zeilen_je_seite)
+
+    def word_schreiben(alle_zeilen):
+        ausgabe = WordAusgabe(os.path.join(ordner, "docx"), highlight=True)
+        for nr, zeilen in enumerate(alle_zeilen, start=1):
+            ausgabe.seite_beginnen("bench.pdf", nr)
+            for zeile in zeilen:
+                funde = matcher.finde(zeile)
+                ausgabe.zeile(zeile, funde, matcher.begriffe(funde))
+            ausgabe.seite_beenden()
+        ausgabe.schliessen()
+
+    os.makedirs(os.path.join(ordner, "docx"), exist_ok=True)
+    ergebnisse["word_ausgabe"] = stufe_messen(word_schreiben, [seitenzeilen], wiederholungen,
+                                              einheiten_je_aufruf=len(seitenzeilen), schleifen=5)
+    return ergebnisse
+
+
+# ---------- Kompletter Lauf mit Trefferquote ----------
+def sprache_verfuegbar(sprache):
+    try:
+        return sprache in ocr_engine.pytesseract.get_languages(config="")
+    except Exception:
+        return False
+
+
+def gesamtlauf(seiten, begriffe, ordner, sprachen, optimierung, worker, engine):
+    """starte_ocr je Schriftart; Recall und Lage der Wortrahmen gegen die platzierten Namen."""
+    ergebnisse, recall = {}, {}
+    for art, sprache in sprachen.items():
+        auswahl = [s for s in seiten if s["art"] == art]
+        if not auswahl:
+            continue
+        if not sprache_verfuegbar(sprache):
+            print(f"[!] Sprachmodell {sprache} fehlt, {art} wird mit deu erkannt.")
+            sprache = "deu"
+        ausgabe_ordner = os.path.join(ordner, f"lauf_{art}")
+        ocr_engine.starte_ocr(
+            [s["pfad"] for s in auswahl], begriffe, sprache, optimierung=optimierung,
+            output_dir=ausgabe_ordner, worker=worker, cache=False, index=False, journal=False,
+            positionen=True, engine=engine, kaskade=False,
+        )
+        with open(os.path.join(ausgabe_ordner, "ocr_laufbericht.json"), encoding="utf-8") as f:
+            bericht = json.load(f)
+        latenzen = [sum(s["zeiten"].values()) for s in bericht["seiten_details"]] or [0.0]
+        werte = kennzahlen(latenzen, len(latenzen), bericht["speicher_mb"].get("prozess"))
+        werte["pro_s"] = bericht["seiten_pro_s"]
+        werte["fehler"] = bericht["zaehler"].get("fehler", 0)
+        ergebnisse[f"starte_ocr_{art}"] = werte
+
+        gefunden = {}
+        with open(os.path.join(ausgabe_ordner, "ocr_treffer.jsonl"), encoding="utf-8") as f:
+            for eintrag in map(json.loads, f):
+                for t in eintrag["treffer"]:
+                    gefunden.setdefault((eintrag["datei"], t["begriff"]), []).append(t["box"])
+        erwartet = treffer = boxen_gesamt = an_stelle = 0
+        for s in auswahl:
+            for name in set(n for n, _ in s["namen"]):
+                rahmen = [r for n, r in s["namen"] if n == name]
+                boxen = gefunden.get((s["pfad"], name), [])
+                erwartet += len(rahmen)
+                treffer += min(len(rahmen), len(boxen))
+                boxen_gesamt += len(boxen)
+                an_stelle += sum(1 for b in boxen if b and any(
+                    r[0] - 10 <= (b[0] + b[2]) / 2 <= r[2] + 10 and r[1] - 10 <= (b[1] + b[3]) / 2 <= r[3] + 10
+                    for r in rahmen))
+        recall[art] = {"recall": round(treffer / erwartet, 3) if erwartet else None,
+                       "an_stelle": round(an_stelle / boxen_gesamt, 3) if boxen_gesamt else None,
+                       "erwartet": erwartet}
+    return ergebnisse, recall
+
+
+# ---------- Baseline ----------
+def vergleichen(ergebnis, baseline, toleranz, zeiten=True):
+    """
+    Liefert Meldungen zu Stufen, die langsamer geworden sind oder weniger finden.
+    - verglichen wird der Median (p50); Mittelwert und p95 schwanken mit einzelnen Ausreißern zu stark
+    - die Toleranz ist mindestens so weit wie die gemessene Streuung der Baseline und des neuen Laufs
+    - mit zeiten=False (andere Umgebung als die Baseline) nur der Recall
+    """
+    meldungen = []
+    for stufe, werte in ergebnis["stufen"].items() if zeiten else ():
+        alt = baseline.get("stufen", {}).get(stufe)
+        if not alt or not alt.get("p50_ms"):
+            continue
+        grenze = max(toleranz, alt.get("streuung") or 0, werte.get("streuung") or 0)
+        if werte["p50_ms"] > alt["p50_ms"] * (1 + grenze):
+            meldungen.append(f"{stufe}: p50 {werte['p50_ms']} ms statt {alt['p50_ms']} ms (Toleranz {grenze:.0%})")
+    for art, werte in ergebnis["recall"].items():
+        alt = baseline.get("recall", {}).get(art, {}).get("recall")
+        if alt is not None and werte["recall"] is not None and werte["recall"] < alt - 0.02:
+            meldungen.append(f"Recall {art}: {werte['recall']} statt {alt}")
+    return meldungen
+
+
+def tabelle(ergebnis, baseline):
+    print(f"{'Stufe':<22} | {'n':>4} | {'p50 ms':>9} | {'p95 ms':>9} | {'pro s':>9} | {'MB':>7} | "
+          f"{'Streuung':>8} | Δ p50")
+    for stufe, w in ergebnis["stufen"].items():
+        alt = baseline.get("stufen", {}).get(stufe, {}) if baseline else {}
+        delta = f"{(w['p50_ms'] / alt['p50_ms'] - 1) * 100:+.0f} %" if alt.get("p50_ms") else ""
+        mb = "" if w["speicher_mb"] is None else f"{w['speicher_mb']:.1f}"
+        streu = "" if w.get("streuung") is None else f"{w['streuung']:.0%}"
+        print(f"{stufe:<22} | {w['n']:>4} | {w['p50_ms']:>9.2f} | {w['p95_ms']:>9.2f} | "
+              f"{w['pro_s'] or 0:>9.2f} | {mb:>7} | {streu:>8} | {delta}")
+    for art, w in ergebnis["recall"].items():
+        print(f"Recall {art}: {w['recall']} ({w['erwartet']} Namen), Wortrahmen an der richtigen Stelle: {w['an_stelle']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seiten", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--wiederholungen", type=int, default=7, help="Durchgänge je Stufe (Median, Streuung)")
+    parser.add_argument("--register", type=int, default=200, help="Anzahl Suchbegriffe (Namen plus Füllnamen)")
+    parser.add_argument("--fraktur-schrift", default=None, help="TTF-Datei einer Frakturschrift")
+    parser.add_argument("--fraktur-sprache", default="deu_frak")
+    parser.add_argument("--optimierung", default=None)
+    parser.add_argument("--worker", type=int, default=1)
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--ohne-ocr", action="store_true", help="nur Einzelstufen, kein starte_ocr")
+    parser.add_argument("--baseline", default=baseline_standard)
+    parser.add_argument("--baseline-speichern", action="store_true", help="Ergebnis als neue Baseline speichern")
+    # wiederholte Läufe auf unverändertem Code weichen im Median um 20–50 % voneinander ab
+    parser.add_argument("--toleranz", type=float, default=0.5, help="erlaubte Verschlechterung (0.5 = 50 %%)")
+    args = parser.parse_args()
+
+    # Register wie aus einem Namensverzeichnis: platzierte Namen plus zufällige Füllnamen
+    rng = random.Random(args.seed)
+    begriffe = list(NAMEN)
+    while len(begriffe) < args.register:
+        begriffe.append("".join(rng.choice(SILBEN) for _ in range(rng.randint(2, 4))))
+
+    with tempfile.TemporaryDirectory(prefix="ocr_bench_") as ordner:
+        start = time.perf_counter()
+        seiten = seiten_erzeugen(args.seiten, args.seed, ordner, args.fraktur_schrift)
+        print(f"{len(seiten)} Seiten erzeugt in {time.perf_counter() - start:.1f} s")
+
+        stufen = einzelstufen(seiten, begriffe, ordner, args.wiederholungen)
+        recall = {}
+        if args.ohne_ocr:
+            pass
+        elif ocr_engine.tesseract_version(args.engine) == "unbekannt":
+            print("[!] Tesseract nicht gefunden, starte_ocr und Recall werden übersprungen.")
+        else:
+            gesamt, recall = gesamtlauf(seiten, begriffe, ordner, {"antiqua": "deu", "fraktur": args.fraktur_sprache},
+                                        args.optimierung, args.worker, args.engine)
+            stufen.update(gesamt)
+
+    ergebnis = {
+        "parameter": {k: getattr(args, k) for k in ("seiten", "seed", "wiederholungen", "register",
+                                                    "fraktur_sprache", "optimierung", "worker", "engine")},
+        "umgebung": {"python": platform.python_version(), "system": platform.platform(),
+                     "cpus": os.cpu_count(), "tesseract": ocr_engine.tesseract_version(args.engine)},
+        "stufen": stufen,
+        "recall": recall,
+    }
+
+    baseline = None
+    if not os.path.isfile(args.baseline) and not args.baseline_speichern:
+        print(f"[!] Keine Baseline unter {args.baseline}, es wird nichts verglichen "
+              "(auf dieser Maschine mit --baseline-speichern anlegen).")
+    elif not args.baseline_speichern:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("parameter") != ergebnis["parameter"]:
+            print("[!] Baseline wurde mit anderen Parametern gemessen, der Vergleich ist nur eingeschränkt aussagekräftig.")
+    umgebung = ("system", "cpus", "tesseract")
+    gleiche_umgebung = baseline is not None and all(
+        baseline.get("umgebung", {}).get(k) == ergebnis["umgebung"][k] for k in umgebung)
+    if baseline is not None and not gleiche_umgebung:
+        print("[!] Baseline stammt aus einer anderen Umgebung: Zeiten werden nicht verglichen, nur der Recall "
+              "(eigene Baseline mit --baseline-speichern).")
+    tabelle(ergebnis, baseline)
+
+    if args.baseline_speichern:
+        if not recall:
+            print("[!] Baseline ohne Recall (ohne Tesseract oder mit --ohne-ocr): "
+                  "auf anderen Maschinen wird damit nichts verglichen.")
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(ergebnis, f, ensure_ascii=False, indent=1)
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+    if baseline:
+        if not gleiche_umgebung and not (baseline.get("recall") and recall):
+            print("[!] Weder Zeiten noch Recall vergleichbar, keine Aussage über Verschlechterungen.")
+            return 0
+        meldungen = vergleichen(ergebnis, baseline, args.toleranz, zeiten=gleiche_umgebung)
+        for meldung in meldungen:
+            print(f"[!] Verschlechterung: {meldung}")
+        if meldungen:
+            return 1
+        print(f"[✔] Keine Verschlechterung gegenüber der Baseline (Toleranz {args.toleranz:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
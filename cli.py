@@ -0,0 +1,321 @@
+# cli.py
+"""
+OCR Suchtool ohne GUI (für Server und nächtliche Stapelläufe).
+
+Beispiele:
+    python cli.py scans/ --begriffe namen.txt --ausgabe ergebnisse/ --worker 8
+    python cli.py "eingang/**/*.pdf" -b müller -b schmidt --sprache deu_frak --optimierung opencv
+    python cli.py --nur-index -b müller --ausgabe ergebnisse/
+    python cli.py --ueberwachen /mnt/scanner -B namen.txt --ausgabe ergebnisse/ --worker 4
+    python cli.py scans/ -B namen.txt --ausgabe ergebnisse/ --warteschlange /mnt/share/ocr_queue.sqlite
+    python cli.py --warteschlangen-worker /mnt/share/ocr_queue.sqlite --worker 8   (auf jedem Worker-Rechner)
+
+Exit-Codes: 0 = ok, 1 = einzelne Seiten fehlgeschlagen, 2 = falscher Aufruf,
+3 = keine Eingabedateien, 4 = Lauf abgebrochen (Fehler oder Strg+C).
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import signal
+import sys
+import time
+
+from utils import bildformate, pdfformate, preprocessing_pipelines
+
+# Formate des kompletten Scans (ausgabe.ausgaben_erstellen, pdf: pdf_ausgabe.PdfAusgabe); hier statt aus
+# ausgabe importiert, weil das python-docx lädt und --help dann spürbar wartet
+ausgabe_formate = ("docx", "txt", "jsonl", "pdf")
+
+EXIT_OK = 0
+EXIT_SEITENFEHLER = 1
+EXIT_AUFRUF = 2
+EXIT_KEINE_DATEIEN = 3
+EXIT_ABGEBROCHEN = 4
+
+log = logging.getLogger("ocr_suchtool")
+
+
+# ---------- Strukturierte Logs (eine JSON-Zeile je Ereignis) ----------
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        eintrag = {
+            "zeit": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)),
+            "level": record.levelname,
+            "ereignis": getattr(record, "ereignis", "log"),
+            "nachricht": record.getMessage(),
+        }
+        eintrag.update(getattr(record, "daten", {}))
+        if record.exc_info:
+            eintrag["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(eintrag, ensure_ascii=False)
+
+
+class LogSignal:
+    # gleiche Schnittstelle wie die Qt-Signale (emit), schreibt aber ins Log
+    def __init__(self, ereignis):
+        self.ereignis = ereignis
+
+    def emit(self, wert):
+        if self.ereignis == "fortschritt":
+            log.info(f"{wert} %", extra={"ereignis": "fortschritt", "daten": {"prozent": wert}})
+            return
+        nachricht = str(wert).strip()
+        if not nachricht:
+            return
+        level = logging.WARNING if nachricht.startswith("[!]") else logging.INFO
+        log.log(level, nachricht, extra={"ereignis": self.ereignis})
+
+
+def metriken_loggen(ereignis):
+    # Hook für starte_ocr: je Seite und am Ende der Laufbericht als eigene Logzeile
+    daten = {k: v for k, v in ereignis.items() if k not in ("ereignis", "seiten_details")}
+    if ereignis["ereignis"] == "seite":
+        log.info(f"Seite {ereignis['seite']} ({ereignis['herkunft']})", extra={"ereignis": "seite", "daten": daten})
+    else:
+        log.info("Laufbericht", extra={"ereignis": "bericht", "daten": daten})
+
+
+def logging_einrichten(json_logs=True, log_datei=None):
+    handler = [logging.StreamHandler(sys.stderr)]
+    if log_datei:
+        handler.append(logging.FileHandler(log_datei, encoding="utf-8"))
+    formatter = JsonFormatter() if json_logs else logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    for h in handler:
+        h.setFormatter(formatter)
+        log.addHandler(h)
+    log.setLevel(logging.INFO)
+
+
+# ---------- Eingaben ----------
+def dateien_sammeln(eingaben):
+    # Verzeichnisse rekursiv, sonst Glob-Muster (auch **); Reihenfolge stabil, ohne Duplikate
+    dateien = []
+    for eingabe in eingaben:
+        if os.path.isdir(eingabe):
+            treffer = [os.path.join(root, f) for root, _, files in os.walk(eingabe) for f in files]
+        else:
+            treffer = glob.glob(eingabe, recursive=True)
+        for pfad in sorted(treffer):
+            if pfad.lower().endswith(bildformate + pdfformate) and pfad not in dateien:
+                dateien.append(pfad)
+    return dateien
+
+
+def suchbegriffe_laden(begriffe, begriffsdateien):
+    suchbegriffe = [w.strip().lower() for w in begriffe if w.strip()]
+    for datei in begriffsdateien:
+        with open(datei, encoding="utf-8") as f:
+            suchbegriffe += [w.strip().lower() for w in f if w.strip()]
+    return list(dict.fromkeys(suchbegriffe))
+
+
+def argumente_parsen(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ocr_suchtool", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("eingaben", nargs="*", help="Dateien, Verzeichnisse oder Glob-Muster")
+    parser.add_argument("-b", "--begriff", action="append", default=[], help="Suchbegriff (mehrfach möglich)")
+    parser.add_argument("-B", "--begriffe", action="append", default=[],
+                        help="Datei mit Suchbegriffen, je Zeile ein Wort (mehrfach möglich)")
+    parser.add_argument("-o", "--ausgabe", help="Ausgabeordner (nicht bei --warteschlangen-worker)")
+    parser.add_argument("--sprache", default="deu",
+                        help="Tesseract-Sprache, z. B. deu, deu_frak, frk, deu_latf; "
+                             "mehrere mit + (z. B. deu+deu_frak) laufen als Kaskade")
+    parser.add_argument("--keine-kaskade", action="store_true",
+                        help="kombinierte Sprachen als ein Tesseract-Modell statt als Kaskade erkennen")
+    parser.add_argument("--optimierung", choices=sorted(preprocessing_pipelines), default=None)
+    parser.add_argument("--worker", type=int, default=os.cpu_count() or 1, help="Anzahl paralleler OCR-Prozesse")
+    parser.add_argument("--format", choices=("treffer",) + ausgabe_formate, action="append", default=[],
+                        help="treffer = nur Trefferliste (Standard); zusätzlich kompletter Scan als docx "
+                             "(Teile zu max_seiten_pro_word_datei Seiten), txt, jsonl oder pdf (durchsuchbar, je Datei; mehrfach möglich)")
+    parser.add_argument("--markieren", action="store_true", help="Treffer im kompletten Scan farbig markieren")
+    parser.add_argument("--positionen", action="store_true",
+                        help="Wortrahmen und Konfidenz je Treffer nach ocr_treffer.jsonl (OCR über image_to_data)")
+    parser.add_argument("--ausschnitte", action="store_true",
+                        help="wie --positionen, zusätzlich ein Bildausschnitt je Treffer in treffer_ausschnitte/")
+    parser.add_argument("--fuzzy", type=float, default=0, help="max. Abstand der fehlertoleranten Suche (0 = aus)")
+    parser.add_argument("--engine", choices=("auto", "tesserocr", "pytesseract"), default="auto")
+    parser.add_argument("--poppler", default=None, help="Pfad zu den Poppler-Programmen")
+    parser.add_argument("--kein-cache", action="store_true", help="OCR-Cache nicht verwenden")
+    parser.add_argument("--kein-index", action="store_true", help="Seiten nicht in den Volltext-Index aufnehmen")
+    parser.add_argument("--keine-textebene", action="store_true", help="vorhandene PDF-Textebene ignorieren")
+    parser.add_argument("--adaptiv", action="store_true",
+                        help="PDF-Seiten erst als Vorschau rastern, dann nur den Textbereich in der Auflösung, "
+                             "die die Schriftgröße braucht (150–400 dpi)")
+    parser.add_argument("--keine-leerseiten", action="store_true",
+                        help="auch leere Seiten und Seiten ohne Text erkennen (Schwellen in utils.leerseite_*)")
+    parser.add_argument("--kein-journal", action="store_true",
+                        help="kein Auftragsjournal im Ausgabeordner (Lauf nicht fortsetzbar)")
+    parser.add_argument("--nur-index", action="store_true", help="nur im Volltext-Index suchen, keine OCR")
+    parser.add_argument("--ueberwachen", metavar="ORDNER", default=None,
+                        help="Dienstbetrieb: ORDNER laufend auf neue oder geänderte Dateien prüfen, "
+                             "Treffer an treffer_laufend.txt im Ausgabeordner anhängen (Ende mit Strg+C)")
+    parser.add_argument("--intervall", type=float, default=5.0, help="Sekunden zwischen zwei Prüfungen (--ueberwachen)")
+    parser.add_argument("--ruhezeit", type=float, default=10.0,
+                        help="Datei gilt als fertig geschrieben, wenn sie so viele Sekunden unverändert ist (--ueberwachen)")
+    parser.add_argument("--warteschlange", metavar="DATEI", default=None,
+                        help="Seiten nicht selbst erkennen, sondern über die SQLite-Warteschlange DATEI "
+                             "(gemeinsames Laufwerk) an Worker-Rechner verteilen; Ausgaben entstehen hier")
+    parser.add_argument("--warteschlangen-worker", metavar="DATEI", default=None,
+                        help="als Worker-Knoten mit --worker Prozessen Seiten aus der Warteschlange DATEI "
+                             "erkennen (Ende mit Strg+C)")
+    parser.add_argument("--profil", action="store_true",
+                        help="Lauf mit cProfile messen (ocr_profil.prof/.txt im Ausgabeordner)")
+    parser.add_argument("--text-logs", action="store_true", help="lesbare statt JSON-Logzeilen")
+    parser.add_argument("--log-datei", default=None)
+    return parser.parse_args(argv)
+
+
+# ---------- Einstieg ----------
+def warteschlangen_worker(pfad, anzahl):
+    # Worker-Knoten: anzahl Prozesse leasen Seiten, bis Strg+C/SIGTERM das Stopp-Ereignis setzt
+    import multiprocessing
+    from warteschlange import SQLiteWarteschlange, worker_prozess
+
+    SQLiteWarteschlange(pfad).schliessen()  # Datei und Tabelle anlegen, Pfad prüfen
+    stopp = multiprocessing.Event()
+
+    def beenden(signum, frame):
+        log.warning("Abbruch angefordert", extra={"ereignis": "abbruch"})
+        stopp.set()
+
+    signal.signal(signal.SIGINT, beenden)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, beenden)
+    prozesse = [multiprocessing.Process(target=worker_prozess, args=(pfad, stopp), daemon=True)
+                for _ in range(anzahl)]
+    for p in prozesse:
+        p.start()
+    log.info("Worker-Knoten gestartet", extra={"ereignis": "start", "daten": {"warteschlange": pfad, "worker": anzahl}})
+    for p in prozesse:
+        while p.is_alive():
+            p.join(timeout=0.5)
+    log.info("Worker-Knoten beendet", extra={"ereignis": "ende"})
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = argumente_parsen(argv)
+    logging_einrichten(json_logs=not args.text_logs, log_datei=args.log_datei)
+
+    if args.warteschlangen_worker:
+        if args.worker < 1:
+            log.error("--worker muss mindestens 1 sein.", extra={"ereignis": "fehler"})
+            return EXIT_AUFRUF
+        return warteschlangen_worker(args.warteschlangen_worker, args.worker)
+    if not args.ausgabe:
+        log.error("--ausgabe fehlt.", extra={"ereignis": "fehler"})
+        return EXIT_AUFRUF
+
+    suchbegriffe = suchbegriffe_laden(args.begriff, args.begriffe)
+    if not suchbegriffe:
+        log.error("Keine Suchbegriffe angegeben.", extra={"ereignis": "fehler"})
+        return EXIT_AUFRUF
+
+    # erst hier importieren, damit --help und Aufruffehler sofort antworten
+    from ocr_engine import starte_ocr, index_suche
+
+    if args.nur_index:
+        fundstellen, treffer_datei = index_suche(suchbegriffe, args.ausgabe, LogSignal("status"))
+        log.info("Index-Suche beendet", extra={"ereignis": "ende", "daten": {
+            "treffer": len(fundstellen), "treffer_datei": treffer_datei}})
+        return EXIT_OK
+
+    if args.worker < 1:
+        log.error("--worker muss mindestens 1 sein.", extra={"ereignis": "fehler"})
+        return EXIT_AUFRUF
+
+    abbrechen = {"flag": False}
+
+    def sigint(signum, frame):
+        log.warning("Abbruch angefordert", extra={"ereignis": "abbruch"})
+        abbrechen["flag"] = True
+
+    signal.signal(signal.SIGINT, sigint)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, sigint)
+
+    # gemeinsame Einstellungen für Einzellauf und Überwachung
+    optionen = dict(
+        sprache=args.sprache,
+        optimierung=args.optimierung,
+        poppler_path=args.poppler,
+        worker=args.worker,
+        cache=not args.kein_cache,
+        index=not args.kein_index,
+        fuzzy=args.fuzzy,
+        engine=args.engine,
+        textebene=not args.keine_textebene,
+        journal=not args.kein_journal,
+        kaskade=not args.keine_kaskade,
+        metriken_hook=metriken_loggen,
+        profil=args.profil,
+        leerseiten=not args.keine_leerseiten,
+        adaptiv=args.adaptiv,
+    )
+    if args.warteschlange:
+        from warteschlange import SQLiteWarteschlange
+        optionen["warteschlange"] = SQLiteWarteschlange(args.warteschlange)
+
+    if args.ueberwachen:
+        if not os.path.isdir(args.ueberwachen):
+            log.error(f"Kein Verzeichnis: {args.ueberwachen}", extra={"ereignis": "fehler"})
+            return EXIT_AUFRUF
+        from ueberwachung import OrdnerWaechter
+
+        os.makedirs(args.ausgabe, exist_ok=True)
+        try:
+            OrdnerWaechter(args.ueberwachen, suchbegriffe, args.ausgabe, intervall=args.intervall,
+                           ruhezeit=args.ruhezeit, status_signal=LogSignal("status"),
+                           progress_signal=LogSignal("fortschritt"), **optionen
+                           ).laufen(abbrechen_flag=lambda: abbrechen["flag"])
+        except Exception as e:
+            log.exception(f"Fehler in der Überwachung: {e}", extra={"ereignis": "fehler"})
+            return EXIT_ABGEBROCHEN
+        log.info("Überwachung beendet", extra={"ereignis": "ende"})
+        return EXIT_OK
+
+    dateien = dateien_sammeln(args.eingaben)
+    if not dateien:
+        log.error("Keine passenden Eingabedateien gefunden.", extra={"ereignis": "fehler"})
+        return EXIT_KEINE_DATEIEN
+
+    fehler = []
+    start = time.perf_counter()
+    log.info("OCR gestartet", extra={"ereignis": "start", "daten": {
+        "dateien": len(dateien), "suchbegriffe": len(suchbegriffe), "sprache": args.sprache,
+        "optimierung": args.optimierung, "worker": args.worker}})
+    try:
+        word_docs, treffer_datei = starte_ocr(
+            dateien=dateien,
+            suchbegriffe=suchbegriffe,
+            formate=[f for f in args.format if f != "treffer"],
+            highlight=args.markieren,
+            status_signal=LogSignal("status"),
+            progress_signal=LogSignal("fortschritt"),
+            output_dir=args.ausgabe,
+            abbrechen_flag=lambda: abbrechen["flag"],
+            fehlerprotokoll=fehler,
+            positionen=args.positionen,
+            ausschnitte=args.ausschnitte,
+            **optionen,
+        )
+    except Exception as e:
+        log.exception(f"Fehler im OCR-Lauf: {e}", extra={"ereignis": "fehler"})
+        return EXIT_ABGEBROCHEN
+
+    log.info("OCR beendet", extra={"ereignis": "ende", "daten": {
+        "dauer_s": round(time.perf_counter() - start, 1), "ergebnisse": word_docs,
+        "treffer_datei": treffer_datei, "fehler": len(fehler)}})
+
+    if abbrechen["flag"]:
+        return EXIT_ABGEBROCHEN
+    if fehler:
+        return EXIT_SEITENFEHLER
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
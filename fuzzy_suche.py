@@ -0,0 +1,135 @@
+# fuzzy_suche.py
+import re
+from collections import defaultdict
+
+from utils import kleinschreibung
+
+# ---------- Typische OCR-Verwechslungen (Fraktur/Antiqua) ----------
+# (Zeichenfolge im Suchbegriff, Zeichenfolge im OCR-Text, Kosten)
+OCR_KONFUSIONEN = [
+    ("s", "ſ", 0.0), ("s", "f", 0.5), ("f", "ſ", 0.5),
+    ("ch", "ck", 0.5), ("ck", "ch", 0.5),
+    ("m", "rn", 0.5), ("rn", "m", 0.5),
+    ("m", "in", 0.5), ("w", "vv", 0.5),
+    ("ü", "ii", 0.5), ("ü", "u", 0.5), ("ö", "o", 0.5), ("ä", "a", 0.5),
+    ("u", "n", 0.5), ("n", "u", 0.5),
+    ("e", "c", 0.5), ("c", "e", 0.5),
+    ("i", "l", 0.5), ("l", "i", 0.5), ("i", "1", 0.5), ("l", "1", 0.5),
+    ("h", "b", 0.5), ("b", "h", 0.5), ("k", "t", 0.5), ("t", "k", 0.5),
+    ("y", "h", 0.5), ("x", "r", 0.5),
+]
+
+# Nur für den Trigramm-Vorfilter: verwechselbare Folgen auf eine Form falten
+FALTUNG = [("ſ", "s"), ("rn", "m"), ("ck", "ch"), ("ii", "ü"), ("vv", "w")]
+
+WORT_MUSTER = re.compile(r"\w+")
+
+
+def falten(wort):
+    for alt, neu in FALTUNG:
+        wort = wort.replace(alt, neu)
+    return wort
+
+
+def trigramme(wort):
+    wort = f"  {wort} "
+    return {wort[i:i + 3] for i in range(len(wort) - 2)}
+
+
+def gewichteter_abstand(begriff, wort, grenze, konfusionen):
+    """
+    Levenshtein-Abstand mit günstigeren Ersetzungen für OCR-Verwechslungen
+    (auch mehrzeichig, z. B. m ↔ rn). Bricht ab, sobald eine Zeile die Grenze
+    überschreitet, und liefert dann None.
+    """
+    n, m = len(begriff), len(wort)
+    if abs(n - m) > 2 * grenze:
+        return None
+
+    # Zeilen i-2, i-1, i für die mehrzeichigen Verwechslungen
+    vorvorher = None
+    vorher = [float(j) for j in range(m + 1)]
+    for i in range(1, n + 1):
+        aktuell = [float(i)] + [0.0] * m
+        for j in range(1, m + 1):
+            kosten = 0.0 if begriff[i - 1] == wort[j - 1] else 1.0
+            bester = min(vorher[j] + 1, aktuell[j - 1] + 1, vorher[j - 1] + kosten)
+            for alt_len, neu_len, tabelle in konfusionen:
+                if alt_len > i or neu_len > j:
+                    continue
+                k = tabelle.get((begriff[i - alt_len:i], wort[j - neu_len:j]))
+                if k is None:
+                    continue
+                zeile = aktuell if alt_len == 0 else vorher if alt_len == 1 else vorvorher
+                bester = min(bester, zeile[j - neu_len] + k)
+            aktuell[j] = bester
+        if min(aktuell) > grenze:
+            return None
+        vorvorher, vorher = vorher, aktuell
+
+    return vorher[m] if vorher[m] <= grenze else None
+
+
+class FuzzyMatcher:
+    """
+    Fehlertolerante Suche auf Wortebene für OCR-Text.
+    - Trigramm-Vorfilter: nur Wörter mit genügend gemeinsamen Trigrammen werden geprüft
+    - danach begrenzter, gewichteter Levenshtein-Abstand mit Verwechslungstabelle
+    - liefert die gefundene Schreibweise und ihren Abstand
+    """
+
+    def __init__(self, suchbegriffe, max_abstand=1, konfusionen=OCR_KONFUSIONEN):
+        self.suchbegriffe = [w.lower() for w in suchbegriffe]
+        self.max_abstand = max_abstand
+
+        # Verwechslungen nach (Länge im Begriff, Länge im Text) gruppieren
+        gruppen = defaultdict(dict)
+        for alt, neu, kosten in konfusionen:
+            gruppen[(len(alt), len(neu))][(alt, neu)] = kosten
+        self.konfusionen = [(a, n, tabelle) for (a, n), tabelle in gruppen.items()]
+
+        # Trigramm → Suchbegriffe
+        self.trigramm_index = defaultdict(list)
+        self.mindest_treffer = []
+        for idx, wort in enumerate(self.suchbegriffe):
+            tri = trigramme(falten(wort))
+            for t in tri:
+                self.trigramm_index[t].append(idx)
+            # jede Änderung (günstigste kostet 0,5) zerstört höchstens 3 Trigramme
+            self.mindest_treffer.append(len(tri) - 3 * max(1, int(max_abstand * 2)))
+        self.kurze_begriffe = [i for i, n in enumerate(self.mindest_treffer) if n <= 0]
+
+        self._wort_cache = {}
+
+    def pruefe_wort(self, wort):
+        """Liefert [(index_des_begriffs, abstand), ...] für ein einzelnes Wort."""
+        ergebnis = self._wort_cache.get(wort)
+        if ergebnis is not None:
+            return ergebnis
+
+        gemeinsam = defaultdict(int)
+        for t in trigramme(falten(wort)):
+            for idx in self.trigramm_index.get(t, ()):
+                gemeinsam[idx] += 1
+        kandidaten = {idx for idx, anzahl in gemeinsam.items() if anzahl >= self.mindest_treffer[idx]}
+        kandidaten.update(self.kurze_begriffe)
+
+        ergebnis = []
+        for idx in sorted(kandidaten):
+            abstand = gewichteter_abstand(self.suchbegriffe[idx], wort, self.max_abstand, self.konfusionen)
+            if abstand is not None:
+                ergebnis.append((idx, abstand))
+
+        if len(self._wort_cache) > 100000:
+            self._wort_cache.clear()
+        self._wort_cache[wort] = ergebnis
+        return ergebnis
+
+    def finde(self, zeile):
+        """Liefert [(start, ende, index_des_begriffs, schreibweise, abstand), ...]."""
+        funde = []
+        zeile_lc = kleinschreibung(zeile)
+        for m in WORT_MUSTER.finditer(zeile_lc):
+            for idx, abstand in self.pruefe_wort(m.group()):
+                funde.append((m.start(), m.end(), idx, zeile[m.start():m.end()], abstand))
+        return funde
@@ -2,38 +2,110 @@
 import os
 import sys
 import logging
+import threading
+import time
+from collections import deque
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QTextEdit, QPushButton, QComboBox, QCheckBox, QListWidget,
-    QListWidgetItem, QMessageBox, QProgressBar, QFileDialog
+    QTextEdit, QPlainTextEdit, QPushButton, QComboBox, QCheckBox, QListWidget,
+    QListWidgetItem, QMessageBox, QProgressBar, QFileDialog, QSpinBox,
+    QDoubleSpinBox
 )
-from PySide6.QtCore import Qt, QObject, Signal, QThread
+from PySide6.QtCore import Qt, QObject, Signal, QThread, QTimer
 from PySide6.QtGui import QFont
 
 from utils import bildformate, pdfformate
-from ocr_engine import starte_ocr, resource_path
+from ocr_engine import starte_ocr, index_suche, resource_path
 
 # ---------- Logging einrichten ----------
 log_dir = os.path.join(os.path.dirname(__file__), "logs")
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, "ocr_tool.log")
 
+log_datei_handler = logging.FileHandler(log_file, encoding="utf-8")
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(asctime)s [%(levelname)s] %(message)s",
     handlers=[
-        logging.FileHandler(log_file, encoding="utf-8"),
+        log_datei_handler,
         logging.StreamHandler()
     ]
 )
 
+# Statuszeilen eines Laufs vollständig nur ins Logfile, nicht zusätzlich auf die Konsole
+status_log = logging.getLogger("ocr_suchtool.status")
+status_log.propagate = False
+status_log.addHandler(log_datei_handler)
+
+anzeige_max_zeilen = 2000  # so viele Statuszeilen hält die Anzeige, ältere stehen nur im Logfile
+anzeige_intervall_ms = 250
+
+class SimpleSignal:
+    # gleiche Schnittstelle wie ein Qt-Signal, für synchrone Aufrufe im GUI-Thread
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, *args):
+        self.callback(*args)
+
+class EreignisPuffer:
+    """
+    Nimmt Status, Fortschritt und Seitenereignisse aus dem Worker-Thread entgegen, statt jedes
+    einzeln als Qt-Signal zu senden; die GUI holt sie per Timer gebündelt ab.
+    - Statuszeilen gehen sofort vollständig ins Logfile, in die Anzeige höchstens anzeige_max_zeilen je Abholung
+    - vom Fortschritt zählt nur der letzte Stand, Seiten werden gezählt (für Seiten/s und Restzeit)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.zeilen = deque(maxlen=anzeige_max_zeilen)
+        self.verworfen = 0
+        self.fortschritt = None
+        self.seiten = 0
+        self.start = time.monotonic()
+
+    def status(self, nachricht):
+        status_log.info(nachricht)
+        with self.lock:
+            if len(self.zeilen) == self.zeilen.maxlen:
+                self.verworfen += 1
+            self.zeilen.append(nachricht)
+
+    def progress(self, wert):
+        with self.lock:
+            self.fortschritt = wert
+
+    def ereignis(self, ereignis):
+        # metriken_hook von starte_ocr: je Seite ein Ereignis, am Ende der Laufbericht
+        if ereignis.get("ereignis") == "seite":
+            with self.lock:
+                self.seiten += 1
+
+    def abholen(self):
+        with self.lock:
+            zeilen, verworfen = list(self.zeilen), self.verworfen
+            self.zeilen.clear()
+            self.verworfen = 0
+            return zeilen, verworfen, self.fortschritt, self.seiten
+
+    def restzeit(self, fortschritt, seiten):
+        # Seiten/s seit dem Start; Restzeit aus dem Fortschritt (Dateien und Seiten innerhalb der Datei)
+        vergangen = time.monotonic() - self.start
+        teile = [f"{seiten} Seiten"]
+        if seiten and vergangen > 0:
+            teile.append(f"{seiten / vergangen:.1f} Seiten/s")
+        if fortschritt and 0 < fortschritt < 100:
+            rest = vergangen * (100 - fortschritt) / fortschritt
+            teile.append(f"noch ca. {int(rest // 60)}:{int(rest % 60):02d} min")
+        return " · ".join(teile)
+
 class OCRWorker(QObject):
     finished = Signal(list, str)
-    status_signal = Signal(str)
-    progress_signal = Signal(int)
 
     def __init__(self, dateien, suchbegriffe, sprache, optimierung,
-                 full_doc, highlight, poppler_path=None, output_dir=None, abbrechen_flag=None):
+                 full_doc, highlight, poppler_path=None, output_dir=None, abbrechen_flag=None,
+                 worker=1, cache=True, fuzzy=0, engine="auto", textebene=True, positionen=False, formate=None,
+                 adaptiv=False, puffer=None):
         super().__init__()
         self.dateien = dateien
         self.suchbegriffe = suchbegriffe
@@ -43,6 +115,15 @@ class OCRWorker(QObject):
         self.highlight = highlight
         self.poppler_path = poppler_path
         self.output_dir = output_dir
+        self.worker = worker
+        self.cache = cache
+        self.fuzzy = fuzzy
+        self.engine = engine
+        self.textebene = textebene
+        self.positionen = positionen
+        self.formate = formate
+        self.adaptiv = adaptiv
+        self.puffer = puffer or EreignisPuffer()
         self._abbrechen = False
         self.abbrechen_flag = abbrechen_flag if abbrechen_flag else lambda: self._abbrechen
 
@@ -56,17 +137,28 @@ class OCRWorker(QObject):
                 optimierung=self.optimierung,
                 full_doc=self.full_doc,
                 highlight=self.highlight,
-                status_signal=self.status_signal,
-                progress_signal=self.progress_signal,
+                status_signal=SimpleSignal(self.puffer.status),
+                progress_signal=SimpleSignal(self.puffer.progress),
                 poppler_path=self.poppler_path,
                 output_dir=self.output_dir,
-                abbrechen_flag=self.abbrechen_flag
+                abbrechen_flag=self.abbrechen_flag,
+                worker=self.worker,
+                cache=self.cache,
+                fuzzy=self.fuzzy,
+                engine=self.engine,
+                textebene=self.textebene,
+                ausschnitte=self.positionen,
+                formate=self.formate,
+                adaptiv=self.adaptiv,
+                # Profil für Supportfälle ohne eigene Schaltfläche: OCR_SUCHTOOL_PROFIL=1
+                profil=os.environ.get("OCR_SUCHTOOL_PROFIL") == "1",
+                metriken_hook=self.puffer.ereignis
             )
             logging.info("OCR-Worker beendet")
             self.finished.emit(result, treffer_datei)
         except Exception as e:
             logging.exception("Fehler im OCR-Worker")
-            self.status_signal.emit(f"[!] Fehler im OCR-Worker: {e}")
+            self.puffer.status(f"[!] Fehler im OCR-Worker: {e}")
             self.finished.emit([], None)
 
     def abbrechen(self):
@@ -100,7 +192,7 @@ class OCRApp(QMainWindow):
         self.sprache_dropdown.addItem("Deutsch (Fraktur)", "deu_frak")
         self.sprache_dropdown.addItem("Deutsch (Fraktur alt)", "frk")
         self.sprache_dropdown.addItem("Deutsch (Mischschrift)", "deu_latf")
-        #self.sprache_dropdown.addItem("Deutsch kombiniert (alle)", "deu+deu_frak+frk+deu_latf")
+        self.sprache_dropdown.addItem("Deutsch kombiniert (Kaskade)", "deu+deu_frak+frk+deu_latf")
         sprache_layout.addWidget(self.sprache_dropdown)
         layout.addLayout(sprache_layout)
 
@@ -115,12 +207,51 @@ class OCRApp(QMainWindow):
         optim_layout.addWidget(self.optim_dropdown)
         layout.addLayout(optim_layout)
 
+        # Parallele Verarbeitung
+        worker_layout = QHBoxLayout()
+        worker_layout.addWidget(QLabel("Parallele OCR-Prozesse:"))
+        self.worker_spinbox = QSpinBox()
+        self.worker_spinbox.setRange(1, os.cpu_count() or 1)
+        self.worker_spinbox.setValue(os.cpu_count() or 1)
+        worker_layout.addWidget(self.worker_spinbox)
+        worker_layout.addWidget(QLabel("OCR-Engine:"))
+        self.engine_dropdown = QComboBox()
+        self.engine_dropdown.addItem("Automatisch", "auto")
+        self.engine_dropdown.addItem("tesserocr (Modell bleibt geladen)", "tesserocr")
+        self.engine_dropdown.addItem("pytesseract (ein Prozess je Seite)", "pytesseract")
+        worker_layout.addWidget(self.engine_dropdown)
+        worker_layout.addStretch()
+        layout.addLayout(worker_layout)
+
+        # Fehlertolerante Suche
+        fuzzy_layout = QHBoxLayout()
+        fuzzy_layout.addWidget(QLabel("Fehlertolerante Suche (max. Abstand, 0 = aus):"))
+        self.fuzzy_spinbox = QDoubleSpinBox()
+        self.fuzzy_spinbox.setRange(0, 3)
+        self.fuzzy_spinbox.setSingleStep(0.5)
+        self.fuzzy_spinbox.setDecimals(1)
+        fuzzy_layout.addWidget(self.fuzzy_spinbox)
+        fuzzy_layout.addStretch()
+        layout.addLayout(fuzzy_layout)
+
         # Checkboxen
         self.doc_checkbox = QCheckBox("Kompletten Scan als .doc speichern")
         self.highlight_checkbox = QCheckBox("Treffer farbig markieren")
         self.highlight_checkbox.setVisible(False)
+        self.cache_checkbox = QCheckBox("OCR-Cache verwenden (bereits erkannte Seiten überspringen)")
+        self.cache_checkbox.setChecked(True)
+        self.textebene_checkbox = QCheckBox("Vorhandene PDF-Textebene nutzen (Seiten ohne OCR)")
+        self.textebene_checkbox.setChecked(True)
+        self.positionen_checkbox = QCheckBox("Trefferpositionen und Bildausschnitte speichern")
+        self.pdf_checkbox = QCheckBox("Durchsuchbare PDF je Datei speichern (Scan mit unsichtbarer Textebene)")
+        self.adaptiv_checkbox = QCheckBox("Adaptive Auflösung für PDFs (nur Textbereich, Auflösung nach Schriftgröße)")
         layout.addWidget(self.doc_checkbox)
         layout.addWidget(self.highlight_checkbox)
+        layout.addWidget(self.cache_checkbox)
+        layout.addWidget(self.textebene_checkbox)
+        layout.addWidget(self.positionen_checkbox)
+        layout.addWidget(self.pdf_checkbox)
+        layout.addWidget(self.adaptiv_checkbox)
         self.doc_checkbox.stateChanged.connect(self.toggle_highlight_checkbox)
 
         # Ausgabeordner
@@ -142,10 +273,12 @@ class OCRApp(QMainWindow):
         # Buttons
         button_layout = QHBoxLayout()
         self.start_button = QPushButton("OCR starten")
+        self.index_button = QPushButton("Im Index suchen (ohne OCR)")
         self.clear_button = QPushButton("Liste löschen")
         self.cancel_button = QPushButton("Abbrechen")
         self.cancel_button.setEnabled(False)
         button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.index_button)
         button_layout.addWidget(self.clear_button)
         button_layout.addWidget(self.cancel_button)
         layout.addLayout(button_layout)
@@ -157,15 +290,22 @@ class OCRApp(QMainWindow):
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 100)
         layout.addWidget(self.progress_bar)
-        self.status_feld = QTextEdit()
+        # begrenzte Anzeige: alte Zeilen fallen vorn heraus, das Logfile behält alles
+        self.status_feld = QPlainTextEdit()
         self.status_feld.setReadOnly(True)
+        self.status_feld.setMaximumBlockCount(anzeige_max_zeilen)
         self.status_feld.setFont(QFont("Consolas", 10))
         layout.addWidget(self.status_feld)
+        self.puffer = None
+        self.anzeige_timer = QTimer(self)
+        self.anzeige_timer.setInterval(anzeige_intervall_ms)
+        self.anzeige_timer.timeout.connect(self.ereignisse_anzeigen)
 
         self.setCentralWidget(haupt_widget)
 
         # Signale
         self.start_button.clicked.connect(self.start_worker)
+        self.index_button.clicked.connect(self.index_suchen)
         self.clear_button.clicked.connect(self.liste_loeschen)
         self.cancel_button.clicked.connect(self.abbrechen_worker)
 
@@ -234,8 +374,10 @@ class OCRApp(QMainWindow):
             self.status_feld.clear()
             self.status_label.setText("Starte OCR...")
             self.progress_bar.setValue(0)
+            self.puffer = EreignisPuffer()
 
             self.start_button.setEnabled(False)
+            self.index_button.setEnabled(False)
             self.clear_button.setEnabled(False)
             self.cancel_button.setEnabled(True)
 
@@ -247,31 +389,85 @@ class OCRApp(QMainWindow):
                 full_doc=self.doc_checkbox.isChecked(),
                 highlight=self.highlight_checkbox.isChecked(),
                 poppler_path=self.poppler_path,
-                output_dir=self.output_dir
+                output_dir=self.output_dir,
+                worker=self.worker_spinbox.value(),
+                cache=self.cache_checkbox.isChecked(),
+                fuzzy=self.fuzzy_spinbox.value(),
+                engine=self.engine_dropdown.currentData(),
+                textebene=self.textebene_checkbox.isChecked(),
+                positionen=self.positionen_checkbox.isChecked(),
+                formate=["pdf"] if self.pdf_checkbox.isChecked() else None,
+                adaptiv=self.adaptiv_checkbox.isChecked(),
+                puffer=self.puffer
             )
             self.thread = QThread()
             self.worker.moveToThread(self.thread)
 
-            self.worker.status_signal.connect(lambda msg: self.status_feld.append(msg))
-            self.worker.progress_signal.connect(self.progress_bar.setValue)
             self.worker.finished.connect(self.ocr_finished)
+            self.anzeige_timer.start()
             self.thread.started.connect(self.worker.run)
             self.thread.start()
         except Exception as e:
             logging.exception("Fehler beim Start des OCR-Workers")
             QMessageBox.critical(self, "Fehler", f"Fehler beim Start des OCR-Workers: {e}")
 
+    def index_suchen(self):
+        try:
+            suchbegriffe = [w.strip().lower() for w in self.keyword_textfeld.toPlainText().splitlines() if w.strip()]
+            if not suchbegriffe:
+                QMessageBox.warning(self, "Keine Suchbegriffe", "Bitte gib mindestens ein Suchwort ein.")
+                return
+
+            self.status_feld.clear()
+            self.status_label.setText("Suche im Index...")
+            fundstellen, treffer_datei = index_suche(
+                suchbegriffe,
+                output_dir=self.output_dir,
+                status_signal=SimpleSignal(self.status_feld.appendPlainText)
+            )
+            self.status_label.setText("Fertig.")
+
+            if treffer_datei:
+                antwort = QMessageBox.question(
+                    self,
+                    "Index-Suche abgeschlossen",
+                    f"{len(fundstellen)} Treffer gefunden.\nMöchten Sie die Trefferliste öffnen?",
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.Yes
+                )
+                if antwort == QMessageBox.Yes:
+                    os.startfile(treffer_datei)
+        except Exception as e:
+            logging.exception("Fehler bei der Index-Suche")
+            QMessageBox.critical(self, "Fehler", f"Fehler bei der Index-Suche: {e}")
+
     def abbrechen_worker(self):
         if self.worker:
             self.worker.abbrechen()
-            self.status_feld.append("[!] Abbrechen angefordert...")
+            self.status_feld.appendPlainText("[!] Abbrechen angefordert...")
             self.cancel_button.setEnabled(False)
 
+    def ereignisse_anzeigen(self):
+        # gebündelt: ein Textblock je Timer-Takt statt eines Signals und Layouts je Zeile
+        if not self.puffer:
+            return
+        zeilen, verworfen, fortschritt, seiten = self.puffer.abholen()
+        if verworfen:
+            self.status_feld.appendPlainText(f"… {verworfen} weitere Zeilen nur im Logfile ({log_file})")
+        if zeilen:
+            self.status_feld.appendPlainText("\n".join(zeilen))
+        if fortschritt is not None:
+            self.progress_bar.setValue(fortschritt)
+            self.status_label.setText(self.puffer.restzeit(fortschritt, seiten))
+
     def ocr_finished(self, docs, treffer_datei):
         try:
+            self.anzeige_timer.stop()
+            self.ereignisse_anzeigen()
             self.status_label.setText("Fertig.")
             self.progress_bar.setValue(self.progress_bar.maximum())
             self.start_button.setEnabled(True)
+            self.index_button.setEnabled(True)
             self.clear_button.setEnabled(True)
             self.cancel_button.setEnabled(False)
             if self.thread:
@@ -300,6 +496,8 @@ class OCRApp(QMainWindow):
 
 if __name__ == "__main__":
     try:
+        import multiprocessing
+        multiprocessing.freeze_support()
         from PySide6.QtWidgets import QApplication
         app = QApplication(sys.argv)
         window = OCRApp()
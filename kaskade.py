@@ -0,0 +1,86 @@
+# kaskade.py
+import os
+import re
+import time
+
+from ocr_woerter import SeitenWoerter
+from utils import app_daten_ordner, kaskade_min_konfidenz, kaskade_min_woerterbuch
+
+# Häufige deutsche Wörter (auch ältere Schreibweisen); in normalem Fließtext ist ein
+# guter Teil aller Wörter darunter, in unbrauchbarer OCR-Ausgabe kaum eines
+GRUNDWORTSCHATZ = set("""
+der die das den dem des ein eine einer eines einem einen und oder aber auch als an am auf aus bei bey
+bis durch für gegen in im ins mit nach neben ohne seit über um unter von vom vor während wegen zu zum zur
+zwischen ich du er sie es wir ihr ihm ihn ihnen ihre ihrer ihren ihres ihrem sein seine seiner seinen
+seines seinem man sich mich mir dich dir uns euch wer was wie wo wann warum welche welcher welches
+dieser diese dieses diesen diesem jener jene jenes alle aller allen alles kein keine keinen keiner
+ist sind war waren wird werden wurde wurden worden hat haben hatte hatten habe sey seyn sei sein
+kann können konnte konnten muss muß müssen musste mußte soll sollen sollte will wollen wollte mag
+möchte darf dürfen nicht nichts noch nur schon sehr so dann denn doch da dass daß ob wenn weil
+als auch hier dort heute jetzt immer wieder mehr viel viele wenig einige andere anderen anderer
+herr herrn frau fräulein jahr jahre jahren tag tage tagen zeit stadt land haus hause kirche
+gemeinde amt gericht sohn tochter vater mutter kind kinder name namen theil teil theile teile
+geboren gestorben getauft verheiratet wohnhaft alt alter ehe ehefrau witwe wittwe
+eins zwei drei vier fünf sechs sieben acht neun zehn hundert tausend erste ersten zweite dritte
+januar februar märz april mai juni juli august september oktober october november dezember december
+thun that gethan thut giebt gibt ward wurde hiermit hierauf daher darauf darin davon dazu damit
+sowie sowohl jedoch also nun gleich ganz gut groß große großen neue neuen alte alten
+""".split())
+
+
+def woerterbuch_laden():
+    """Grundwortschatz plus optionale eigene Wortliste (~/.ocr_suchtool/woerterbuch.txt, je Zeile ein Wort)."""
+    woerter = set(GRUNDWORTSCHATZ)
+    pfad = os.path.join(app_daten_ordner, "woerterbuch.txt")
+    if os.path.isfile(pfad):
+        with open(pfad, encoding="utf-8") as f:
+            woerter.update(w.strip().lower() for w in f if w.strip())
+    return woerter
+
+
+WORT = re.compile(r"[^\W\d_]{2,}")
+_woerterbuch = None
+
+
+def seiten_qualitaet(woerter):
+    """
+    Liefert (mittlere Wortkonfidenz 0–100, Anteil Wörterbuchtreffer 0–1, Anzahl Wörter).
+    Die Konfidenz ist nach Wortlänge gewichtet, damit Satzzeichen und Einzelbuchstaben wenig zählen.
+    """
+    global _woerterbuch
+    if _woerterbuch is None:
+        _woerterbuch = woerterbuch_laden()
+
+    gueltig = woerter.konfidenz >= 0
+    laengen = (woerter.ende - woerter.start)[gueltig]
+    konfidenz = float((woerter.konfidenz[gueltig] * laengen).sum() / laengen.sum()) if laengen.sum() else 0.0
+
+    tokens = WORT.findall(woerter.text.lower().replace("ſ", "s"))
+    quote = sum(t in _woerterbuch for t in tokens) / len(tokens) if tokens else 0.0
+    return konfidenz, quote, len(tokens)
+
+
+def ausreichend(konfidenz, quote, anzahl):
+    # fast leere Seiten nicht eskalieren, dort gibt es nichts zu verbessern
+    return anzahl < 5 or (konfidenz >= kaskade_min_konfidenz and quote >= kaskade_min_woerterbuch)
+
+
+def kaskaden_ocr(ocr, bild, modelle, zeiten):
+    """
+    Erkennt die Seite zuerst mit modelle[0]; erst wenn Konfidenz oder Wörterbuchquote
+    zu niedrig sind, folgen die weiteren Modelle. Behalten wird das beste Ergebnis
+    (Konfidenz/100 + Quote). zeiten bekommt je Modell einen Eintrag "ocr <modell>".
+    """
+    bestes, beste_wertung = None, None
+    for modell in modelle:
+        start = time.perf_counter()
+        woerter = SeitenWoerter.aus_tsv(ocr.tsv(bild, modell))
+        zeiten[f"ocr {modell}"] = time.perf_counter() - start
+
+        konfidenz, quote, anzahl = seiten_qualitaet(woerter)
+        wertung = konfidenz / 100 + quote
+        if bestes is None or wertung > beste_wertung:
+            bestes, beste_wertung = woerter, wertung
+        if ausreichend(konfidenz, quote, anzahl):
+            break
+    return bestes
@@ -1,8 +1,11 @@
 #main.py
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from gui import OCRApp
 
 if __name__ == "__main__":
+    # nötig für den OCR-Prozess-Pool in der PyInstaller-EXE
+    multiprocessing.freeze_support()
     app = QApplication([])
     fenster = OCRApp()
     fenster.show()
@@ -0,0 +1,152 @@
+# metriken.py
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+
+# ---------- Speicherbedarf ----------
+def spitzen_speicher_mb():
+    """
+    Höchster Speicherbedarf (RSS) in MB: Hauptprozess und größter beendeter Worker-Prozess.
+    Unter Windows über psutil (falls installiert), sonst über resource.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return {"prozess": round(psutil.Process().memory_info().peak_wset / 2 ** 20, 1)}
+        except Exception:
+            return {}
+    # ru_maxrss: Linux in KiB, macOS in Bytes
+    einheit = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    speicher = {"prozess": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * einheit / 2 ** 20, 1)}
+    kinder = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if kinder:
+        speicher["worker_max"] = round(kinder * einheit / 2 ** 20, 1)
+    return speicher
+
+
+# ---------- Messwerte eines Laufs ----------
+class LaufMetriken:
+    """
+    Sammelt die Messwerte eines OCR-Laufs für den Laufbericht (ocr_laufbericht.json).
+    - Zeit je Stufe: Rastern/Laden, Vorverarbeitung und OCR (Worker-Zeit), Suche, Ausgabe, Cache/Index/Journal
+    - je Seite Herkunft (ocr, cache, journal, textebene, leerseite) und Stufenzeiten
+    - Seiten pro Sekunde, Spitzen-Speicher (RSS), Zähler (z. B. Cache-Treffer)
+    - hook(ereignis) wird je Seite und am Ende mit dem Bericht aufgerufen
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.beginn = time.time()
+        self.start = time.perf_counter()
+        self.stufen = {}
+        self.zaehler = {}
+        self.seiten = []
+
+    def zeit(self, stufe, dauer):
+        self.stufen[stufe] = self.stufen.get(stufe, 0.0) + dauer
+
+    @contextmanager
+    def messen(self, stufe):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.zeit(stufe, time.perf_counter() - start)
+
+    def gemessen(self, seiten, stufe):
+        # Generator durchreichen und die Zeit bis zu jedem nächsten Element messen (z. B. Rastern)
+        seiten = iter(seiten)
+        while True:
+            start = time.perf_counter()
+            try:
+                wert = next(seiten)
+            except StopIteration:
+                return
+            finally:
+                self.zeit(stufe, time.perf_counter() - start)
+            yield wert
+
+    def zaehlen(self, name, anzahl=1):
+        self.zaehler[name] = self.zaehler.get(name, 0) + anzahl
+
+    def seite(self, datei, seite, herkunft, zeiten, fehler=None):
+        eintrag = {"datei": datei, "seite": seite, "herkunft": herkunft,
+                   "zeiten": {stufe: round(dauer, 4) for stufe, dauer in zeiten.items()}}
+        if fehler:
+            eintrag["fehler"] = fehler
+            self.zaehlen("fehler")
+        self.seiten.append(eintrag)
+        self.zaehlen(f"seiten_{herkunft}")
+        for stufe, dauer in zeiten.items():
+            self.zeit(stufe, dauer)
+        if self.hook:
+            self.hook(dict(eintrag, ereignis="seite"))
+
+    def leerseiten(self):
+        """
+        Übersprungene Seiten ohne Text und die geschätzte Ersparnis: mittlere Vorverarbeitungs- und
+        OCR-Zeit der erkannten Seiten je übersprungener Seite, abzüglich der Prüfung selbst.
+        """
+        leer = [s for s in self.seiten if s["herkunft"] == "leerseite"]
+        if not leer:
+            return None
+        ocr = [sum(d for stufe, d in s["zeiten"].items() if stufe != "leerseite")
+               for s in self.seiten if s["herkunft"] == "ocr" and "fehler" not in s]
+        pruefung = sum(sum(s["zeiten"].values()) for s in leer)
+        return {
+            "seiten": len(leer),
+            "liste": [{"datei": s["datei"], "seite": s["seite"],
+                       "art": next(stufe[10:] for stufe in s["zeiten"] if stufe.startswith("leerseite "))}
+                      for s in leer],
+            "gespart_s": round(len(leer) * sum(ocr) / len(ocr) - pruefung, 2) if ocr else None,
+        }
+
+    def bericht(self, **zusatz):
+        dauer = time.perf_counter() - self.start
+        seiten = len(self.seiten)
+        bericht = {
+            "beginn": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.beginn)),
+            "dauer_s": round(dauer, 2),
+            "seiten": seiten,
+            "seiten_pro_s": round(seiten / dauer, 3) if dauer > 0 else None,
+            "zaehler": dict(self.zaehler),
+            "stufen_s": {stufe: round(d, 3) for stufe, d in sorted(self.stufen.items(), key=lambda e: -e[1])},
+            "speicher_mb": spitzen_speicher_mb(),
+        }
+        leerseiten = self.leerseiten()
+        if leerseiten:
+            bericht["leerseiten"] = leerseiten
+        bericht.update(zusatz)
+        bericht["seiten_details"] = self.seiten
+        return bericht
+
+    def speichern(self, pfad, **zusatz):
+        bericht = self.bericht(**zusatz)
+        with open(pfad, "w", encoding="utf-8") as f:
+            json.dump(bericht, f, ensure_ascii=False, indent=1)
+        if self.hook:
+            self.hook(dict(bericht, ereignis="bericht", pfad=os.path.abspath(pfad)))
+        return bericht
+
+
+# ---------- Profil (cProfile) ----------
+def profil_speichern(profiler, ordner, anzahl=40):
+    """
+    Schreibt ocr_profil.prof (für pstats/snakeviz) und ocr_profil.txt mit den
+    teuersten Funktionen nach kumulierter Zeit.
+    """
+    try:
+        profiler.dump_stats(os.path.join(ordner, "ocr_profil.prof"))
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(anzahl)
+        with open(os.path.join(ordner, "ocr_profil.txt"), "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+    except OSError as e:
+        print(f"[!] Profil konnte nicht gespeichert werden: {e}")
@@ -0,0 +1,109 @@
+# ocr_backend.py
+import numpy as np
+import pytesseract
+from PIL import Image
+
+# ---------- OCR-Engines ----------
+# "tesserocr" hält die Tesseract-API (inkl. geladenem Sprachmodell) pro Prozess offen,
+# "pytesseract" startet für jede Seite einen eigenen tesseract-Prozess (Fallback).
+ENGINES = ("auto", "tesserocr", "pytesseract")
+
+
+def fuer_tesseract(bild):
+    # pytesseract schreibt das Bild in eine Temp-Datei; PPM statt PNG spart die Kompression.
+    # Das Format wird an einem eigenen Bildobjekt gesetzt, nie am Bild des Aufrufers
+    # (Cache-Hash, spätere Ausgaben und Speichern hängen davon ab).
+    if isinstance(bild, np.ndarray):
+        bild = Image.fromarray(bild)
+    else:
+        bild = bild.copy()
+    bild.format = "PPM"
+    return bild
+
+
+class PytesseractEngine:
+    name = "pytesseract"
+
+    def text(self, bild, sprache):
+        return pytesseract.image_to_string(fuer_tesseract(bild), lang=sprache)
+
+    def tsv(self, bild, sprache):
+        # Wörter mit Rahmen und Konfidenz (image_to_data), siehe ocr_woerter.SeitenWoerter
+        return pytesseract.image_to_data(fuer_tesseract(bild), lang=sprache)
+
+    def version(self):
+        return str(pytesseract.get_tesseract_version())
+
+    def schliessen(self):
+        pass
+
+
+class TesserocrEngine:
+    """
+    Tesseract über die C-API (tesserocr), ohne Subprozess und ohne Temp-Dateien.
+    Pro Sprache wird eine API-Instanz angelegt und für alle weiteren Seiten wiederverwendet,
+    das Sprachmodell (z. B. deu_frak) wird also nur einmal pro Prozess geladen.
+    """
+    name = "tesserocr"
+
+    def __init__(self, tessdata_pfad=None):
+        import tesserocr  # optionale Abhängigkeit
+        self.tesserocr = tesserocr
+        self.tessdata_pfad = tessdata_pfad
+        self.apis = {}
+
+    def api(self, sprache):
+        api = self.apis.get(sprache)
+        if api is None:
+            if self.tessdata_pfad:
+                api = self.tesserocr.PyTessBaseAPI(path=self.tessdata_pfad, lang=sprache)
+            else:
+                api = self.tesserocr.PyTessBaseAPI(lang=sprache)
+            self.apis[sprache] = api
+        return api
+
+    def text(self, bild, sprache):
+        if isinstance(bild, np.ndarray):
+            bild = Image.fromarray(bild)
+        api = self.api(sprache)
+        api.SetImage(bild)
+        return api.GetUTF8Text()
+
+    def tsv(self, bild, sprache):
+        if isinstance(bild, np.ndarray):
+            bild = Image.fromarray(bild)
+        api = self.api(sprache)
+        api.SetImage(bild)
+        return api.GetTSVText(0)
+
+    def version(self):
+        # "tesseract 5.3.0\n leptonica-1.82.0 ..." → "5.3.0"
+        return self.tesserocr.tesseract_version().split()[1]
+
+    def schliessen(self):
+        for api in self.apis.values():
+            api.End()
+        self.apis.clear()
+
+
+def erstelle_engine(name="auto", tessdata_pfad=None):
+    """Legt die gewünschte Engine an; 'auto' nimmt tesserocr, falls installiert, sonst pytesseract."""
+    if name in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine(tessdata_pfad)
+        except ImportError:
+            if name == "tesserocr":
+                print("[!] tesserocr ist nicht installiert, verwende pytesseract.")
+    return PytesseractEngine()
+
+
+# Eine Engine pro Prozess (Haupt- oder Worker-Prozess), wird über Seiten hinweg wiederverwendet
+_engines = {}
+
+
+def engine_fuer_prozess(name="auto", tessdata_pfad=None):
+    engine = _engines.get(name)
+    if engine is None:
+        engine = erstelle_engine(name, tessdata_pfad)
+        _engines[name] = engine
+    return engine
@@ -0,0 +1,116 @@
+# ocr_cache.py
+import hashlib
+import os
+import sqlite3
+import time
+
+from utils import app_daten_ordner, cache_max_bytes
+
+
+# ---------- Inhalts-Hash ----------
+def datei_hash(pfad, blockgroesse=1024 * 1024):
+    h = hashlib.sha256()
+    with open(pfad, "rb") as f:
+        for block in iter(lambda: f.read(blockgroesse), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------- Seiten-Cache ----------
+class OCRCache:
+    """
+    Persistenter OCR-Cache (SQLite) für den Text einzelner Seiten.
+    - Schlüssel: Inhalts-Hash der Quelldatei, Seite, Sprache, Optimierung, Tesseract-Version
+    - Größenbegrenzung mit LRU-Verdrängung (älteste Zugriffe zuerst)
+    - zählt Treffer und Fehlschläge für das Statusprotokoll
+    """
+
+    def __init__(self, pfad=None, max_bytes=cache_max_bytes, tesseract_version=""):
+        if not pfad:
+            pfad = os.path.join(app_daten_ordner, "ocr_cache.sqlite")
+        os.makedirs(os.path.dirname(pfad), exist_ok=True)
+        self.pfad = pfad
+        self.max_bytes = max_bytes
+        self.tesseract_version = str(tesseract_version)
+        self.treffer = 0
+        self.fehlschlaege = 0
+
+        self.conn = sqlite3.connect(pfad)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seiten (
+                datei_hash TEXT NOT NULL,
+                seite INTEGER NOT NULL,
+                sprache TEXT NOT NULL,
+                optimierung TEXT NOT NULL,
+                tesseract_version TEXT NOT NULL,
+                text TEXT NOT NULL,
+                groesse INTEGER NOT NULL,
+                zugriff REAL NOT NULL,
+                PRIMARY KEY (datei_hash, seite, sprache, optimierung, tesseract_version)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seiten_zugriff ON seiten (zugriff)")
+        self.conn.commit()
+        self.belegt = self.conn.execute("SELECT COALESCE(SUM(groesse), 0) FROM seiten").fetchone()[0]
+
+    def _schluessel(self, datei_hash, seite, sprache, optimierung, variante=""):
+        # variante: weitere Einstellungen, die den Text ändern (z. B. "adaptiv"), im Feld optimierung
+        optimierung = optimierung or ""
+        if variante:
+            optimierung += f"|{variante}"
+        return (datei_hash, seite, sprache, optimierung, self.tesseract_version)
+
+    def hole(self, datei_hash, seite, sprache, optimierung=None, variante=""):
+        schluessel = self._schluessel(datei_hash, seite, sprache, optimierung, variante)
+        zeile = self.conn.execute(
+            "SELECT text FROM seiten WHERE datei_hash=? AND seite=? AND sprache=? "
+            "AND optimierung=? AND tesseract_version=?", schluessel
+        ).fetchone()
+        if zeile is None:
+            self.fehlschlaege += 1
+            return None
+
+        self.treffer += 1
+        self.conn.execute(
+            "UPDATE seiten SET zugriff=? WHERE datei_hash=? AND seite=? AND sprache=? "
+            "AND optimierung=? AND tesseract_version=?", (time.time(),) + schluessel
+        )
+        self.conn.commit()
+        return zeile[0]
+
+    def speichere(self, datei_hash, seite, sprache, optimierung, text, variante=""):
+        schluessel = self._schluessel(datei_hash, seite, sprache, optimierung, variante)
+        groesse = len(text.encode("utf-8"))
+        alt = self.conn.execute(
+            "SELECT groesse FROM seiten WHERE datei_hash=? AND seite=? AND sprache=? "
+            "AND optimierung=? AND tesseract_version=?", schluessel
+        ).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO seiten VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            schluessel + (text, groesse, time.time())
+        )
+        self.belegt += groesse - (alt[0] if alt else 0)
+        self.verdraengen()
+        self.conn.commit()
+
+    def verdraengen(self):
+        # Least-recently-used: älteste Zugriffe löschen, bis die Obergrenze wieder passt
+        while self.belegt > self.max_bytes:
+            zeilen = self.conn.execute(
+                "SELECT rowid, groesse FROM seiten ORDER BY zugriff LIMIT 100"
+            ).fetchall()
+            if not zeilen:
+                self.belegt = 0
+                break
+            for rowid, groesse in zeilen:
+                if self.belegt <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM seiten WHERE rowid=?", (rowid,))
+                self.belegt -= groesse
+
+    def statistik(self):
+        return f"Cache: {self.treffer} Treffer, {self.fehlschlaege} Fehlschläge"
+
+    def schliessen(self):
+        self.conn.close()
@@ -1,17 +1,37 @@
 # ocr_engine.py
+import cProfile
+import functools
+import io
 import os
+import shutil
+import signal
+import subprocess
 import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
 from PIL import Image
 import pytesseract
-import numpy as np
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from docx import Document
-from docx.shared import RGBColor
+from ausgabe import TrefferPositionen, ausgaben_erstellen, sichere_datei_speichern
+from ocr_cache import OCRCache, datei_hash
+from ocr_index import OCRIndex
+from ocr_journal import OCRJournal
+from ocr_woerter import SeitenWoerter
+from pdf_ausgabe import PdfAusgabe
+from fuzzy_suche import FuzzyMatcher
+from kaskade import kaskaden_ocr
+from metriken import LaufMetriken, profil_speichern
+from ocr_backend import engine_fuer_prozess
+from warteschlange import seite_als_bytes
 from utils import (
-    bereinige_zeile, ist_treffer, max_seiten_pro_word_datei,
-    preprocess_pillow, preprocess_opencv
+    bereinige_zeile, StichwortMatcher, pdfformate,
+    pdf_dpi, pdf_seiten_fenster, seiten_speicher_budget, textebene_min_zeichen,
+    preprocess_pipeline, preprocessing_pipelines, seite_ohne_text,
+    adaptiv_vorschau_dpi, textbereich_schaetzen, ziel_dpi
 )
-import shutil
 
 # ---------- Pfad für PyInstaller anpassen ----------
 def resource_path(relative_path):
@@ -23,193 +43,896 @@ def resource_path(relative_path):
 
 # ---------- Tesseract-Pfad ----------
 tesseract_cmd = resource_path(os.path.join("Tesseract-OCR", "tesseract.exe"))
+if not os.path.isfile(tesseract_cmd):
+    # ohne mitgelieferte EXE (z. B. Linux-Server) das installierte tesseract aus dem PATH nehmen
+    tesseract_cmd = shutil.which("tesseract") or "tesseract"
 pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
+tessdata_pfad = resource_path(os.path.join("Tesseract-OCR", "tessdata"))
+if not os.path.isdir(tessdata_pfad):
+    tessdata_pfad = None  # tesserocr nutzt dann TESSDATA_PREFIX bzw. den Standardpfad
+
 # ---------- Poppler-Pfad ----------
 poppler_default_path = resource_path(os.path.join("poppler", "Library", "bin"))
+if not os.path.isdir(poppler_default_path):
+    poppler_default_path = None  # pdf2image sucht die Poppler-Programme dann im PATH
 
-# ---------- PDF → PNG ----------
-def pdf_to_png(pdf_path, out_dir, poppler_path=None, status_signal=None):
-    os.makedirs(out_dir, exist_ok=True)
+# ---------- PDF → Seiten (fensterweise) ----------
+def pdf_seitenzahl(pdf_path, poppler_path=None):
     if not poppler_path:
         poppler_path = poppler_default_path
-    images = convert_from_path(pdf_path, dpi=300, poppler_path=poppler_path)
-    output_files = []
-    total_pages = len(images)
-
-    for i, img in enumerate(images):
-        out_path = os.path.join(out_dir, f"{os.path.basename(pdf_path)}_{i+1}.png")
-        img.save(out_path, "PNG")
-        output_files.append(out_path)
-        if status_signal:
-            status_signal.emit(f"PDF '{os.path.basename(pdf_path)}': Seite {i+1}/{total_pages} konvertiert...")
+    info = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)
+    return int(info.get("Pages", 0))
+
+
+def seiten_fenster(seiten, fenster):
+    # zusammenhängende Seitenbereiche mit höchstens `fenster` Seiten bilden
+    start = ende = None
+    for seite in seiten:
+        if start is not None and seite == ende + 1 and seite - start < fenster:
+            ende = seite
+            continue
+        if start is not None:
+            yield start, ende
+        start = ende = seite
+    if start is not None:
+        yield start, ende
+
+
+def pdf_seiten(pdf_path, poppler_path=None, dpi=pdf_dpi,
+               fenster=pdf_seiten_fenster, thread_count=1, seiten=None):
+    """
+    Rastert ein PDF seitenweise als Generator:
+    - Seitenzahl vorab über pdfinfo ermitteln
+    - immer nur `fenster` Seiten gleichzeitig rendern (first_page/last_page)
+    - optional nur die angegebenen Seiten (z. B. Cache-Fehlschläge)
+    - liefert (Seitennummer, Seitenzahl, PIL-Image)
+    Der Speicherbedarf hängt damit von der Fenstergröße ab, nicht von der Dokumentlänge.
+    """
+    if not poppler_path:
+        poppler_path = poppler_default_path
+    total_pages = pdf_seitenzahl(pdf_path, poppler_path)
+    if seiten is None:
+        seiten = range(1, total_pages + 1)
+
+    for start, ende in seiten_fenster(sorted(seiten), fenster):
+        images = convert_from_path(
+            pdf_path, dpi=dpi, poppler_path=poppler_path,
+            first_page=start, last_page=ende,
+            thread_count=min(thread_count, ende - start + 1)
+        )
+        seite = start
+        while images:
+            yield seite, total_pages, images.pop(0)
+            seite += 1
+
+
+# ---------- Adaptive Auflösung: Vorschau → nur der Textbereich in passender Auflösung ----------
+def pdf_bereich_rastern(pdf_path, seite, dpi, rahmen, poppler_path=None):
+    """
+    Rastert nur den Ausschnitt rahmen = (x, y, breite, hoehe) in Pixeln bei `dpi` einer Seite
+    in Graustufen (pdftoppm -x/-y/-W/-H, Ausgabe über stdout).
+    """
+    if not poppler_path:
+        poppler_path = poppler_default_path
+    programm = "pdftoppm"
+    if poppler_path and os.path.isdir(poppler_path):
+        programm = os.path.join(poppler_path, "pdftoppm")
+    x, y, breite, hoehe = rahmen
+    ergebnis = subprocess.run(
+        [programm, "-r", str(dpi), "-f", str(seite), "-l", str(seite), "-x", str(x), "-y", str(y),
+         "-W", str(breite), "-H", str(hoehe), "-gray", pdf_path],
+        capture_output=True, check=True, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    )
+    bild = Image.open(io.BytesIO(ergebnis.stdout))
+    bild.load()
+    return bild
+
+
+def pdf_seiten_adaptiv(pdf_path, poppler_path=None, fenster=pdf_seiten_fenster, seiten=None):
+    """
+    Wie pdf_seiten, aber jede Seite in der Auflösung, die ihre Schrift braucht:
+    - Vorschau mit adaptiv_vorschau_dpi (Graustufen, fensterweise)
+    - daraus Zeichenhöhe und Textbereich schätzen (utils.textbereich_schaetzen)
+    - nur den Textbereich in der passenden Auflösung rastern (utils.ziel_dpi, 150–400 dpi)
+    - Seiten ohne erkennbaren Text werden als Vorschau geliefert (die Leerseitenprüfung erledigt den Rest)
+    Jedes Bild trägt in info["rahmen"] (x0, y0, dpi): Lage des Ausschnitts auf der Seite bei dpi.
+    """
+    if not poppler_path:
+        poppler_path = poppler_default_path
+    total_pages = pdf_seitenzahl(pdf_path, poppler_path)
+    if seiten is None:
+        seiten = range(1, total_pages + 1)
+
+    for start, ende in seiten_fenster(sorted(seiten), fenster):
+        vorschauen = convert_from_path(
+            pdf_path, dpi=adaptiv_vorschau_dpi, poppler_path=poppler_path,
+            first_page=start, last_page=ende, grayscale=True
+        )
+        seite = start
+        while vorschauen:
+            vorschau = vorschauen.pop(0)
+            schaetzung = textbereich_schaetzen(vorschau)
+            if schaetzung is None:
+                vorschau.info["rahmen"] = (0, 0, adaptiv_vorschau_dpi)
+                yield seite, total_pages, vorschau
+                seite += 1
+                continue
+            (x0, y0, x1, y1), zeichenhoehe = schaetzung
+            dpi = ziel_dpi(zeichenhoehe)
+            faktor = dpi / adaptiv_vorschau_dpi
+            rahmen = (int(x0 * faktor), int(y0 * faktor), int((x1 - x0) * faktor) + 1, int((y1 - y0) * faktor) + 1)
+            try:
+                bild = pdf_bereich_rastern(pdf_path, seite, dpi, rahmen, poppler_path)
+            except (OSError, subprocess.CalledProcessError) as e:
+                # ohne Ausschnitt-Rastern: ganze Seite in der geschätzten Auflösung
+                print(f"[!] Ausschnitt nicht rasterbar ({pdf_path}, Seite {seite}): {e}")
+                bild = convert_from_path(pdf_path, dpi=dpi, poppler_path=poppler_path,
+                                         first_page=seite, last_page=seite, grayscale=True)[0]
+                rahmen = (0, 0)
+            bild.info["rahmen"] = (rahmen[0], rahmen[1], dpi)
+            yield seite, total_pages, bild
+            seite += 1
+
+
+# ---------- Mehrseitige Bilddateien (TIFF) ----------
+mehrseitige_bildformate = (".tif", ".tiff")
+
+
+def bild_seitenzahl(pfad):
+    # Anzahl der Frames, ohne sie zu dekodieren (bei TIFF werden nur die Verzeichnisse gelesen)
+    with Image.open(pfad) as bild:
+        return getattr(bild, "n_frames", 1)
+
+
+def bild_seiten(pfad, seiten=None):
+    """
+    Liefert die Seiten einer Bilddatei als Generator, wie pdf_seiten (Seitennummer, Seitenzahl, Quelle):
+    - einseitige Bilder als Pfad, geladen wird erst beim OCR (auch im Worker-Prozess)
+    - mehrseitige TIFFs Frame für Frame als PIL-Image, dekodiert wird nur der gerade angeforderte
+    - optional nur die angegebenen Seiten (z. B. Cache-Fehlschläge)
+    """
+    try:
+        total_pages = bild_seitenzahl(pfad)
+    except Exception:
+        total_pages = 1  # unlesbare Datei: Fehler meldet das OCR der Seite
+    if seiten is None:
+        seiten = range(1, total_pages + 1)
+    if total_pages == 1:
+        if 1 in seiten:
+            yield 1, 1, pfad
+        return
+
+    with Image.open(pfad) as bild:
+        for seite in sorted(seiten):
+            if seite > total_pages:
+                break
+            bild.seek(seite - 1)
+            frame = bild.copy() if bild.mode in ("1", "L", "RGB") else bild.convert("RGB")
+            yield seite, total_pages, frame
 
-    return output_files
 
-# ---------- Bild → PNG ----------
-def image_to_png(image_path, out_dir):
+# ---------- Vorhandene Textebene (pdftotext) ----------
+def textebene_brauchbar(text, min_zeichen=textebene_min_zeichen):
+    # genug Buchstaben und überwiegend Buchstaben – kein leerer oder kaputter Textlayer
+    zeichen = [c for c in text if not c.isspace()]
+    buchstaben = sum(1 for c in zeichen if c.isalpha())
+    return buchstaben >= min_zeichen and buchstaben >= 0.5 * len(zeichen)
+
+
+def pdf_textebene(pdf_path, poppler_path=None):
+    """
+    Liest die Textebene aller Seiten in einem pdftotext-Aufruf (Seiten durch Seitenvorschub getrennt).
+    Liefert {Seitennummer: Text} nur für Seiten mit brauchbarem Text.
+    """
+    if not poppler_path:
+        poppler_path = poppler_default_path
+    programm = "pdftotext"
+    if poppler_path and os.path.isdir(poppler_path):
+        programm = os.path.join(poppler_path, "pdftotext")
+
+    try:
+        ergebnis = subprocess.run(
+            [programm, "-layout", "-enc", "UTF-8", pdf_path, "-"],
+            capture_output=True, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+    except OSError as e:
+        print(f"[!] pdftotext nicht ausführbar: {e}")
+        return {}
+    if ergebnis.returncode != 0:
+        return {}
+
+    seiten = ergebnis.stdout.decode("utf-8", errors="replace").split("\f")
+    return {n: text for n, text in enumerate(seiten, start=1) if textebene_brauchbar(text)}
+
+
+@functools.lru_cache(maxsize=256)
+def _bild_seitenzahl_gemerkt(pfad, groesse, geaendert):
+    # Größe und Änderungszeit gehören zum Schlüssel, damit eine ersetzte Datei neu gelesen wird
+    try:
+        return bild_seitenzahl(pfad)
+    except Exception:
+        return 1
+
+
+def mehrseitiges_bild(datei, seite):
+    if seite > 1:
+        return True
+    try:
+        st = os.stat(datei)
+    except OSError:
+        return False  # z. B. Index-Treffer einer inzwischen gelöschten Datei
+    return _bild_seitenzahl_gemerkt(datei, st.st_size, st.st_mtime) > 1
+
+
+def seiten_bezeichnung(datei, seite):
+    # Name der Seite in der Trefferliste; TIFFs nur mit Seitennummer, wenn sie mehrere Seiten haben
+    name = datei.lower()
+    if name.endswith(pdfformate) or (name.endswith(mehrseitige_bildformate) and mehrseitiges_bild(datei, seite)):
+        return f"{os.path.basename(datei)}_{seite}.png"
+    return f"{os.path.splitext(os.path.basename(datei))[0]}.png"
+
+# ---------- Seiten im Speicher halten, nur bei Bedarf auslagern ----------
+def seiten_bytes(bild):
+    return bild.width * bild.height * len(bild.getbands())
+
+
+def seite_auslagern(bild, out_dir, name):
+    """
+    Schreibt eine Seite unkomprimiert (PPM) in den temporären Ordner.
+    Wird nur benutzt, wenn die Seiten in Arbeit das Speicherbudget überschreiten.
+    """
     os.makedirs(out_dir, exist_ok=True)
-    base = os.path.splitext(os.path.basename(image_path))[0]
-    out_path = os.path.join(out_dir, f"{base}.png")
+    pfad = os.path.join(out_dir, os.path.splitext(name)[0] + ".ppm")
+    bild.save(pfad, "PPM")
+    bild.close()
+    return pfad
+
+# ---------- Temporäre Dateien ----------
+def temp_datei_loeschen(pfad, temp_files):
+    # nur selbst angelegte Dateien löschen, niemals Eingabedateien
+    if not isinstance(pfad, str) or pfad not in temp_files:
+        return
     try:
-        img = Image.open(image_path).convert("RGB")
-        img.save(out_path, "PNG")
-        return out_path
-    except Exception as e:
-        print(f"[!] Bildkonvertierung fehlgeschlagen für {image_path}: {e}")
-        return None
-
-# ---------- Word-Datei speichern ----------
-def sichere_datei_speichern(doc, dateiname, output_dir):
-    base_name = os.path.splitext(dateiname)[0]
-    ext = ".docx"
-    full_path = os.path.join(output_dir, dateiname)
-    counter = 1
-    while True:
+        os.remove(pfad)
+    except OSError:
+        pass
+    temp_files.remove(pfad)
+
+# ---------- Seite optimieren + OCR (läuft auch in Worker-Prozessen) ----------
+def bild_laden(quelle):
+    # Seiten kommen als PIL-Image aus dem Rasterer oder als Pfad (Bilddatei / ausgelagerte Seite)
+    if isinstance(quelle, Image.Image):
+        return quelle
+    bild = Image.open(quelle)
+    if bild.mode not in ("1", "L", "RGB"):
+        bild = bild.convert("RGB")
+    return bild
+
+
+def bild_optimieren(quelle, optimierung=None, zeiten=None):
+    # ohne Optimierung geht das Bild unverändert an Tesseract, sonst durch die NumPy/OpenCV-Pipeline
+    bild = bild_laden(quelle)
+    if optimierung not in preprocessing_pipelines:
+        if bild.width == 0 or bild.height == 0:
+            raise ValueError("Bild ist leer oder konnte nicht gelesen werden.")
+        return bild
+    stufen = preprocessing_pipelines[optimierung]
+    if "rahmen" in bild.info:
+        # adaptiv gerastert: die Auflösung passt schon zur Schrift, nicht noch auf zielbreite vergrößern
+        stufen = [stufe for stufe in stufen if stufe != "skalieren"]
+    return preprocess_pipeline(bild, stufen=stufen, zeiten=zeiten)
+
+
+def ocr_seite(quelle, sprache, optimierung=None, name=None, engine="auto", positionen=False, kaskade=False,
+              leerseiten=False):
+    """
+    Optimiert und erkennt eine einzelne Seite (PIL-Image oder Pfad).
+    Gibt (text, woerter, fehlertext, zeiten) zurück, damit Fehler aus Worker-Prozessen
+    im Statusprotokoll landen, statt den Pool abzubrechen.
+    zeiten enthält die Dauer je Vorverarbeitungsstufe und für die OCR in Sekunden.
+    Mit positionen=True kommt der Text aus image_to_data, woerter enthält dann die
+    Wortrahmen in Pixeln der Originalseite (SeitenWoerter), sonst ist woerter None.
+    Mit kaskade=True wird eine kombinierte Sprache ("deu+deu_frak+...") Modell für Modell
+    versucht, bis die Qualität reicht (siehe kaskade.kaskaden_ocr).
+    Mit leerseiten=True werden leere Seiten und Seiten ohne Text (utils.seite_ohne_text) nicht
+    erkannt: Text bleibt leer, zeiten enthält statt "ocr" einen Eintrag "leerseite <art>".
+    Die OCR-Engine wird pro Prozess einmal angelegt und für alle Seiten wiederverwendet.
+    """
+    zeiten = {}
+    if leerseiten:
+        start = time.perf_counter()
         try:
-            doc.save(full_path)
-            return full_path
-        except PermissionError:
-            full_path = os.path.join(output_dir, f"{base_name}_{counter}{ext}")
-            counter += 1
-        except Exception as e:
-            print(f"[!] Fehler beim Speichern von {full_path}: {e}")
-            return None
+            quelle_bild = bild_laden(quelle)
+            art = seite_ohne_text(quelle_bild)
+        except Exception:
+            quelle_bild, art = quelle, None  # Lesefehler meldet die Bildoptimierung
+        if art:
+            zeiten[f"leerseite {art}"] = time.perf_counter() - start
+            return "", None, None, zeiten
+        zeiten["leerseite"] = time.perf_counter() - start
+        quelle = quelle_bild  # Bilddateien nicht zweimal öffnen
+    try:
+        bild = bild_optimieren(quelle, optimierung, zeiten)
+    except Exception as e:
+        return None, None, f"[!] Bildoptimierung fehlgeschlagen für {name or quelle}: {e}", zeiten
+    start = time.perf_counter()
+    woerter = None
+    try:
+        ocr = engine_fuer_prozess(engine, tessdata_pfad)
+        if kaskade and "+" in sprache:
+            woerter = kaskaden_ocr(ocr, bild, sprache.split("+"), zeiten)
+            text = woerter.text
+            if not positionen:
+                woerter = None
+        elif positionen:
+            woerter = SeitenWoerter.aus_tsv(ocr.tsv(bild, sprache))
+            text = woerter.text
+        else:
+            text = ocr.text(bild, sprache)
+    except (pytesseract.TesseractError, RuntimeError) as e:
+        # Seitenfehler (z. B. defektes Bild); fehlt Tesseract ganz, bricht der Lauf weiterhin ab
+        return None, None, f"[!] OCR fehlgeschlagen für {name or quelle}: {e}", zeiten
+    zeiten["ocr"] = time.perf_counter() - start
+
+    if woerter is not None:
+        # die Vorverarbeitung kann skalieren; Rahmen beziehen sich auf die unveränderte Seite
+        if isinstance(quelle, Image.Image):
+            original = quelle.size
+        else:
+            with Image.open(quelle) as datei_bild:  # nur der Kopf wird gelesen, die Datei gleich wieder geschlossen
+                original = datei_bild.size
+        breite, hoehe = (bild.shape[1], bild.shape[0]) if hasattr(bild, "shape") else bild.size
+        woerter.skalieren(original[0] / breite, original[1] / hoehe)
+    return text, woerter, None, zeiten
+
+
+def ocr_worker_init(omp_thread_limit=1):
+    # Jeder Worker bekommt nur wenige Tesseract-Threads, sonst überbucht der Pool die CPU
+    os.environ["OMP_THREAD_LIMIT"] = str(omp_thread_limit)
+    # Strg+C beendet der Hauptprozess über abbrechen_flag, nicht jeder Worker für sich
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def seiten_ocr_geordnet(auftraege, sprache, optimierung=None, worker=1, abbrechen_flag=None,
+                        engine="auto", positionen=False, kaskade=False, leerseiten=False, warteschlange=None):
+    """
+    Führt OCR für (datei, seite, quelle, text)-Aufträge aus und liefert
+    (datei, seite, quelle, text, woerter, fehlertext, zeiten) in Dokument-/Seitenreihenfolge.
+    quelle ist ein PIL-Image oder ein Pfad, bei Cache-Treffern None.
+    woerter gibt es nur mit positionen=True und nur für Seiten, die hier erkannt wurden.
+    - Aufträge mit bereits bekanntem Text (Cache) werden nur durchgereicht
+    - worker <= 1: sequentiell im aufrufenden Thread
+    - worker > 1: Prozess-Pool, höchstens 2 Seiten pro Worker gleichzeitig in Arbeit
+    - warteschlange: OCR auf Worker-Knoten, siehe seiten_ocr_warteschlange
+    Bei Abbruch werden wartende Seiten verworfen und der Generator endet.
+    """
+    if warteschlange is not None:
+        yield from seiten_ocr_warteschlange(auftraege, warteschlange, abbrechen_flag, {
+            "sprache": sprache, "optimierung": optimierung, "engine": engine,
+            "positionen": positionen, "kaskade": kaskade, "leerseiten": leerseiten})
+        return
+
+    if worker <= 1:
+        for datei, seite, quelle, text in auftraege:
+            if abbrechen_flag and abbrechen_flag():
+                return
+            woerter, fehler, zeiten = None, None, {}
+            if text is None:
+                text, woerter, fehler, zeiten = ocr_seite(quelle, sprache, optimierung,
+                                                          seiten_bezeichnung(datei, seite), engine, positionen,
+                                                          kaskade, leerseiten)
+            yield datei, seite, quelle, text, woerter, fehler, zeiten
+        return
+
+    pool = ProcessPoolExecutor(max_workers=worker, initializer=ocr_worker_init)
+    offen = deque()
+
+    def naechstes_ergebnis():
+        datei, seite, quelle, text, future = offen.popleft()
+        if future is None:
+            return datei, seite, quelle, text, None, None, {}
+        while True:
+            if abbrechen_flag and abbrechen_flag():
+                return None
+            try:
+                text, woerter, fehler, zeiten = future.result(timeout=0.2)
+                return datei, seite, quelle, text, woerter, fehler, zeiten
+            except FutureTimeout:
+                continue
+            except Exception as e:
+                return datei, seite, quelle, None, None, f"[!] OCR fehlgeschlagen für {seiten_bezeichnung(datei, seite)}: {e}", {}
+
+    try:
+        for datei, seite, quelle, text in auftraege:
+            if abbrechen_flag and abbrechen_flag():
+                return
+            future = None
+            if text is None:
+                future = pool.submit(ocr_seite, quelle, sprache, optimierung,
+                                     seiten_bezeichnung(datei, seite), engine, positionen, kaskade, leerseiten)
+            offen.append((datei, seite, quelle, text, future))
+            while len(offen) >= worker * 2:
+                ergebnis = naechstes_ergebnis()
+                if ergebnis is None:
+                    return
+                yield ergebnis
+        while offen:
+            ergebnis = naechstes_ergebnis()
+            if ergebnis is None:
+                return
+            yield ergebnis
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def seiten_ocr_warteschlange(auftraege, warteschlange, abbrechen_flag=None, parameter=None):
+    """
+    Wie seiten_ocr_geordnet, erkannt wird aber auf Worker-Knoten (warteschlange.warteschlange_abarbeiten):
+    - jede Seite wird verpackt (seite_als_bytes) und mit den OCR-Parametern eingestellt
+    - höchstens warteschlange.vorrat Seiten gleichzeitig in der Warteschlange
+    - Ergebnisse werden in Dokument-/Seitenreihenfolge abgeholt
+    - meldet sich warteschlange.worker_frist Sekunden lang kein Worker, endet der Lauf mit RuntimeError
+    Am Ende und bei Abbruch werden nicht abgeholte Seiten dieses Laufs entfernt.
+    """
+    lauf = uuid.uuid4().hex
+    offen = deque()
+
+    def naechstes_ergebnis():
+        datei, seite, quelle, text, auftrag = offen.popleft()
+        if auftrag is None:
+            return datei, seite, quelle, text, None, None, {}
+        if isinstance(auftrag, str):
+            return datei, seite, quelle, None, None, auftrag, {}  # konnte nicht eingestellt werden
+        warten_seit = time.monotonic()
+        while True:
+            if abbrechen_flag and abbrechen_flag():
+                return None
+            ergebnis = warteschlange.ergebnis(auftrag)
+            if ergebnis is not None:
+                return (datei, seite, quelle) + tuple(ergebnis)
+            if time.monotonic() - warten_seit > warteschlange.worker_frist:
+                if not warteschlange.aktiv(warteschlange.worker_frist):
+                    raise RuntimeError(f"Kein Worker an der Warteschlange aktiv ({warteschlange.beschreibung}, "
+                                       f"seit {warteschlange.worker_frist:g} s)")
+                warten_seit = time.monotonic()
+            time.sleep(warteschlange.abfrage_intervall)
+
+    try:
+        for datei, seite, quelle, text in auftraege:
+            if abbrechen_flag and abbrechen_flag():
+                return
+            auftrag = None
+            if text is None:
+                name = seiten_bezeichnung(datei, seite)
+                rahmen = quelle.info.get("rahmen") if isinstance(quelle, Image.Image) else None
+                try:
+                    auftrag = warteschlange.einstellen(lauf, name, seite_als_bytes(quelle),
+                                                       dict(parameter or {}, rahmen=rahmen))
+                except OSError as e:
+                    auftrag = f"[!] Seite konnte nicht eingestellt werden: {name}: {e}"
+            offen.append((datei, seite, quelle, text, auftrag))
+            while len(offen) >= warteschlange.vorrat:
+                ergebnis = naechstes_ergebnis()
+                if ergebnis is None:
+                    return
+                yield ergebnis
+        while offen:
+            ergebnis = naechstes_ergebnis()
+            if ergebnis is None:
+                return
+            yield ergebnis
+    finally:
+        warteschlange.lauf_entfernen(lauf)
+
+
+def tesseract_version(engine="auto"):
+    try:
+        return engine_fuer_prozess(engine, tessdata_pfad).version()
+    except Exception:
+        return "unbekannt"
+
 
 # ---------- OCR starten ----------
 def starte_ocr(dateien, suchbegriffe, sprache, optimierung=None,
                full_doc=False, highlight=False,
                status_signal=None, progress_signal=None,
                poppler_path=None, output_dir=None,
-               abbrechen_flag=None):
+               abbrechen_flag=None, worker=1, cache=True, index=True, fuzzy=0,
+               engine="auto", textebene=True, fehlerprotokoll=None, journal=True, formate=None,
+               positionen=False, ausschnitte=False, kaskade=True, metriken_hook=None, profil=False,
+               leerseiten=True, adaptiv=False, warteschlange=None):
     fundstellen = []
-    seiten_zaehler = 0
-    doc_index = 1
     word_docs = []
     treffer_datei = None
-    aktuelles_doc = Document() if full_doc else None
+    # kompletter Scan: docx (in Teilen zu max_seiten_pro_word_datei Seiten), txt, jsonl
+    formate = set(formate or ())
+    if full_doc:
+        formate.add("docx")
     total_files = len(dateien)
+    datei_nummer = {datei: i for i, datei in enumerate(dateien, start=1)}
+    matcher = StichwortMatcher(suchbegriffe)
+    fuzzy_matcher = FuzzyMatcher(suchbegriffe, max_abstand=fuzzy) if fuzzy else None
 
-    # temporärer PNG-Ordner für alle Dateien
-    png_dir = os.path.join(output_dir, "temp_png") if output_dir else os.path.join(os.getcwd(), "temp_png")
-    os.makedirs(png_dir, exist_ok=True)
+    # temporärer Ordner nur für ausgelagerte Seiten (Speicherbudget überschritten)
+    temp_dir = os.path.join(output_dir, "temp_seiten") if output_dir else os.path.join(os.getcwd(), "temp_seiten")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    ausgaben = ausgaben_erstellen(formate, output_dir or os.getcwd(), highlight)
+    # Wortrahmen/Konfidenz je Fundstelle nach ocr_treffer.jsonl, optional mit Bildausschnitten
+    # durchsuchbare PDF: Text liegt an den Wortrahmen, braucht also Positionen und für jede Seite das Raster
+    pdf_ausgabe = PdfAusgabe(output_dir or os.getcwd()) if "pdf" in formate else None
+    positionen = positionen or ausschnitte or pdf_ausgabe is not None
+    # adaptive Auflösung rastert nur den Textbereich; PDF-Ausgabe und Bildausschnitte brauchen die ganze Seite
+    adaptiv_aus = adaptiv and (pdf_ausgabe is not None or ausschnitte)
+    adaptiv = adaptiv and not adaptiv_aus
+    treffer_positionen = TrefferPositionen(output_dir or os.getcwd(), ausschnitte) if positionen else None
     temp_files = []
+    seiten_im_speicher = {}  # (datei, seite) -> Bytes der Seiten, die gerade in Arbeit sind
 
-    try:
-        for i, datei in enumerate(dateien, start=1):
-            if abbrechen_flag and abbrechen_flag():
-                if status_signal:
-                    status_signal.emit("[!] OCR abgebrochen.")
-                return word_docs, treffer_datei
+    kaskade = kaskade and "+" in sprache
+    version = tesseract_version(engine)
+    ocr_cache = OCRCache(tesseract_version=version) if cache else None
+    ocr_index = OCRIndex() if index else None
+    ocr_journal = None
+    if journal:
+        # Auftragsjournal im Ausgabeordner: erledigte Seiten überstehen Abbruch und Absturz
+        ocr_journal = OCRJournal(output_dir or os.getcwd(),
+                                 {"sprache": sprache, "optimierung": optimierung, "positionen": positionen,
+                                  "leerseiten": leerseiten, "adaptiv": adaptiv, "kaskade": kaskade,
+                                  "textebene": textebene, "engine": engine, "tesseract_version": version})
+        if status_signal:
+            if ocr_journal.verworfen:
+                status_signal.emit("   ↳ Journal mit anderen Einstellungen verworfen, Lauf beginnt neu")
+            elif ocr_journal.vorheriger_status in ("laeuft", "abgebrochen") and ocr_journal.erledigt():
+                status_signal.emit(f"   ↳ Unterbrochener Lauf wird fortgesetzt ({ocr_journal.erledigt()} Seiten erledigt)")
+    journal_seiten = set()  # (datei, seite), die schon im Journal stehen
+    hashes = {}
+    textebene_seiten = 0
+    # Zeiten je Stufe (Worker-Zeit für Vorverarbeitung/OCR), Herkunft je Seite, Laufbericht am Ende
+    metriken = LaufMetriken(metriken_hook)
+    herkunft = {}  # (datei, seite) -> "journal", "cache" oder "textebene"; fehlt = OCR
+    adaptiv_rahmen = {}  # (datei, seite) -> (x0, y0, dpi) des adaptiv gerasterten Ausschnitts
+    lauf_status = "fehler"
+    kaskaden_seiten = eskaliert = 0
+    # Einstellungen außer Sprache/Optimierung, die den erkannten Text ändern, als Teil des Cache-Schlüssels;
+    # kombinierte Sprachen immer mit Modus (Kaskade oder ein kombiniertes Modell)
+    cache_variante = "|".join(name for name, aktiv in (
+        ("adaptiv", adaptiv), ("kaskade", kaskade), ("kombiniert", "+" in sprache and not kaskade)) if aktiv)
+    seitenzahlen = {}  # datei -> Seitenzahl, für den Fortschritt innerhalb einer Datei
+    fortschritt = -1
+    leer_uebersprungen = {}  # datei -> [(seite, art)] der Seiten, deren OCR die Leerseitenprüfung übersprungen hat
+
+    def leerseiten_melden(datei):
+        seiten = leer_uebersprungen.pop(datei, None)
+        if seiten and status_signal:
+            status_signal.emit(f"   ↳ {os.path.basename(datei)}: {len(seiten)} Seite(n) ohne Text, OCR übersprungen: "
+                               + ", ".join(f"S. {seite} ({'leer' if art == 'leer' else 'kein Text erkennbar'})"
+                                           for seite, art in seiten))
+
+    def datei_fehler(fehlertext):
+        # Fehler einer ganzen Datei: wie ein Seitenfehler protokollieren, der Lauf geht weiter
+        metriken.zaehlen("fehler")
+        if status_signal:
+            status_signal.emit(fehlertext)
+        if fehlerprotokoll is not None:
+            fehlerprotokoll.append(fehlertext)
+        print(fehlertext)
 
+    def ohne_abbruch(seiten, datei):
+        # Raster- und Lesefehler beenden nur die betroffene Datei; bereits gelieferte Seiten bleiben
+        seiten = iter(seiten)
+        while True:
+            try:
+                wert = next(seiten)
+            except StopIteration:
+                return
+            except Exception as e:
+                datei_fehler(f"[!] Datei konnte nicht gerastert werden: {datei}: {e}")
+                return
+            yield wert
+
+    def auftraege():
+        nonlocal textebene_seiten
+        for i, datei in enumerate(dateien, start=1):
             if status_signal:
                 status_signal.emit(f"[{i}/{total_files}] Verarbeite: {os.path.basename(datei)}")
-            if progress_signal:
-                progress_signal.emit(int((i-1)/total_files*100))
 
-            paths_to_process = []
-            if datei.lower().endswith(".pdf"):
-                if status_signal:
-                    status_signal.emit("   ↳ PDF erkannt, wandle um...")
-                pdf_pngs = pdf_to_png(datei, png_dir, poppler_path, status_signal=status_signal)
-                paths_to_process.extend(pdf_pngs)
-                temp_files.extend(pdf_pngs)
+            ist_pdf = datei.lower().endswith(".pdf")
+            if ocr_cache or ocr_index:
+                try:
+                    with metriken.messen("hash"):
+                        hashes[datei] = datei_hash(datei)
+                except OSError as e:
+                    if status_signal:
+                        status_signal.emit(f"[!] Datei konnte nicht gelesen werden: {datei}: {e}")
+
+            seitenzahl = 1
+            if ist_pdf and (ocr_cache or textebene or ocr_journal):
+                try:
+                    with metriken.messen("pdfinfo"):
+                        seitenzahl = pdf_seitenzahl(datei, poppler_path)
+                except Exception as e:
+                    # kaputte oder unlesbare PDF: nur diese Datei auslassen, nicht den ganzen Stapel
+                    datei_fehler(f"[!] Seitenzahl nicht ermittelbar für {datei}, Datei übersprungen: {e}")
+                    continue
+            elif datei.lower().endswith(mehrseitige_bildformate):
+                try:
+                    seitenzahl = bild_seitenzahl(datei)
+                except Exception:
+                    seitenzahl = 1
+            seitenzahlen[datei] = seitenzahl
+
+            # Seiten, deren Text schon feststeht (Cache oder Textebene), werden nicht gerastert
+            fertig = {}
+
+            # -------- im Journal erledigte Seiten (fortgesetzter Lauf) --------
+            if ocr_journal:
+                with metriken.messen("journal"):
+                    fertig.update((n, t) for n, t in ocr_journal.seiten(datei).items() if n <= seitenzahl)
+                journal_seiten.update((datei, n) for n in fertig)
+                herkunft.update(((datei, n), "journal") for n in fertig)
+                if fertig and status_signal:
+                    status_signal.emit(f"   ↳ {len(fertig)}/{seitenzahl} Seiten aus dem Journal")
+
+            # -------- Cache vor dem Rastern prüfen (speichert keine Wortpositionen) --------
+            if ocr_cache and not positionen and datei in hashes and len(fertig) < seitenzahl:
+                aus_cache = 0
+                with metriken.messen("cache"):
+                    for seite in range(1, seitenzahl + 1):
+                        if seite in fertig:
+                            continue
+                        text = ocr_cache.hole(hashes[datei], seite, sprache, optimierung, cache_variante)
+                        if text is not None:
+                            fertig[seite] = text
+                            herkunft[(datei, seite)] = "cache"
+                            aus_cache += 1
+                if aus_cache and status_signal:
+                    status_signal.emit(f"   ↳ {aus_cache}/{seitenzahl} Seiten aus dem Cache")
+
+            # -------- vorhandene Textebene statt OCR --------
+            if ist_pdf and textebene and not pdf_ausgabe and len(fertig) < seitenzahl:
+                with metriken.messen("textebene"):
+                    texte = pdf_textebene(datei, poppler_path)
+                mit_text = {n: t for n, t in texte.items() if n not in fertig and n <= seitenzahl}
+                if mit_text:
+                    fertig.update(mit_text)
+                    herkunft.update(((datei, n), "textebene") for n in mit_text)
+                    textebene_seiten += len(mit_text)
+                    if status_signal:
+                        status_signal.emit(f"   ↳ {len(mit_text)}/{seitenzahl} Seiten mit Textebene, ohne OCR")
+
+            if ist_pdf:
+                fehlend = None
+                if fertig and not pdf_ausgabe:
+                    fehlend = [n for n in range(1, seitenzahl + 1) if n not in fertig]
+                if fehlend != []:
+                    if status_signal:
+                        status_signal.emit("   ↳ PDF erkannt, wandle um...")
+                    # Seiten werden verarbeitet, sobald sie gerastert sind
+                    rasterer = pdf_seiten_adaptiv if adaptiv else pdf_seiten
+                    seiten_to_process = metriken.gemessen(rasterer(datei, poppler_path, seiten=fehlend), "rastern")
+                else:
+                    seiten_to_process = []
             else:
-                png_file = image_to_png(datei, png_dir)
-                if png_file:
-                    paths_to_process.append(png_file)
-                    temp_files.append(png_file)
+                fehlend = None
+                if fertig and not pdf_ausgabe:
+                    fehlend = [n for n in range(1, seitenzahl + 1) if n not in fertig]
+                # Bilddateien werden erst beim OCR geladen, ohne Umweg über PNG; mehrseitige TIFFs Frame für Frame
+                seiten_to_process = metriken.gemessen(bild_seiten(datei, fehlend), "laden") if fehlend != [] else []
 
-            for pfad in paths_to_process:
-                if abbrechen_flag and abbrechen_flag():
+            # fertige und neu gerasterte Seiten in Seitenreihenfolge zusammenführen
+            fertig_seiten = sorted(fertig)
+            for seite, total_pages, quelle in ohne_abbruch(seiten_to_process, datei):
+                while fertig_seiten and fertig_seiten[0] < seite:
+                    n = fertig_seiten.pop(0)
+                    yield datei, n, None, fertig[n]
+                if fertig_seiten and fertig_seiten[0] == seite:
+                    # schon erledigt (Journal), Raster nur für die PDF-Ausgabe
+                    fertig_seiten.pop(0)
+                    yield datei, seite, quelle, fertig[seite]
+                    continue
+
+                name = seiten_bezeichnung(datei, seite)
+                seitenzahlen[datei] = total_pages
+                if isinstance(quelle, Image.Image):
+                    metriken.zaehlen("pixel", quelle.width * quelle.height)
+                    rahmen = quelle.info.get("rahmen") if adaptiv else None
+                    if rahmen:
+                        adaptiv_rahmen[(datei, seite)] = rahmen
                     if status_signal:
-                        status_signal.emit("[!] OCR abgebrochen.")
-                    return word_docs, treffer_datei
+                        art = "PDF" if ist_pdf else "Bild"
+                        zusatz = f" ({rahmen[2]} dpi, {quelle.width}×{quelle.height} px)" if rahmen else ""
+                        status_signal.emit(f"{art} '{os.path.basename(datei)}': Seite {seite}/{total_pages} konvertiert{zusatz}...")
+                    groesse = seiten_bytes(quelle)
+                    if sum(seiten_im_speicher.values()) + groesse > seiten_speicher_budget:
+                        with metriken.messen("auslagern"):
+                            quelle = seite_auslagern(quelle, temp_dir, name)
+                        temp_files.append(quelle)
+                    else:
+                        seiten_im_speicher[(datei, seite)] = groesse
+                if status_signal:
+                    status_signal.emit(f"   ↳ OCR: {name} wird verarbeitet...")
+                yield datei, seite, quelle, None
+            for n in fertig_seiten:
+                yield datei, n, None, fertig[n]
+
+    if status_signal:
+        if optimierung in preprocessing_pipelines:
+            stufen = " → ".join(preprocessing_pipelines[optimierung])
+            status_signal.emit(f"   ↳ Bildoptimierung ({optimierung}): {stufen}...")
+        else:
+            status_signal.emit("   ↳ Keine Bildoptimierung...")
+        if warteschlange is not None:
+            status_signal.emit(f"   ↳ OCR über Worker-Knoten ({warteschlange.beschreibung})...")
+        elif worker > 1:
+            status_signal.emit(f"   ↳ Parallele OCR mit {worker} Prozessen...")
+        status_signal.emit(f"   ↳ OCR-Engine: {engine_fuer_prozess(engine, tessdata_pfad).name}")
+        if adaptiv:
+            status_signal.emit("   ↳ Adaptive Auflösung: Vorschau, dann nur der Textbereich in passender Auflösung")
+        elif adaptiv_aus:
+            status_signal.emit("   ↳ Adaptive Auflösung aus: PDF-Ausgabe und Bildausschnitte brauchen die ganze Seite")
+        if kaskade:
+            status_signal.emit(f"   ↳ Modell-Kaskade: {' → '.join(sprache.split('+'))} (weiter nur bei schwachen Seiten)")
+
+    # cProfile erfasst nur diesen Thread; OCR in Worker-Prozessen erscheint dort als Wartezeit
+    profiler = cProfile.Profile() if profil else None
+    if profiler:
+        profiler.enable()
 
+    try:
+        letzte_datei = None
+        for datei, seite, quelle, text, woerter, fehlertext, zeiten in seiten_ocr_geordnet(
+                auftraege(), sprache, optimierung, worker, abbrechen_flag, engine, positionen, kaskade, leerseiten,
+                warteschlange):
+            seiten_im_speicher.pop((datei, seite), None)
+            leer = next((stufe[10:] for stufe in zeiten if stufe.startswith("leerseite ")), None)
+            metriken.seite(datei, seite, herkunft.pop((datei, seite), "leerseite" if leer else "ocr"), zeiten, fehlertext)
+            if leer:
+                leer_uebersprungen.setdefault(datei, []).append((seite, leer))
+            if letzte_datei is not None and datei != letzte_datei:
+                leerseiten_melden(letzte_datei)
+            rahmen = adaptiv_rahmen.pop((datei, seite), None)
+            if rahmen and woerter is not None:
+                # Wortrahmen vom Ausschnitt auf die ganze Seite bei pdf_dpi umrechnen (wie ohne adaptiv)
+                woerter.verschieben(rahmen[0], rahmen[1])
+                woerter.skalieren(pdf_dpi / rahmen[2], pdf_dpi / rahmen[2])
+            if kaskade and "ocr" in zeiten:
+                kaskaden_seiten += 1
+                if sum(stufe.startswith("ocr ") for stufe in zeiten) > 1:
+                    eskaliert += 1
+            if progress_signal:
+                # Fortschritt nach Dateien und innerhalb der Datei nach Seiten
+                anteil = min(seite / seitenzahlen[datei], 1) if seitenzahlen.get(datei, 0) > 1 else 0
+                wert = int((datei_nummer[datei] - 1 + anteil) / total_files * 100)
+                if datei != letzte_datei or wert != fortschritt:
+                    progress_signal.emit(wert)
+                    fortschritt = wert
+            letzte_datei = datei
+
+            if fehlertext:
                 if status_signal:
-                    status_signal.emit(f"   ↳ OCR: {os.path.basename(pfad)} wird verarbeitet...")
+                    status_signal.emit(fehlertext)
+                if fehlerprotokoll is not None:
+                    fehlerprotokoll.append(fehlertext)
+                print(fehlertext)
+                if pdf_ausgabe and quelle is not None:
+                    # Seite bleibt in der durchsuchbaren PDF, nur ohne Textebene
+                    try:
+                        with metriken.messen("pdf"):
+                            pdf_ausgabe.seite(datei, bild_laden(quelle))
+                    except Exception as e:
+                        print(f"[!] Seite fehlt in der PDF-Ausgabe: {seiten_bezeichnung(datei, seite)}: {e}")
+                temp_datei_loeschen(quelle, temp_files)
+                continue  # Bild überspringen
 
-                # -------- Bildoptimierung --------
-                try:
-                    if optimierung == "pillow":
-                        if status_signal:
-                            status_signal.emit(f"   ↳ Bildoptimierung mit Pillow...")
-                        bild = preprocess_pillow(pfad)
-                    elif optimierung == "opencv":
-                        if status_signal:
-                            status_signal.emit(f"   ↳ Bildoptimierung mit OpenCV...")
-                        temp_img = Image.open(pfad).convert("L")
-                        temp_np = np.array(temp_img, dtype=np.uint8)
-                        if temp_np.size == 0:
-                            raise ValueError("Bild ist leer.")
-                        bild = preprocess_opencv(temp_np)
-                    elif optimierung == "kombiniert":
-                        if status_signal:
-                            status_signal.emit(f"   ↳ Bildoptimierung kombiniert: Pillow + OpenCV...")
-                        temp_img = preprocess_pillow(pfad)
-                        temp_np = np.array(temp_img, dtype=np.uint8)
-                        if temp_np.size == 0:
-                            raise ValueError("Bild ist leer.")
-                        bild = preprocess_opencv(temp_np)
-                    else:
-                        if status_signal:
-                            status_signal.emit(f"   ↳ Keine Bildoptimierung...")
-                        bild = Image.open(pfad)
+            # "ocr" in zeiten: Seite wurde gerade erkannt (nicht aus Cache, Journal oder Textebene)
+            if "ocr" in zeiten and ocr_cache and datei in hashes:
+                with metriken.messen("cache"):
+                    ocr_cache.speichere(hashes[datei], seite, sprache, optimierung, text, cache_variante)
+            if ocr_index and datei in hashes:
+                with metriken.messen("index"):
+                    ocr_index.seite_aufnehmen(datei, hashes[datei], seite, text)
+            if ocr_journal:
+                with metriken.messen("journal"):
+                    if (datei, seite) not in journal_seiten:
+                        ocr_journal.seite_speichern(datei, seite, text, woerter)
+                    elif positionen:
+                        woerter = ocr_journal.woerter(datei, seite)
 
-                    if np.array(bild).size == 0:
-                        raise ValueError("Bild ist leer oder konnte nicht gelesen werden.")
+            seitenbild = []  # wird nur für Ausschnitte und PDF-Ausgabe geladen, dann einmal pro Seite
 
-                except Exception as e:
-                    fehlertext = f"[!] Bildoptimierung fehlgeschlagen für {pfad}: {e}"
-                    if status_signal:
-                        status_signal.emit(fehlertext)
-                    print(fehlertext)
-                    continue  # Bild überspringen
-
-                # OCR starten
-                if bild is not None:
-                    text = pytesseract.image_to_string(bild, lang=sprache)
-
-                    # -------- Word-Dokument --------
-                    if full_doc:
-                        if aktuelles_doc.paragraphs:
-                            aktuelles_doc.add_page_break()
-                        aktuelles_doc.add_heading(os.path.basename(datei), level=1)
-
-                        for line in text.splitlines():
-                            if abbrechen_flag and abbrechen_flag():
-                                if status_signal:
-                                    status_signal.emit("[!] OCR abgebrochen.")
-                                return word_docs, treffer_datei
-
-                            p = aktuelles_doc.add_paragraph(line)
-                            if highlight:
-                                for wort in suchbegriffe:
-                                    if wort in line.lower():
-                                        start_idx = line.lower().find(wort)
-                                        p.clear()
-                                        p.add_run(line[:start_idx])
-                                        run = p.add_run(line[start_idx:start_idx+len(wort)])
-                                        run.font.color.rgb = RGBColor(255, 0, 0)
-                                        p.add_run(line[start_idx+len(wort):])
-
-                    # Treffer erfassen
-                    for line in text.splitlines():
-                        if abbrechen_flag and abbrechen_flag():
-                            if status_signal:
-                                status_signal.emit("[!] OCR abgebrochen.")
-                            return word_docs, treffer_datei
-
-                        treffer = ist_treffer(line, suchbegriffe)
-                        if treffer:
-                            fundstellen.append(f"{os.path.basename(pfad)}: {', '.join(treffer)} → {bereinige_zeile(line)}")
-
-        # Letztes Word-Dokument speichern
-        if full_doc and aktuelles_doc and aktuelles_doc.paragraphs:
-            doc_name = f"ocr_ausgabe_{doc_index}.docx"
-            gespeicherte_datei = sichere_datei_speichern(aktuelles_doc, doc_name, output_dir)
-            if gespeicherte_datei:
-                word_docs.append(gespeicherte_datei)
+            def seitenbild_laden():
+                if not seitenbild:
+                    seitenbild.append(bild_laden(quelle) if quelle is not None else None)
+                return seitenbild[0]
+
+            for ausgabe in ausgaben:
+                ausgabe.seite_beginnen(datei, seite)
+
+            # Jede Zeile wird genau einmal durchsucht; die Fundstellen dienen
+            # sowohl der Trefferliste als auch der Markierung im Word-Dokument
+            suche_start = time.perf_counter()
+            ausgabe_dauer = 0.0
+            for zeile_nr, line in enumerate(text.splitlines()):
+                if abbrechen_flag and abbrechen_flag():
+                    break
+
+                funde = matcher.finde(line)
+                unscharf = []
+                if fuzzy_matcher:
+                    # exakte Treffer haben Vorrang vor unscharfen desselben Begriffs
+                    exakt = {idx for _, _, idx in funde}
+                    unscharf = [f for f in fuzzy_matcher.finde(line) if f[2] not in exakt]
+
+                # Treffer erfassen
+                treffer = []
+                if funde or unscharf:
+                    treffer = matcher.begriffe(funde)
+                    treffer += [f"{suchbegriffe[idx]} ≈ {form} ({abstand:g})" for _, _, idx, form, abstand in unscharf]
+                    eintrag = f"{seiten_bezeichnung(datei, seite)}: {', '.join(treffer)} → {bereinige_zeile(line)}"
+
+                    if treffer_positionen:
+                        details = []
+                        for start_idx, ende_idx, idx, *_ in funde + unscharf:
+                            box = woerter.box(zeile_nr, start_idx, ende_idx) if woerter is not None else None
+                            details.append({
+                                "begriff": suchbegriffe[idx], "start": start_idx, "ende": ende_idx,
+                                "box": list(box[0]) if box else None,
+                                "konfidenz": round(box[1], 1) if box else None,
+                            })
+                        treffer_positionen.zeile(seiten_bezeichnung(datei, seite), datei, seite, zeile_nr + 1,
+                                                 line, details, seitenbild_laden)
+                        erste = next((d for d in details if d["box"]), None)
+                        if erste:
+                            x0, y0 = erste["box"][:2]
+                            eintrag += f"  [S. {seite}, x {x0}, y {y0}, {erste['konfidenz']:.0f} %]"
+                    fundstellen.append(eintrag)
+
+                ausgabe_start = time.perf_counter()
+                for ausgabe in ausgaben:
+                    ausgabe.zeile(line, funde + [f[:3] for f in unscharf], treffer)
+                    if treffer:
+                        ausgabe.fundstelle(eintrag)
+                ausgabe_dauer += time.perf_counter() - ausgabe_start
+            metriken.zeit("suche", time.perf_counter() - suche_start - ausgabe_dauer)
+            metriken.zeit("ausgabe", ausgabe_dauer)
+
+            # Seite ist fertig – Ausgaben schreiben, ausgelagerte Datei sofort freigeben
+            with metriken.messen("ausgabe"):
+                for ausgabe in ausgaben:
+                    ausgabe.seite_beenden()
+                if treffer_positionen:
+                    treffer_positionen.seite_beenden()
+            if pdf_ausgabe and quelle is not None:
+                with metriken.messen("pdf"):
+                    pdf_ausgabe.seite(datei, seitenbild_laden(), woerter)
+            temp_datei_loeschen(quelle, temp_files)
+        if letzte_datei is not None:
+            leerseiten_melden(letzte_datei)
+
+        # letzten Word-Teil speichern, Text-/JSONL-Dateien schließen (auch bei Abbruch)
+        if treffer_positionen:
+            ausgaben.append(treffer_positionen)
+            treffer_positionen = None
+        if pdf_ausgabe:
+            ausgaben.append(pdf_ausgabe)
+            pdf_ausgabe = None
+        with metriken.messen("ausgabe"):
+            for ausgabe in ausgaben:
+                word_docs += ausgabe.schliessen()
+        ausgaben = []
+
+        if abbrechen_flag and abbrechen_flag():
+            lauf_status = "abgebrochen"
+            if ocr_journal:
+                ocr_journal.status_setzen("abgebrochen")
+            if status_signal:
+                status_signal.emit("[!] OCR abgebrochen.")
+                if ocr_journal:
+                    status_signal.emit(f"   ↳ {ocr_journal.erledigt()} Seiten im Journal gesichert – "
+                                       "erneut starten (gleicher Ausgabeordner), um fortzusetzen.")
+            return word_docs, treffer_datei
 
         # Treffer immer als Word-Dokument speichern
         if fundstellen:
@@ -218,26 +941,88 @@ def starte_ocr(dateien, suchbegriffe, sprache, optimierung=None,
             for line in fundstellen:
                 treffer_doc.add_paragraph(line)
             treffer_name = "ocr_treffer.docx"
-            gespeicherte_datei = sichere_datei_speichern(treffer_doc, treffer_name, output_dir)
+            with metriken.messen("ausgabe"):
+                gespeicherte_datei = sichere_datei_speichern(treffer_doc, treffer_name, output_dir)
             if gespeicherte_datei:
                 word_docs.append(gespeicherte_datei)
                 treffer_datei = gespeicherte_datei
 
+        if ocr_journal:
+            ocr_journal.status_setzen("abgeschlossen")
+        lauf_status = "abgeschlossen"
+
     finally:
-        # ---------- temporäre PNG-Dateien löschen ----------
-        if temp_files:
-            for f in temp_files:
-                try:
-                    os.remove(f)
-                except:
-                    pass
-            # Optional den Ordner komplett entfernen, wenn leer
+        if profiler:
+            profiler.disable()
+        if treffer_positionen:
+            ausgaben.append(treffer_positionen)
+        if pdf_ausgabe:
+            ausgaben.append(pdf_ausgabe)
+        for ausgabe in ausgaben:
+            try:
+                ausgabe.schliessen()
+            except Exception as e:
+                print(f"[!] Ausgabe konnte nicht geschlossen werden: {e}")
+        if ocr_journal:
+            ocr_journal.schliessen()
+        if ocr_cache:
+            if status_signal:
+                status_signal.emit(f"   ↳ {ocr_cache.statistik()}")
+            metriken.zaehlen("cache_treffer", ocr_cache.treffer)
+            metriken.zaehlen("cache_fehlschlaege", ocr_cache.fehlschlaege)
+            ocr_cache.schliessen()
+        if ocr_index:
+            ocr_index.schliessen()
+
+        # ---------- Laufbericht (auch bei Abbruch und Fehlern) ----------
+        bericht_ordner = output_dir or os.getcwd()
+        try:
+            bericht = metriken.speichern(
+                os.path.join(bericht_ordner, "ocr_laufbericht.json"),
+                status=lauf_status, treffer=len(fundstellen), dateien=total_files,
+                einstellungen={"sprache": sprache, "optimierung": optimierung, "engine": engine,
+                               "worker": worker, "formate": sorted(formate), "positionen": positionen,
+                               "kaskade": kaskade, "fuzzy": fuzzy, "cache": cache, "textebene": textebene,
+                               "warteschlange": warteschlange.beschreibung if warteschlange is not None else None},
+            )
+            if status_signal:
+                status_signal.emit(f"   ↳ Laufbericht: {bericht['seiten']} Seiten in {bericht['dauer_s']:.1f} s "
+                                   f"({bericht['seiten_pro_s'] or 0:.2f} Seiten/s) → ocr_laufbericht.json")
+        except OSError as e:
+            print(f"[!] Laufbericht konnte nicht gespeichert werden: {e}")
+        if profiler:
+            profil_speichern(profiler, bericht_ordner)
+            if status_signal:
+                status_signal.emit("   ↳ Profil: ocr_profil.prof, ocr_profil.txt")
+
+        # ---------- ausgelagerte Seiten löschen ----------
+        for f in temp_files:
             try:
-                if os.path.exists(png_dir) and not os.listdir(png_dir):
-                    os.rmdir(png_dir)
+                os.remove(f)
             except:
                 pass
+        # Optional den Ordner komplett entfernen, wenn leer
+        try:
+            if os.path.exists(temp_dir) and not os.listdir(temp_dir):
+                os.rmdir(temp_dir)
+        except:
+            pass
 
+    if status_signal and kaskaden_seiten:
+        modell_zeiten = ", ".join(f"{stufe[4:]} {dauer:.1f} s" for stufe, dauer in metriken.stufen.items()
+                                  if stufe.startswith("ocr "))
+        status_signal.emit(f"   ↳ Kaskade: {eskaliert}/{kaskaden_seiten} Seiten mit weiteren Modellen erneut erkannt "
+                           f"(Zeit je Modell: {modell_zeiten})")
+    if status_signal and metriken.stufen:
+        status_signal.emit("   ↳ Zeiten: " + ", ".join(f"{stufe} {dauer:.1f} s" for stufe, dauer in metriken.stufen.items()
+                                                 if " " not in stufe))
+    leerseiten_info = metriken.leerseiten()
+    if status_signal and leerseiten_info:
+        gespart = leerseiten_info["gespart_s"]
+        status_signal.emit(f"   ↳ {leerseiten_info['seiten']} Seiten ohne Text übersprungen"
+                           + (f" (ca. {gespart:.1f} s OCR gespart)" if gespart else ""))
+    if status_signal and textebene_seiten:
+        status_signal.emit(f"   ↳ {textebene_seiten} PDF-Seiten über die vorhandene Textebene (ohne OCR)")
     if status_signal:
         status_signal.emit(f"\n[✔] OCR abgeschlossen. {len(fundstellen)} Treffer.\nErgebnisse: {', '.join(word_docs)}")
     print(f"[✔] OCR abgeschlossen. {len(fundstellen)} Treffer. Ergebnisse: {', '.join(word_docs)}")
@@ -246,3 +1031,38 @@ def starte_ocr(dateien, suchbegriffe, sprache, optimierung=None,
         progress_signal.emit(100)
 
     return word_docs, treffer_datei
+
+
+# ---------- Suche im Volltext-Index (ohne OCR) ----------
+def index_suche(suchbegriffe, output_dir=None, status_signal=None, index_pfad=None):
+    """
+    Beantwortet neue Suchbegriffe über alle bereits erkannten Seiten aus dem Index.
+    Schreibt die Treffer wie starte_ocr als ocr_treffer.docx, wenn ein Ausgabeordner gesetzt ist.
+    """
+    start = time.perf_counter()
+    ocr_index = OCRIndex(index_pfad)
+    try:
+        ergebnisse = ocr_index.suche(suchbegriffe)
+        seiten = ocr_index.seitenzahl()
+    finally:
+        ocr_index.schliessen()
+    dauer_ms = (time.perf_counter() - start) * 1000
+
+    fundstellen = [
+        f"{seiten_bezeichnung(datei, seite)}: {', '.join(treffer)} → {bereinige_zeile(text)}"
+        for datei, seite, _, text, treffer in ergebnisse
+    ]
+    if status_signal:
+        status_signal.emit(f"[✔] Index-Suche über {seiten} Seiten: {len(fundstellen)} Treffer in {dauer_ms:.0f} ms.")
+        for line in fundstellen:
+            status_signal.emit(f"   {line}")
+
+    treffer_datei = None
+    if fundstellen and output_dir:
+        treffer_doc = Document()
+        treffer_doc.add_heading("OCR Treffer (Index)", level=1)
+        for line in fundstellen:
+            treffer_doc.add_paragraph(line)
+        treffer_datei = sichere_datei_speichern(treffer_doc, "ocr_treffer.docx", output_dir)
+
+    return fundstellen, treffer_datei
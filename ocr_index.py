@@ -0,0 +1,97 @@
+# ocr_index.py
+import os
+import sqlite3
+
+from utils import app_daten_ordner, ist_treffer, StichwortMatcher
+
+
+# ---------- Volltext-Index ----------
+class OCRIndex:
+    """
+    Persistenter Volltext-Index (SQLite FTS5, Trigramm-Tokenizer) über alle erkannten Zeilen.
+    - jede Zeile mit Datei, Seite und Zeilennummer
+    - Trigramme erlauben Teilwortsuche wie bei ist_treffer, ohne Groß-/Kleinschreibung
+    - eine Seite wird beim erneuten Erkennen ersetzt, nicht doppelt aufgenommen
+    """
+
+    def __init__(self, pfad=None):
+        if not pfad:
+            pfad = os.path.join(app_daten_ordner, "ocr_index.sqlite")
+        os.makedirs(os.path.dirname(pfad), exist_ok=True)
+        self.pfad = pfad
+
+        self.conn = sqlite3.connect(pfad)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS zeilen (
+                id INTEGER PRIMARY KEY,
+                datei_hash TEXT NOT NULL,
+                datei TEXT NOT NULL,
+                seite INTEGER NOT NULL,
+                zeile INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS zeilen_seite ON zeilen (datei_hash, seite);
+            CREATE VIRTUAL TABLE IF NOT EXISTS zeilen_fts USING fts5(
+                text, content='zeilen', content_rowid='id', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS zeilen_ai AFTER INSERT ON zeilen BEGIN
+                INSERT INTO zeilen_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS zeilen_ad AFTER DELETE ON zeilen BEGIN
+                INSERT INTO zeilen_fts(zeilen_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+        self.conn.commit()
+
+    def seite_aufnehmen(self, datei, datei_hash, seite, text):
+        self.conn.execute("DELETE FROM zeilen WHERE datei_hash=? AND seite=?", (datei_hash, seite))
+        self.conn.executemany(
+            "INSERT INTO zeilen (datei_hash, datei, seite, zeile, text) VALUES (?, ?, ?, ?, ?)",
+            [(datei_hash, datei, seite, nr, line)
+             for nr, line in enumerate(text.splitlines(), start=1) if line.strip()]
+        )
+        self.conn.commit()
+
+    def suche(self, suchbegriffe):
+        """
+        Liefert [(datei, seite, zeile, text, treffer), ...] sortiert nach Datei/Seite/Zeile.
+        Begriffe ab 3 Zeichen laufen über den Trigramm-Index, kürzere über LIKE.
+        Das Ergebnis wird mit ist_treffer bestätigt, damit es exakt der OCR-Suche entspricht.
+        """
+        lang = [w for w in suchbegriffe if len(w) >= 3]
+        kurz = [w for w in suchbegriffe if 0 < len(w) < 3]
+        ids = set()
+
+        if lang:
+            ausdruck = " OR ".join('"' + w.replace('"', '""') + '"' for w in lang)
+            ids.update(r[0] for r in self.conn.execute(
+                "SELECT rowid FROM zeilen_fts WHERE zeilen_fts MATCH ?", (ausdruck,)))
+        for wort in kurz:
+            ids.update(r[0] for r in self.conn.execute(
+                "SELECT id FROM zeilen WHERE text LIKE ?", (f"%{wort}%",)))
+        if not ids:
+            return []
+
+        matcher = StichwortMatcher(suchbegriffe)
+        ergebnisse = []
+        ids = sorted(ids)
+        for start in range(0, len(ids), 500):
+            block = ids[start:start + 500]
+            zeilen = self.conn.execute(
+                f"SELECT datei, seite, zeile, text FROM zeilen WHERE id IN ({','.join('?' * len(block))})",
+                block
+            )
+            for datei, seite, zeile, text in zeilen:
+                treffer = ist_treffer(text, matcher)
+                if treffer:
+                    ergebnisse.append((datei, seite, zeile, text, treffer))
+
+        ergebnisse.sort(key=lambda e: (e[0], e[1], e[2]))
+        return ergebnisse
+
+    def seitenzahl(self):
+        return self.conn.execute("SELECT COUNT(DISTINCT datei_hash || ':' || seite) FROM zeilen").fetchone()[0]
+
+    def schliessen(self):
+        self.conn.close()
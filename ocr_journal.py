@@ -0,0 +1,112 @@
+# ocr_journal.py
+import json
+import os
+import sqlite3
+
+from ocr_woerter import SeitenWoerter
+
+journal_dateiname = "ocr_journal.sqlite"
+
+
+# ---------- Auftragsjournal ----------
+class OCRJournal:
+    """
+    Journal eines Stapellaufs im Ausgabeordner (SQLite), damit abgebrochene Läufe fortgesetzt werden können.
+    - jede erkannte Seite wird sofort mit ihrem Text festgehalten
+    - ein neuer Lauf mit denselben Einstellungen überspringt diese Seiten
+    - geänderte Dateien (Größe/Änderungszeit) und andere Einstellungen verwerfen die alten Seiten
+    - fortgesetzt werden nur unterbrochene Läufe ("laeuft", "abgebrochen"); nach einem abgeschlossenen
+      Lauf beginnt der nächste neu
+    """
+
+    def __init__(self, output_dir, einstellungen):
+        os.makedirs(output_dir, exist_ok=True)
+        self.pfad = os.path.join(output_dir, journal_dateiname)
+        self.conn = sqlite3.connect(self.pfad)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS auftrag (
+                schluessel TEXT PRIMARY KEY,
+                wert TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dateien (
+                datei TEXT PRIMARY KEY,
+                groesse INTEGER NOT NULL,
+                geaendert REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS seiten (
+                datei TEXT NOT NULL,
+                seite INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                woerter BLOB,
+                PRIMARY KEY (datei, seite)
+            );
+        """)
+        spalten = [s[1] for s in self.conn.execute("PRAGMA table_info(seiten)")]
+        if "woerter" not in spalten:
+            self.conn.execute("ALTER TABLE seiten ADD COLUMN woerter BLOB")
+
+        einstellungen = json.dumps(einstellungen, sort_keys=True)
+        self.verworfen = False
+        if self._wert("einstellungen") != einstellungen:
+            # andere Sprache/Optimierung: alte Ergebnisse passen nicht mehr
+            self.verworfen = self.erledigt() > 0
+            self.conn.execute("DELETE FROM seiten")
+            self.conn.execute("DELETE FROM dateien")
+            self._setze("einstellungen", einstellungen)
+        self.vorheriger_status = self._wert("status")
+        if self.vorheriger_status not in (None, "laeuft", "abgebrochen"):
+            self.conn.execute("DELETE FROM seiten")
+            self.conn.execute("DELETE FROM dateien")
+        self._setze("status", "laeuft")
+        self.conn.commit()
+
+    def _wert(self, schluessel):
+        zeile = self.conn.execute("SELECT wert FROM auftrag WHERE schluessel=?", (schluessel,)).fetchone()
+        return zeile[0] if zeile else None
+
+    def _setze(self, schluessel, wert):
+        self.conn.execute("INSERT OR REPLACE INTO auftrag VALUES (?, ?)", (schluessel, wert))
+
+    def seiten(self, datei):
+        """Liefert {seite: text} der schon erledigten Seiten; eine geänderte Datei beginnt von vorn."""
+        try:
+            st = os.stat(datei)
+        except OSError:
+            return {}
+        zeile = self.conn.execute("SELECT groesse, geaendert FROM dateien WHERE datei=?", (datei,)).fetchone()
+        if zeile != (st.st_size, st.st_mtime):
+            self.conn.execute("DELETE FROM seiten WHERE datei=?", (datei,))
+            self.conn.execute("INSERT OR REPLACE INTO dateien VALUES (?, ?, ?)", (datei, st.st_size, st.st_mtime))
+            self.conn.commit()
+            return {}
+        return dict(self.conn.execute("SELECT seite, text FROM seiten WHERE datei=?", (datei,)))
+
+    def seite_speichern(self, datei, seite, text, woerter=None):
+        # sofort festschreiben, damit ein Absturz höchstens die laufenden Seiten kostet
+        self.conn.execute(
+            "INSERT OR REPLACE INTO seiten (datei, seite, text, woerter) VALUES (?, ?, ?, ?)",
+            (datei, seite, text, woerter.als_bytes() if woerter is not None else None)
+        )
+        self.conn.commit()
+
+    def woerter(self, datei, seite):
+        """Wortpositionen einer erledigten Seite (SeitenWoerter) oder None."""
+        zeile = self.conn.execute(
+            "SELECT text, woerter FROM seiten WHERE datei=? AND seite=?", (datei, seite)
+        ).fetchone()
+        if zeile is None or zeile[1] is None:
+            return None
+        return SeitenWoerter.aus_bytes(zeile[0], zeile[1])
+
+    def erledigt(self):
+        return self.conn.execute("SELECT COUNT(*) FROM seiten").fetchone()[0]
+
+    def status_setzen(self, status):
+        # "laeuft", "abgebrochen" oder "abgeschlossen"
+        self._setze("status", status)
+        self.conn.commit()
+
+    def schliessen(self):
+        self.conn.close()
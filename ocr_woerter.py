@@ -0,0 +1,95 @@
+# ocr_woerter.py
+import io
+
+import numpy as np
+
+
+# ---------- Wortpositionen einer Seite ----------
+class SeitenWoerter:
+    """
+    Wörter einer Seite mit Rahmen und Konfidenz aus Tesseracts TSV-Ausgabe (image_to_data).
+    - Rahmen, Konfidenz und Lage im Text als NumPy-Arrays (kompakt, schnell zwischen Prozessen)
+    - text ist der daraus aufgebaute Seitentext (Zeilen wie bei image_to_string, Absätze mit Leerzeile)
+    - box() liefert zu einer Fundstelle im Text den umschließenden Rahmen und die Konfidenz
+    """
+
+    def __init__(self, text, boxen, konfidenz, zeile, start, ende):
+        self.text = text
+        self.boxen = boxen          # int32 (n, 4): x0, y0, x1, y1 in Pixeln der Seite
+        self.konfidenz = konfidenz  # float32 (n,): 0–100, -1 = unbekannt
+        self.zeile = zeile          # int32 (n,): Zeilennummer in text.splitlines() (ab 0)
+        self.start = start          # int32 (n,): Zeichenposition des Worts in seiner Zeile
+        self.ende = ende            # int32 (n,)
+
+    @classmethod
+    def aus_tsv(cls, tsv):
+        zeilen = []
+        boxen, konfidenz, zeile, start, ende = [], [], [], [], []
+        aktuelle_zeile = letzter_absatz = None
+        for eintrag in tsv.splitlines():
+            felder = eintrag.split("\t")
+            # level 5 = Wort; Kopfzeile und Block/Absatz/Zeile-Einträge überspringen
+            if len(felder) < 12 or felder[0] != "5":
+                continue
+            wort = felder[11].strip()
+            if not wort:
+                continue
+            absatz = (felder[1], felder[2], felder[3])
+            if absatz + (felder[4],) != aktuelle_zeile:
+                if zeilen and absatz != letzter_absatz:
+                    zeilen.append([])  # Leerzeile zwischen Absätzen
+                zeilen.append([])
+                aktuelle_zeile, letzter_absatz = absatz + (felder[4],), absatz
+                pos = 0
+            else:
+                pos += 1  # Leerzeichen vor dem Wort
+            links, oben, breite, hoehe = (int(f) for f in felder[6:10])
+            boxen.append((links, oben, links + breite, oben + hoehe))
+            konfidenz.append(float(felder[10]))
+            zeile.append(len(zeilen) - 1)
+            start.append(pos)
+            pos += len(wort)
+            ende.append(pos)
+            zeilen[-1].append(wort)
+
+        return cls(
+            "\n".join(" ".join(w) for w in zeilen),
+            np.array(boxen, dtype=np.int32).reshape(-1, 4),
+            np.array(konfidenz, dtype=np.float32),
+            np.array(zeile, dtype=np.int32),
+            np.array(start, dtype=np.int32),
+            np.array(ende, dtype=np.int32),
+        )
+
+    def als_bytes(self):
+        # für das Auftragsjournal; npz ohne Pickle, der Text wird dort separat gespeichert
+        puffer = io.BytesIO()
+        np.savez(puffer, boxen=self.boxen, konfidenz=self.konfidenz,
+                 zeile=self.zeile, start=self.start, ende=self.ende)
+        return puffer.getvalue()
+
+    @classmethod
+    def aus_bytes(cls, text, daten):
+        with np.load(io.BytesIO(daten), allow_pickle=False) as a:
+            return cls(text, a["boxen"], a["konfidenz"], a["zeile"], a["start"], a["ende"])
+
+    def skalieren(self, fx, fy):
+        # Rahmen vom vorverarbeiteten (ggf. skalierten) Bild auf die Originalseite umrechnen
+        if fx != 1 or fy != 1:
+            self.boxen = np.rint(self.boxen * np.array([fx, fy, fx, fy])).astype(np.int32)
+
+    def verschieben(self, dx, dy):
+        # Rahmen eines Seitenausschnitts auf die ganze Seite beziehen
+        if dx or dy:
+            self.boxen = self.boxen + np.array([dx, dy, dx, dy], dtype=np.int32)
+
+    def box(self, zeile_nr, start, ende):
+        """Liefert ((x0, y0, x1, y1), konfidenz) der Wörter, die [start, ende) berühren, oder None."""
+        von, bis = np.searchsorted(self.zeile, [zeile_nr, zeile_nr + 1])
+        auswahl = slice(von, bis)
+        maske = (self.start[auswahl] < ende) & (self.ende[auswahl] > start)
+        if not maske.any():
+            return None
+        b = self.boxen[auswahl][maske]
+        rahmen = (int(b[:, 0].min()), int(b[:, 1].min()), int(b[:, 2].max()), int(b[:, 3].max()))
+        return rahmen, float(self.konfidenz[auswahl][maske].min())
@@ -0,0 +1,158 @@
+# pdf_ausgabe.py
+import io
+import os
+import zlib
+
+from utils import pdf_dpi
+
+# Zeichenbreiten von Helvetica (1/1000 em) für die horizontale Skalierung der unsichtbaren Wörter
+_HELVETICA = dict(zip(
+    " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~",
+    [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278]
+    + [556] * 10
+    + [278, 278, 584, 584, 584, 556, 1015,
+       667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833,
+       722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611,
+       278, 278, 278, 469, 556, 333,
+       556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833,
+       556, 556, 556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500,
+       334, 260, 334, 584]
+))
+_HELVETICA.update({"ä": 556, "ö": 556, "ü": 556, "Ä": 667, "Ö": 778, "Ü": 722, "ß": 611})
+
+
+def textbreite(wort):
+    return sum(_HELVETICA.get(z, 556) for z in wort)
+
+
+def pdf_text(wort):
+    # Standardschrift mit WinAnsi-Kodierung; langes s als s, damit die Suche im PDF funktioniert
+    roh = wort.replace("ſ", "s").encode("cp1252", errors="replace")
+    return roh.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+# ---------- Eine durchsuchbare PDF-Datei ----------
+class DurchsuchbaresPdf:
+    """
+    Schreibt eine PDF-Datei Seite für Seite: Scan als JPEG, darüber die erkannten Wörter
+    als unsichtbarer Text (Render-Modus 3) an ihren Wortrahmen.
+    - jede Seite wird sofort in die Datei geschrieben, im Speicher bleiben nur die Objekt-Offsets
+    - Seitenbaum, Querverweistabelle und Trailer folgen beim Schließen
+    """
+    jpeg_qualitaet = 80
+
+    def __init__(self, pfad):
+        self.pfad = pfad
+        self.f = open(pfad, "wb")
+        self.offsets = {}
+        self.seiten = []
+        self.naechstes = 4  # 1 = Katalog, 2 = Seitenbaum, 3 = Schrift
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._objekt(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    def _objekt(self, nr, inhalt, stream=None):
+        self.offsets[nr] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % nr + inhalt)
+        if stream is not None:
+            self.f.write(b"\nstream\n" + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+
+    def _nummer(self):
+        nr = self.naechstes
+        self.naechstes += 1
+        return nr
+
+    def seite(self, bild, woerter=None, dpi=pdf_dpi):
+        """bild: PIL-Image der Seite, woerter: SeitenWoerter (Pixel dieses Bildes) oder None."""
+        if bild.mode not in ("L", "RGB"):
+            bild = bild.convert("RGB" if bild.mode in ("RGBA", "P", "CMYK") else "L")
+        faktor = 72.0 / dpi
+        breite, hoehe = bild.width * faktor, bild.height * faktor
+
+        puffer = io.BytesIO()
+        bild.save(puffer, "JPEG", quality=self.jpeg_qualitaet)
+        bild_nr = self._nummer()
+        self._objekt(bild_nr, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s "
+                     b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>"
+                     % (bild.width, bild.height, b"DeviceRGB" if bild.mode == "RGB" else b"DeviceGray",
+                        puffer.tell()), puffer.getvalue())
+
+        inhalt = [b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (breite, hoehe)]
+        if woerter is not None and len(woerter.boxen):
+            inhalt.append(b"BT 3 Tr")
+            zeilen = woerter.text.split("\n")
+            for (x0, y0, x1, y1), z, s, e in zip(woerter.boxen.tolist(), woerter.zeile.tolist(),
+                                                  woerter.start.tolist(), woerter.ende.tolist()):
+                wort = zeilen[z][s:e]
+                if not wort or x1 <= x0 or y1 <= y0:
+                    continue
+                groesse = (y1 - y0) * faktor
+                skalierung = 100.0 * (x1 - x0) * faktor / (textbreite(wort) * groesse / 1000.0)
+                inhalt.append(b"/F1 %.2f Tf %.1f Tz 1 0 0 1 %.2f %.2f Tm (%s) Tj"
+                              % (groesse, skalierung, x0 * faktor, hoehe - y1 * faktor, pdf_text(wort)))
+            inhalt.append(b"ET")
+        daten = zlib.compress(b"\n".join(inhalt))
+        inhalt_nr = self._nummer()
+        self._objekt(inhalt_nr, b"<< /Filter /FlateDecode /Length %d >>" % len(daten), daten)
+
+        seite_nr = self._nummer()
+        self._objekt(seite_nr, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                     b"/Resources << /XObject << /Im0 %d 0 R >> /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                     % (breite, hoehe, bild_nr, inhalt_nr))
+        self.seiten.append(seite_nr)
+
+    def schliessen(self):
+        kinder = b" ".join(b"%d 0 R" % nr for nr in self.seiten)
+        self._objekt(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kinder, len(self.seiten)))
+        self._objekt(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self.f.tell()
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % self.naechstes)
+        for nr in range(1, self.naechstes):
+            self.f.write(b"%010d 00000 n \n" % self.offsets[nr])
+        self.f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.naechstes, xref))
+        self.f.close()
+
+
+# ---------- Je Eingabedatei eine durchsuchbare PDF ----------
+class PdfAusgabe:
+    """
+    Schreibt für jede Eingabedatei <name>_ocr.pdf in den Ausgabeordner.
+    Gleichnamige Eingaben (a/x.pdf und b/x.pdf, x.pdf und x.tif) bekommen <name>_ocr_2.pdf usw.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.datei = None
+        self.pdf = None
+        self.dateien = []
+        self.namen = set()  # in diesem Lauf vergebene Dateinamen
+
+    def _pfad(self, datei):
+        name = os.path.splitext(os.path.basename(datei))[0]
+        dateiname, zaehler = f"{name}_ocr.pdf", 2
+        while dateiname.lower() in self.namen:
+            dateiname = f"{name}_ocr_{zaehler}.pdf"
+            zaehler += 1
+        self.namen.add(dateiname.lower())
+        return os.path.join(self.output_dir, dateiname)
+
+    def seite(self, datei, bild, woerter=None):
+        if datei != self.datei:
+            self._abschliessen()
+            self.datei = datei
+            self.pdf = DurchsuchbaresPdf(self._pfad(datei))
+        # PDF-Seiten sind mit pdf_dpi gerastert, Bilddateien bringen ihre Auflösung meist mit
+        dpi = bild.info.get("dpi", (pdf_dpi,))[0] if not datei.lower().endswith(".pdf") else pdf_dpi
+        if not dpi or dpi < 50:
+            dpi = pdf_dpi
+        self.pdf.seite(bild, woerter, dpi)
+
+    def _abschliessen(self):
+        if self.pdf is not None:
+            self.pdf.schliessen()
+            self.dateien.append(self.pdf.pfad)
+            self.pdf = None
+
+    def schliessen(self):
+        self._abschliessen()
+        return self.dateien
@@ -0,0 +1,50 @@
+# conftest.py
+import os
+import sys
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Protokoll:
+    # sammelt Statusmeldungen wie die Qt-Signale (emit)
+    def __init__(self):
+        self.zeilen = []
+
+    def emit(self, nachricht):
+        self.zeilen.append(str(nachricht))
+
+
+@pytest.fixture
+def protokoll():
+    return Protokoll()
+
+
+@pytest.fixture
+def ocr_attrappe(monkeypatch):
+    """Tesseract-Ersatz: erkennt jede Seite als "Seite <breite>x<hoehe> müller"."""
+    import ocr_engine
+
+    def text(bild, lang=None, **kwargs):
+        return f"Seite {bild.size[0]}x{bild.size[1]} müller"
+
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_string", text)
+    monkeypatch.setattr(ocr_engine.pytesseract, "get_tesseract_version", lambda: "5.0-test")
+    return text
+
+
+@pytest.fixture
+def textbild(tmp_path):
+    # Seite mit genug Schrift, damit die Leerseitenerkennung sie nicht überspringt
+    def erzeugen(name, breite=1200, hoehe=800):
+        bild = Image.new("L", (breite, hoehe), 250)
+        zeichnen = ImageDraw.Draw(bild)
+        schrift = ImageFont.load_default()
+        for zeile in range(15):
+            zeichnen.text((40, 40 + zeile * 45), "Johann Müller geboren zu Hohenstein " * 2, font=schrift, fill=0)
+        pfad = tmp_path / name
+        bild.save(pfad)
+        return str(pfad)
+    return erzeugen
@@ -0,0 +1,92 @@
+# test_ausgabe.py
+import json
+
+import pytest
+from docx import Document
+
+from ausgabe import TrefferPositionen, WordAusgabe, bereiche_zusammenfassen
+from ocr_woerter import SeitenWoerter
+
+
+# ---------- Markierung: Fundstellen einer Zeile zu Bereichen zusammenfassen ----------
+@pytest.mark.parametrize("fundstellen, bereiche", [
+    ([], []),
+    ([(3, 8, 0)], [(3, 8)]),
+    ([(0, 5, 0), (3, 8, 1)], [(0, 8)]),  # überlappend
+    ([(0, 5, 0), (5, 9, 1)], [(0, 9)]),  # angrenzend
+    ([(0, 10, 0), (2, 4, 1)], [(0, 10)]),  # enthalten
+    ([(10, 12, 1), (0, 3, 0), (2, 6, 2)], [(0, 6), (10, 12)]),  # unsortiert, zwei Bereiche
+    ([(7, 13, 0), (7, 13, 0)], [(7, 13)]),  # doppelt gefunden
+], ids=["keine", "eine", "ueberlappend", "angrenzend", "enthalten", "unsortiert", "doppelt"])
+def test_bereiche_zusammenfassen(fundstellen, bereiche):
+    assert bereiche_zusammenfassen(fundstellen) == bereiche
+
+
+def test_word_markiert_je_bereich_einen_run(tmp_path):
+    ausgabe = WordAusgabe(str(tmp_path), highlight=True)
+    ausgabe.seite_beginnen("a.pdf", 1)
+    # "Müller" und "Müllerin" überlappen, "Hohenstein" steht allein
+    ausgabe.zeile("Anna Müllerin aus Hohenstein", [(5, 11, 0), (5, 13, 1), (18, 28, 2)])
+    ausgabe.zeile("ohne Treffer")
+    runs = ausgabe.doc.paragraphs[-2].runs
+    assert [r.text for r in runs] == ["Anna ", "Müllerin", " aus ", "Hohenstein"]
+    assert [r.font.color.rgb is not None for r in runs] == [False, True, False, True]
+    assert ausgabe.doc.paragraphs[-1].text == "ohne Treffer"
+    ausgabe.schliessen()
+
+
+# ---------- Trefferpositionen über mehrere Zeilen ----------
+def tsv(*woerter):
+    # (Zeile, Wort, links, oben, breite, hoehe, Konfidenz) → Tesseract-TSV, ein Absatz
+    kopf = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+    return "\n".join([kopf] + [f"5\t1\t1\t1\t{zeile}\t{nr}\t{x}\t{y}\t{b}\t{h}\t{k}\t{wort}"
+                               for zeile, nr, x, y, b, h, k, wort in woerter])
+
+
+def test_treffer_auf_mehreren_zeilen(tmp_path):
+    woerter = SeitenWoerter.aus_tsv(tsv(
+        (1, 1, 100, 50, 80, 20, 96, "Johann"), (1, 2, 190, 50, 90, 20, 91, "Müller"),
+        (2, 1, 100, 90, 70, 20, 88, "Anna"), (2, 2, 180, 90, 90, 20, 75, "Müller"), (2, 3, 280, 90, 60, 20, 93, "geb."),
+    ))
+    assert woerter.text == "Johann Müller\nAnna Müller geb."
+    # gleicher Begriff auf zwei Zeilen: je Zeile der Rahmen ihres eigenen Wortes
+    assert woerter.box(0, 7, 13) == ((190, 50, 280, 70), 91.0)
+    assert woerter.box(1, 5, 11) == ((180, 90, 270, 110), 75.0)
+    # über zwei Wörter: gemeinsamer Rahmen, schwächste Konfidenz
+    assert woerter.box(1, 0, 11) == ((100, 90, 270, 110), 75.0)
+    assert woerter.box(2, 0, 4) is None
+
+    positionen = TrefferPositionen(str(tmp_path))
+    for zeile_nr, line in enumerate(woerter.text.splitlines()):
+        start = line.index("Müller")
+        box, konfidenz = woerter.box(zeile_nr, start, start + 6)
+        positionen.zeile("a.pdf_1.png", "a.pdf", 1, zeile_nr + 1, line,
+                         [{"begriff": "müller", "start": start, "ende": start + 6, "box": list(box),
+                           "konfidenz": konfidenz}])
+    positionen.schliessen()
+    with open(tmp_path / "ocr_treffer.jsonl", encoding="utf-8") as f:
+        eintraege = [json.loads(z) for z in f]
+    assert [(e["zeile"], e["treffer"][0]["box"]) for e in eintraege] == [
+        (1, [190, 50, 280, 70]), (2, [180, 90, 270, 110])]
+
+
+# ---------- Kompletter Scan in Teilen ----------
+def seiten_schreiben(ausgabe, anzahl):
+    for seite in range(1, anzahl + 1):
+        ausgabe.seite_beginnen(f"seite{seite}.png", seite)
+        ausgabe.zeile(f"Text der Seite {seite}")
+        ausgabe.seite_beenden()
+        if seite % ausgabe.max_seiten == 0:
+            assert ausgabe.doc is None  # fertiger Teil ist gespeichert und nicht mehr im Speicher
+    return ausgabe.schliessen()
+
+
+@pytest.mark.parametrize("anzahl, teile", [(5, [[1, 2], [3, 4], [5]]), (4, [[1, 2], [3, 4]]), (1, [[1]])])
+def test_word_teile_nach_max_seiten(tmp_path, anzahl, teile):
+    dateien = seiten_schreiben(WordAusgabe(str(tmp_path), max_seiten=2), anzahl)
+    namen = [f"ocr_ausgabe_{n}.docx" for n in range(1, len(teile) + 1)]
+    assert dateien == [str(tmp_path / name) for name in namen]
+    assert sorted(p.name for p in tmp_path.iterdir()) == namen  # kein leerer Teil am Ende
+    for datei, seiten in zip(dateien, teile):
+        absaetze = [p.text for p in Document(datei).paragraphs if p.text]
+        assert absaetze == [z for s in seiten for z in (f"seite{s}.png", f"Text der Seite {s}")]
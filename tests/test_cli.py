@@ -0,0 +1,27 @@
+# test_cli.py
+import os
+import subprocess
+import sys
+
+import cli
+
+wurzel = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_hilfe_laedt_weder_docx_noch_ocr_engine():
+    # eigener Interpreter: die Tests selbst haben docx und ocr_engine längst geladen
+    code = ("import sys, cli\n"
+            "try:\n    cli.main(['--help'])\nexcept SystemExit:\n    pass\n"
+            "print(sorted(m for m in ('docx', 'ocr_engine') if m in sys.modules))")
+    ergebnis = subprocess.run([sys.executable, "-c", code], cwd=wurzel, capture_output=True, text=True, check=True)
+    assert ergebnis.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_formate_passen_zu_den_ausgaben(tmp_path):
+    from ausgabe import ausgaben_erstellen
+
+    ohne_pdf = [f for f in cli.ausgabe_formate if f != "pdf"]
+    ausgaben = ausgaben_erstellen(ohne_pdf, str(tmp_path))
+    for ausgabe in ausgaben:
+        ausgabe.schliessen()
+    assert len(ausgaben) == len(ohne_pdf)
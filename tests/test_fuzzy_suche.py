@@ -0,0 +1,52 @@
+# test_fuzzy_suche.py
+import pytest
+
+import ocr_engine
+from fuzzy_suche import FuzzyMatcher, gewichteter_abstand
+
+
+# ---------- Gewichteter Abstand mit OCR-Verwechslungen ----------
+@pytest.mark.parametrize("wort, abstand", [
+    ("müller", 0.0),
+    ("miiller", 0.5),  # ü → ii
+    ("muller", 0.5),  # ü → u
+    ("mnller", 1.0),  # ü → n ist keine typische Verwechslung, volle Ersetzung
+    ("mueller", 1.5),  # ü → u plus eingefügtes e
+])
+def test_abstand_mit_verwechslungen(wort, abstand):
+    matcher = FuzzyMatcher(["Müller"], max_abstand=2)
+    assert gewichteter_abstand("müller", wort, 2, matcher.konfusionen) == abstand
+
+
+def test_mehrzeichige_verwechslung():
+    matcher = FuzzyMatcher(["Schmidt"])
+    assert gewichteter_abstand("schmidt", "schrnidt", 1, matcher.konfusionen) == 0.5  # m → rn
+
+
+@pytest.mark.parametrize("max_abstand, gefunden", [
+    (0.5, ["Miiller"]),
+    (1, ["Mnller", "Miiller"]),  # genau auf der Grenze zählt noch
+    (1.5, ["Mnller", "Miiller", "Mueller"]),
+])
+def test_grenze(max_abstand, gefunden):
+    matcher = FuzzyMatcher(["Müller"], max_abstand=max_abstand)
+    funde = matcher.finde("Johann Mnller, Miiller und Mueller, Meier")
+    assert [schreibweise for _, _, idx, schreibweise, _ in funde if idx == 0] == gefunden
+    assert all(abstand <= max_abstand for *_, abstand in funde)
+
+
+def test_abbruch_knapp_ueber_der_grenze():
+    matcher = FuzzyMatcher(["Müller"])
+    assert gewichteter_abstand("müller", "mnller", 0.99, matcher.konfusionen) is None
+
+
+# ---------- Unscharfe Treffer im ganzen Lauf ----------
+def test_unscharfe_treffer_in_der_trefferliste(tmp_path, monkeypatch, protokoll, ocr_attrappe, textbild):
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_string",
+                        lambda bild, lang=None, **kwargs: "Johann Mnller\nAnna Miiller\nKarl Meier")
+    ocr_engine.starte_ocr([textbild("seite.png")], ["Müller"], "deu", status_signal=protokoll,
+                          output_dir=str(tmp_path), cache=False, index=False, journal=False, formate=["txt"],
+                          engine="pytesseract", fuzzy=1)
+    treffer = (tmp_path / "treffer_ausgabe.txt").read_text(encoding="utf-8").splitlines()
+    assert treffer == ["seite.png: Müller ≈ Mnller (1) → Johann Mnller",
+                       "seite.png: Müller ≈ Miiller (0.5) → Anna Miiller"]
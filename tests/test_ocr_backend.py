@@ -0,0 +1,23 @@
+# test_ocr_backend.py
+import numpy as np
+from PIL import Image
+
+import ocr_backend
+from ocr_backend import PytesseractEngine
+
+
+def test_pytesseract_aendert_das_bild_des_aufrufers_nicht(tmp_path, monkeypatch):
+    uebergeben = []
+    monkeypatch.setattr(ocr_backend.pytesseract, "image_to_string",
+                        lambda bild, lang=None, **kwargs: uebergeben.append(bild) or "Text")
+    pfad = tmp_path / "seite.png"
+    Image.new("L", (40, 30), 255).save(pfad)
+    with Image.open(pfad) as bild:
+        assert PytesseractEngine().text(bild, "deu") == "Text"
+        assert bild.format == "PNG"
+    assert uebergeben[0].format == "PPM" and uebergeben[0].size == (40, 30)
+
+
+def test_array_wird_als_ppm_uebergeben():
+    bild = ocr_backend.fuer_tesseract(np.full((30, 40), 255, dtype=np.uint8))
+    assert bild.format == "PPM" and bild.size == (40, 30)
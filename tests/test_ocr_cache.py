@@ -0,0 +1,12 @@
+# test_ocr_cache.py
+from ocr_cache import OCRCache
+
+
+def test_varianten_getrennt(tmp_path):
+    cache = OCRCache(pfad=str(tmp_path / "cache.sqlite"), tesseract_version="5")
+    cache.speichere("abc", 1, "deu", None, "ganze Seite")
+    cache.speichere("abc", 1, "deu", None, "Ausschnitt", variante="adaptiv")
+    assert cache.hole("abc", 1, "deu") == "ganze Seite"
+    assert cache.hole("abc", 1, "deu", variante="adaptiv") == "Ausschnitt"
+    assert cache.hole("abc", 1, "deu", "opencv", variante="adaptiv") is None
+    cache.schliessen()
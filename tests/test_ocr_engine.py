@@ -0,0 +1,179 @@
+# test_ocr_engine.py
+import json
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+import ocr_engine
+
+
+def lauf(dateien, ausgabe, protokoll, **optionen):
+    fehler = []
+    einstellungen = dict(status_signal=protokoll, output_dir=str(ausgabe), cache=False, index=False,
+                         formate=["txt"], engine="pytesseract", fehlerprotokoll=fehler)
+    einstellungen.update(optionen)
+    ocr_engine.starte_ocr(dateien, ["müller"], "deu", **einstellungen)
+    text = (ausgabe / "ocr_ausgabe.txt").read_text(encoding="utf-8")
+    return text, fehler
+
+
+# ---------- Kaputte Dateien beenden nur sich selbst ----------
+def test_unlesbare_pdf_wird_uebersprungen(tmp_path, protokoll, ocr_attrappe, textbild):
+    kaputt = tmp_path / "kaputt.pdf"
+    kaputt.write_bytes(b"keine PDF")
+    bild = textbild("gut.png")
+    text, fehler = lauf([str(kaputt), bild], tmp_path / "aus", protokoll)
+    assert "gut.png" in text
+    assert len(fehler) == 1 and "kaputt.pdf" in fehler[0]
+
+
+def test_rasterfehler_wird_dateifehler(tmp_path, protokoll, ocr_attrappe, textbild):
+    # ohne Journal/Textebene wird die Seitenzahl nicht abgefragt, der Fehler kommt erst beim Rastern
+    kaputt = tmp_path / "kaputt.pdf"
+    kaputt.write_bytes(b"keine PDF")
+    bild = textbild("gut.png")
+    text, fehler = lauf([str(kaputt), bild], tmp_path / "aus", protokoll, journal=False, textebene=False)
+    assert "gut.png" in text
+    assert any("gerastert" in f for f in fehler)
+
+
+# ---------- Cache unterscheidet alle Einstellungen, die den Text ändern ----------
+def test_cache_schluessel_mit_modus_der_kombinierten_sprache(tmp_path, monkeypatch, protokoll, ocr_attrappe, textbild):
+    from ocr_cache import OCRCache
+
+    pfad = str(tmp_path / "cache.sqlite")
+    monkeypatch.setattr(ocr_engine, "OCRCache", lambda **kwargs: OCRCache(pfad=pfad, **kwargs))
+    bild = textbild("seite.png")
+    ocr_engine.starte_ocr([bild], ["müller"], "deu+frk", status_signal=protokoll, output_dir=str(tmp_path / "aus"),
+                          index=False, engine="pytesseract", kaskade=False)
+    cache = OCRCache(pfad=pfad)
+    assert [z[0] for z in cache.conn.execute("SELECT optimierung FROM seiten")] == ["|kombiniert"]
+    cache.schliessen()
+
+
+# ---------- Journal unterscheidet alle Einstellungen, die den Text ändern ----------
+def test_journal_verwirft_bei_anderer_textebene(tmp_path, protokoll, ocr_attrappe, textbild):
+    bilder = [textbild("a.png"), textbild("b.png")]
+    seiten = []
+
+    def nach_erster_seite():
+        return len(seiten) >= 1
+
+    ocr_engine.starte_ocr(bilder, ["müller"], "deu", status_signal=protokoll, output_dir=str(tmp_path),
+                          cache=False, index=False, engine="pytesseract", abbrechen_flag=nach_erster_seite,
+                          metriken_hook=lambda e: seiten.append(e) if e["ereignis"] == "seite" else None)
+    protokoll.zeilen.clear()
+    ocr_engine.starte_ocr(bilder, ["müller"], "deu", status_signal=protokoll, output_dir=str(tmp_path),
+                          cache=False, index=False, engine="pytesseract", textebene=False)
+    assert any("Journal mit anderen Einstellungen verworfen" in z for z in protokoll.zeilen)
+
+
+# ---------- Übersprungene Leerseiten je Datei melden ----------
+def test_leerseiten_je_datei_gemeldet(tmp_path, protokoll, ocr_attrappe, textbild):
+    leer = tmp_path / "leer.png"
+    Image.new("L", (1200, 1600), 250).save(leer)
+    lauf([textbild("gut.png"), str(leer)], tmp_path / "aus", protokoll, journal=False, textebene=False)
+    assert any("leer.png: 1 Seite(n) ohne Text, OCR übersprungen: S. 1 (leer)" in z for z in protokoll.zeilen)
+    assert not any("gut.png: " in z and "übersprungen" in z for z in protokoll.zeilen)
+
+
+# ---------- Wortrahmen: Originalgröße lesen, ohne die Datei offen zu lassen ----------
+def test_positionen_schliessen_die_bilddatei(monkeypatch, textbild):
+    geoeffnet = []
+    oeffnen = Image.open
+
+    def mitschreiben(*args, **kwargs):
+        bild = oeffnen(*args, **kwargs)
+        geoeffnet.append(bild)
+        return bild
+
+    monkeypatch.setattr(Image, "open", mitschreiben)
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_data",
+                        lambda bild, lang=None, **kwargs: "5\t1\t1\t1\t1\t1\t10\t20\t30\t10\t95\tMüller")
+    text, woerter, fehler, _ = ocr_engine.ocr_seite(textbild("seite.png"), "deu", optimierung="opencv",
+                                                    engine="pytesseract", positionen=True)
+    assert text == "Müller" and fehler is None
+    assert geoeffnet and all(bild.fp is None for bild in geoeffnet)
+
+
+# ---------- Seitennamen in der Trefferliste ----------
+def test_seitennummer_nur_bei_mehrseitigem_tiff(tmp_path, protokoll, ocr_attrappe):
+    einzel, mehrfach = tmp_path / "einzel.tif", tmp_path / "mappe.tiff"
+    Image.new("L", (300, 200), 250).save(einzel)
+    Image.new("L", (300, 200), 250).save(mehrfach, save_all=True, append_images=[Image.new("L", (310, 200), 250)])
+    assert ocr_engine.seiten_bezeichnung(str(einzel), 1) == "einzel.png"
+    assert ocr_engine.seiten_bezeichnung(str(mehrfach), 1) == "mappe.tiff_1.png"
+    assert ocr_engine.seiten_bezeichnung(str(mehrfach), 2) == "mappe.tiff_2.png"
+
+    lauf([str(einzel), str(mehrfach)], tmp_path / "aus", protokoll, journal=False, leerseiten=False)
+    treffer = (tmp_path / "aus" / "treffer_ausgabe.txt").read_text(encoding="utf-8")
+    assert "einzel.png: " in treffer and "einzel.tif_" not in treffer
+    assert "mappe.tiff_1.png: " in treffer and "mappe.tiff_2.png: " in treffer
+
+
+# ---------- Prozess-Pool liefert in Seitenreihenfolge ----------
+def test_pool_liefert_in_seitenreihenfolge(monkeypatch, ocr_attrappe, textbild):
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("die Tesseract-Attrappe erreicht die Worker nur über fork")
+
+    def langsam_vorne(bild, lang=None, **kwargs):
+        # frühe Seiten brauchen am längsten, spätere sind zuerst fertig
+        time.sleep(max(0, 320 - bild.size[0]) * 0.03)
+        return ocr_attrappe(bild, lang)
+
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_string", langsam_vorne)
+    bilder = [textbild(f"s{i}.png", breite=310 + i) for i in range(8)]
+    auftraege = [(pfad, 1, pfad, "aus dem Cache" if i == 3 else None) for i, pfad in enumerate(bilder)]
+    ergebnisse = list(ocr_engine.seiten_ocr_geordnet(iter(auftraege), "deu", worker=3, engine="pytesseract"))
+    assert [e[0] for e in ergebnisse] == bilder
+    assert [e[3] for e in ergebnisse] == [
+        "aus dem Cache" if i == 3 else f"Seite {310 + i}x800 müller" for i in range(8)]
+    assert all(e[5] is None for e in ergebnisse)
+
+
+# ---------- Adaptive Auflösung: Wortrahmen aus dem Ausschnitt landen auf der Seite bei pdf_dpi ----------
+ZEICHEN = [(1.0 + 0.12 * i, 2.0 + 0.25 * z, 1.06 + 0.12 * i, 2.1 + 0.25 * z) for z in range(8) for i in range(30)]
+ZIELWORT = (3.0, 3.1, 3.5, 3.2)  # Zoll; liegt zwischen zwei Zeichenzeilen
+
+
+def virtuelle_seite(dpi):
+    # eine Letter-Seite mit Zeichenblock und markiertem Zielwort, exakt bei `dpi` gezeichnet
+    seite = Image.new("L", (int(8.5 * dpi), int(11 * dpi)), 255)
+    zeichnen = ImageDraw.Draw(seite)
+    for rahmen, farbe in [(r, 0) for r in ZEICHEN] + [(ZIELWORT, 1)]:
+        zeichnen.rectangle([round(v * dpi) for v in rahmen], fill=farbe)
+    return seite
+
+
+def test_adaptive_wortrahmen_auf_ganzer_seite(tmp_path, monkeypatch, protokoll, ocr_attrappe):
+    gerastert = []
+
+    def bereich(pdf_path, seite, dpi, rahmen, poppler_path=None):
+        x, y, breite, hoehe = rahmen
+        gerastert.append((dpi, rahmen))
+        return virtuelle_seite(dpi).crop((x, y, x + breite, y + hoehe))
+
+    def zielwort_finden(bild, lang=None, **kwargs):
+        # Tesseract-Ersatz: meldet das Zielwort an seiner Lage im übergebenen Ausschnitt
+        ys, xs = np.nonzero(np.asarray(bild.convert("L")) == 1)
+        return (f"5\t1\t1\t1\t1\t1\t{xs.min()}\t{ys.min()}\t{xs.max() - xs.min() + 1}\t{ys.max() - ys.min() + 1}"
+                "\t95\tMüller")
+
+    monkeypatch.setattr(ocr_engine, "pdf_seitenzahl", lambda pdf_path, poppler_path=None: 1)
+    monkeypatch.setattr(ocr_engine, "convert_from_path", lambda pdf_path, dpi, **kwargs: [virtuelle_seite(dpi)])
+    monkeypatch.setattr(ocr_engine, "pdf_bereich_rastern", bereich)
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_data", zielwort_finden)
+    pdf = tmp_path / "akte.pdf"
+    pdf.write_bytes(b"%PDF")
+    lauf([str(pdf)], tmp_path / "aus", protokoll, adaptiv=True, positionen=True, journal=False,
+         textebene=False, leerseiten=False)
+
+    dpi, (x, y, _, _) = gerastert[0]
+    assert dpi != ocr_engine.pdf_dpi and x > 0 and y > 0  # wirklich ein Ausschnitt in anderer Auflösung
+    with open(tmp_path / "aus" / "ocr_treffer.jsonl", encoding="utf-8") as f:
+        box = json.loads(f.readline())["treffer"][0]["box"]
+    erwartet = [round(v * ocr_engine.pdf_dpi) for v in ZIELWORT]
+    assert all(abs(b - e) <= 2 for b, e in zip(box, erwartet)), (box, erwartet)
@@ -0,0 +1,42 @@
+# test_ocr_journal.py
+from ocr_journal import OCRJournal
+
+einstellungen = {"sprache": "deu", "optimierung": None}
+
+
+def test_unterbrochener_lauf_wird_fortgesetzt(tmp_path, textbild):
+    bild = textbild("a.png")
+    journal = OCRJournal(str(tmp_path), einstellungen)
+    journal.seiten(bild)
+    journal.seite_speichern(bild, 1, "Text")
+    journal.status_setzen("abgebrochen")
+    journal.schliessen()
+
+    journal = OCRJournal(str(tmp_path), einstellungen)
+    assert journal.seiten(bild) == {1: "Text"}
+    journal.schliessen()
+
+
+def test_nach_abgeschlossenem_lauf_neu(tmp_path, textbild):
+    bild = textbild("a.png")
+    journal = OCRJournal(str(tmp_path), einstellungen)
+    journal.seiten(bild)
+    journal.seite_speichern(bild, 1, "Text")
+    journal.status_setzen("abgeschlossen")
+    journal.schliessen()
+
+    journal = OCRJournal(str(tmp_path), einstellungen)
+    assert journal.seiten(bild) == {} and journal.erledigt() == 0
+    journal.schliessen()
+
+
+def test_andere_einstellungen_verwerfen(tmp_path, textbild):
+    bild = textbild("a.png")
+    journal = OCRJournal(str(tmp_path), einstellungen)
+    journal.seiten(bild)
+    journal.seite_speichern(bild, 1, "Text")
+    journal.schliessen()
+
+    journal = OCRJournal(str(tmp_path), dict(einstellungen, textebene=False))
+    assert journal.verworfen and journal.seiten(bild) == {}
+    journal.schliessen()
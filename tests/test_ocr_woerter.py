@@ -0,0 +1,37 @@
+# test_ocr_woerter.py
+import numpy as np
+
+from ocr_woerter import SeitenWoerter
+
+
+def woerter_mit(*boxen):
+    n = len(boxen)
+    return SeitenWoerter(" ".join(["wort"] * n), np.array(boxen, dtype=np.int32).reshape(-1, 4),
+                         np.full(n, 90, dtype=np.float32), np.zeros(n, dtype=np.int32),
+                         np.arange(n, dtype=np.int32) * 5, np.arange(n, dtype=np.int32) * 5 + 4)
+
+
+# ---------- Ausschnitt → Seite: erst verschieben, dann skalieren ----------
+def test_verschieben_und_skalieren():
+    woerter = woerter_mit((10, 20, 30, 40), (0, 0, 7, 9))
+    woerter.verschieben(5, 7)  # Ausschnitt lag bei (5, 7) auf der Seite
+    woerter.skalieren(300 / 250, 300 / 250)  # von 250 auf 300 dpi
+    assert woerter.boxen.tolist() == [[18, 32, 42, 56], [6, 8, 14, 19]]
+    assert woerter.boxen.dtype == np.int32
+
+
+def test_hin_und_zurueck():
+    woerter = woerter_mit((113, 57, 260, 91))
+    woerter.verschieben(40, 25)
+    woerter.skalieren(2, 1.5)
+    woerter.skalieren(1 / 2, 1 / 1.5)
+    woerter.verschieben(-40, -25)
+    assert woerter.boxen.tolist() == [[113, 57, 260, 91]]
+
+
+def test_nichts_zu_tun_laesst_rahmen_unveraendert():
+    woerter = woerter_mit((1, 2, 3, 4))
+    boxen = woerter.boxen
+    woerter.verschieben(0, 0)
+    woerter.skalieren(1, 1)
+    assert woerter.boxen is boxen
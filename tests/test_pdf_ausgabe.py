@@ -0,0 +1,36 @@
+# test_pdf_ausgabe.py
+import pytest
+from PIL import Image
+
+import ocr_engine
+from pdf_ausgabe import PdfAusgabe
+
+pypdf = pytest.importorskip("pypdf")
+
+tsv_kopf = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+
+
+def test_gleichnamige_eingaben_ueberschreiben_sich_nicht(tmp_path):
+    ausgabe = PdfAusgabe(str(tmp_path))
+    seite = Image.new("L", (200, 100), 255)
+    for datei in ("a/x.pdf", "b/x.pdf", "c/x.tif"):
+        ausgabe.seite(datei, seite)
+    dateien = ausgabe.schliessen()
+    assert [p.split("/")[-1] for p in dateien] == ["x_ocr.pdf", "x_ocr_2.pdf", "x_ocr_3.pdf"]
+
+
+def test_seite_mit_ocr_fehler_bleibt_in_der_pdf(tmp_path, monkeypatch, protokoll, ocr_attrappe, textbild):
+    def image_to_data(bild, lang=None, **kwargs):
+        if bild.size[0] == 1300:
+            raise ocr_engine.pytesseract.TesseractError(1, "kaputt")
+        return tsv_kopf + "5\t1\t1\t1\t1\t1\t40\t40\t120\t20\t95\tmüller\n"
+
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_data", image_to_data)
+    tif = tmp_path / "mappe.tif"
+    seiten = [Image.open(textbild(f"s{i}.png", breite=b)) for i, b in enumerate((1200, 1300, 1200))]
+    seiten[0].save(tif, save_all=True, append_images=seiten[1:])
+    fehler = []
+    ocr_engine.starte_ocr([str(tif)], ["müller"], "deu", status_signal=protokoll, output_dir=str(tmp_path / "aus"),
+                          cache=False, index=False, formate=["pdf"], engine="pytesseract", fehlerprotokoll=fehler)
+    assert len(fehler) == 1
+    assert len(pypdf.PdfReader(str(tmp_path / "aus" / "mappe_ocr.pdf")).pages) == 3
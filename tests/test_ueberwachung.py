@@ -0,0 +1,41 @@
+# test_ueberwachung.py
+import os
+
+import ocr_engine
+from ocr_journal import journal_dateiname
+from ueberwachung import OrdnerWaechter
+
+
+def stabile_dateien(waechter):
+    # ruhezeit=0: zweiter Durchgang liefert alle fertig geschriebenen Dateien
+    waechter.durchsuchen()
+    return waechter.durchsuchen()
+
+
+def test_giftdatei_stoppt_die_ueberwachung_nicht(tmp_path, monkeypatch, protokoll):
+    ein, aus = tmp_path / "ein", tmp_path / "aus"
+    ein.mkdir()
+    (ein / "gut.pdf").write_bytes(b"gut")
+    (ein / "gift.pdf").write_bytes(b"gift")
+
+    def starte_ocr(dateien, suchbegriffe, output_dir=None, **optionen):
+        if any(d.endswith("gift.pdf") for d in dateien):
+            raise RuntimeError("Absturz im Decoder")
+        with open(os.path.join(output_dir, "treffer_ausgabe.txt"), "w", encoding="utf-8") as f:
+            f.writelines(f"{os.path.basename(d)}: müller\n" for d in dateien)
+        open(os.path.join(output_dir, journal_dateiname), "w").close()
+        return [], None
+
+    monkeypatch.setattr(ocr_engine, "starte_ocr", starte_ocr)
+    waechter = OrdnerWaechter(str(ein), ["müller"], str(aus), ruhezeit=0, status_signal=protokoll)
+    waechter.stapel_verarbeiten(stabile_dateien(waechter))
+
+    assert (aus / "treffer_laufend.txt").read_text(encoding="utf-8").count("gut.pdf: müller") == 1
+    status = dict(waechter.conn.execute("SELECT pfad, status FROM dateien"))
+    assert status == {str(ein / "gut.pdf"): "erledigt", str(ein / "gift.pdf"): "fehler"}
+    # nicht bei jedem Durchgang erneut versucht, Journal des Stapels nicht aufbewahrt
+    assert stabile_dateien(waechter) == []
+    assert not (aus / "laufender_stapel" / journal_dateiname).exists()
+    # nach einer Änderung wird die Datei erneut versucht
+    (ein / "gift.pdf").write_bytes(b"jetzt lesbar")
+    assert [d[0] for d in stabile_dateien(waechter)] == [str(ein / "gift.pdf")]
@@ -0,0 +1,38 @@
+# test_utils.py
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from utils import StichwortMatcher, seite_ohne_text
+
+fuell = [f"fuell{i}" for i in range(40)]
+
+
+@pytest.mark.parametrize("begriffe", [["Müller"], ["Müller"] + fuell], ids=["direktsuche", "automat"])
+def test_gross_und_kleinschreibung_in_beiden_wegen(begriffe):
+    matcher = StichwortMatcher(begriffe)
+    assert matcher.finde("Johann MÜLLER und müller") == [(7, 13, 0), (18, 24, 0)]
+    assert matcher.treffer("Johann Müller") == ["Müller"]
+    assert matcher.begriffe(matcher.finde("johann müller")) == ["Müller"]
+
+
+# ---------- Leerseiten: nur Seiten ganz ohne Zeichen überspringen ----------
+def a4_seite():
+    return Image.new("L", (2480, 3508), 250)  # A4 bei 300 dpi
+
+
+def test_leere_seite():
+    assert seite_ohne_text(a4_seite()) == "leer"
+
+
+def test_seite_mit_staub_gilt_als_leer():
+    a = np.asarray(a4_seite()).copy()
+    a[np.random.default_rng(1).random(a.shape) < 0.003] = 0
+    assert seite_ohne_text(Image.fromarray(a)) == "leer"
+
+
+@pytest.mark.parametrize("wort", ["Nr. 17", "Müller"])
+def test_seite_mit_einem_wort_geht_zur_ocr(wort):
+    seite = a4_seite()
+    ImageDraw.Draw(seite).text((400, 600), wort, font=ImageFont.load_default(50), fill=0)  # 12 pt bei 300 dpi
+    assert seite_ohne_text(seite) is None
@@ -0,0 +1,62 @@
+# test_warteschlange.py
+import threading
+
+import pytest
+
+import ocr_engine
+import warteschlange as ws
+
+
+def mit_workern(warteschlange, anzahl=2):
+    stopp = threading.Event()
+    threads = [threading.Thread(target=ws.warteschlange_abarbeiten, args=(warteschlange, f"t{i}", stopp.is_set))
+               for i in range(anzahl)]
+    for t in threads:
+        t.start()
+    return stopp, threads
+
+
+def test_ausnahme_im_worker_wird_seitenfehler(tmp_path, monkeypatch, protokoll, ocr_attrappe, textbild):
+    bilder = [textbild("a.png"), textbild("b.png", breite=1300), textbild("c.png")]
+
+    def ocr_seite(quelle, name=None, **parameter):
+        if name == "b.png":
+            raise RuntimeError("tesseract fehlt")
+        return "Seite müller", None, None, {"ocr": 0.0}
+
+    monkeypatch.setattr(ocr_engine, "ocr_seite", ocr_seite)
+    warteschlange = ws.SpeicherWarteschlange(vorrat=2)
+    stopp, threads = mit_workern(warteschlange)
+    fehler = []
+    try:
+        ocr_engine.starte_ocr(bilder, ["müller"], "deu", status_signal=protokoll, output_dir=str(tmp_path),
+                              cache=False, index=False, formate=["txt"], engine="pytesseract",
+                              fehlerprotokoll=fehler, warteschlange=warteschlange)
+    finally:
+        stopp.set()
+        for t in threads:
+            t.join()
+    text = (tmp_path / "ocr_ausgabe.txt").read_text(encoding="utf-8")
+    assert text.index("a.png") < text.index("c.png") and "b.png" not in text
+    assert len(fehler) == 1 and "tesseract fehlt" in fehler[0]
+
+
+def test_ohne_worker_endet_der_koordinator(tmp_path, protokoll, ocr_attrappe, textbild):
+    warteschlange = ws.SpeicherWarteschlange(worker_frist=0.2)
+    with pytest.raises(RuntimeError, match="Kein Worker"):
+        ocr_engine.starte_ocr([textbild("a.png")], ["müller"], "deu", status_signal=protokoll,
+                              output_dir=str(tmp_path), cache=False, index=False, engine="pytesseract",
+                              warteschlange=warteschlange)
+    assert warteschlange.auftraege == {}
+
+
+def test_abgelaufenes_lease_wird_neu_vergeben(tmp_path):
+    warteschlange = ws.SQLiteWarteschlange(str(tmp_path / "queue.sqlite"), lease_s=-1)
+    auftrag = warteschlange.einstellen("lauf", "a.png", b"...", {})
+    assert [warteschlange.leasen(f"w{i}")[0] for i in range(ws.max_versuche)] == [auftrag] * ws.max_versuche
+    # danach gilt die Seite als fehlgeschlagen statt endlos neu vergeben zu werden
+    assert warteschlange.leasen("w") is None
+    text, woerter, fehler, zeiten = warteschlange.ergebnis(auftrag)
+    assert text is None and "Versuchen" in fehler
+    assert warteschlange.aktiv(60)
+    warteschlange.schliessen()
@@ -0,0 +1,193 @@
+# ueberwachung.py
+import os
+import shutil
+import sqlite3
+import time
+
+from ocr_cache import datei_hash
+from ocr_journal import journal_dateiname
+from utils import bildformate, pdfformate
+
+ueberwachung_dateiname = "ocr_ueberwachung.sqlite"
+treffer_laufend_dateiname = "treffer_laufend.txt"
+
+
+def dateien_durchlaufen(ordner):
+    # rekursiv als Generator, damit auch große Freigaben keine lange Liste im Speicher erzeugen
+    for root, unterordner, files in os.walk(ordner):
+        unterordner[:] = [d for d in unterordner if not d.startswith(".")]
+        for f in files:
+            if f.startswith((".", "~$")) or not f.lower().endswith(bildformate + pdfformate):
+                continue
+            yield os.path.join(root, f)
+
+
+# ---------- Überwachter Eingangsordner ----------
+class OrdnerWaechter:
+    """
+    Überwacht einen Eingangsordner (z. B. Scanner-Freigabe) per Polling und erkennt neue Dateien
+    über die vorhandene Pipeline (starte_ocr).
+    - Polling statt inotify, weil Netzfreigaben (SMB/NFS) keine Änderungsereignisse liefern
+    - eine Datei gilt erst als fertig, wenn Größe und Änderungszeit `ruhezeit` Sekunden gleich bleiben
+    - neue oder geänderte Dateien werden über den Inhalts-Hash erkannt, Kopien desselben Inhalts übersprungen
+    - Zustand in SQLite im Ausgabeordner, im Speicher nur die gerade noch wachsenden Dateien
+    - Treffer jedes Stapels werden an treffer_laufend.txt angehängt, die Seiten landen im Volltext-Index
+    """
+
+    def __init__(self, ordner, suchbegriffe, output_dir, intervall=5.0, ruhezeit=10.0, stapel=20,
+                 status_signal=None, **ocr_optionen):
+        self.ordner = ordner
+        self.suchbegriffe = suchbegriffe
+        self.output_dir = output_dir
+        self.intervall = intervall
+        self.ruhezeit = ruhezeit
+        self.stapel = stapel
+        self.status_signal = status_signal
+        self.ocr_optionen = ocr_optionen
+        self.kandidaten = {}  # pfad -> (groesse, geaendert, seit): Dateien, die evtl. noch geschrieben werden
+        self.lauf_ordner = os.path.join(output_dir, "laufender_stapel")
+        self.treffer_pfad = os.path.join(output_dir, treffer_laufend_dateiname)
+
+        os.makedirs(self.lauf_ordner, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(output_dir, ueberwachung_dateiname))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dateien (
+                pfad TEXT PRIMARY KEY,
+                groesse INTEGER NOT NULL,
+                geaendert REAL NOT NULL,
+                hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                zeit REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS inhalte (
+                hash TEXT PRIMARY KEY,
+                pfad TEXT NOT NULL,
+                zeit REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def _status(self, nachricht):
+        if self.status_signal:
+            self.status_signal.emit(nachricht)
+
+    def _bekannt(self, pfad, groesse, geaendert):
+        zeile = self.conn.execute("SELECT groesse, geaendert FROM dateien WHERE pfad=?", (pfad,)).fetchone()
+        return zeile == (groesse, geaendert)
+
+    def _merken(self, pfad, groesse, geaendert, inhalt, status):
+        self.conn.execute("INSERT OR REPLACE INTO dateien VALUES (?, ?, ?, ?, ?, ?)",
+                          (pfad, groesse, geaendert, inhalt, status, time.time()))
+
+    def durchsuchen(self):
+        """
+        Ein Polling-Durchgang. Liefert [(pfad, hash, groesse, geaendert)] der Dateien, die fertig
+        geschrieben, neu oder geändert und nicht schon mit gleichem Inhalt erkannt sind.
+        """
+        jetzt = time.monotonic()
+        kandidaten, fertig, hashes = {}, [], set()
+        for pfad in dateien_durchlaufen(self.ordner):
+            try:
+                st = os.stat(pfad)
+            except OSError:
+                continue  # gerade gelöscht oder verschoben
+            if self._bekannt(pfad, st.st_size, st.st_mtime):
+                continue
+            vorher = self.kandidaten.get(pfad)
+            if not vorher or vorher[:2] != (st.st_size, st.st_mtime):
+                kandidaten[pfad] = (st.st_size, st.st_mtime, jetzt)
+                continue
+            if jetzt - vorher[2] < self.ruhezeit:
+                kandidaten[pfad] = vorher
+                continue
+            try:
+                inhalt = datei_hash(pfad)
+            except OSError:
+                kandidaten[pfad] = vorher  # noch gesperrt (z. B. vom Scanner unter Windows)
+                continue
+            doppelt = self.conn.execute("SELECT pfad FROM inhalte WHERE hash=?", (inhalt,)).fetchone()
+            if doppelt or inhalt in hashes:
+                self._merken(pfad, st.st_size, st.st_mtime, inhalt, "doppelt")
+                self._status(f"   ↳ Übersprungen (gleicher Inhalt wie {doppelt[0] if doppelt else 'andere neue Datei'}): {pfad}")
+                continue
+            hashes.add(inhalt)
+            fertig.append((pfad, inhalt, st.st_size, st.st_mtime))
+        # nur Dateien behalten, die es noch gibt: der Speicher wächst nicht mit der Laufzeit
+        self.kandidaten = kandidaten
+        self.conn.commit()
+        return fertig
+
+    def stapel_verarbeiten(self, dateien, abbrechen_flag=None):
+        """
+        Erkennt einen Stapel. Scheitert der Stapel, werden seine Dateien einzeln wiederholt; eine Datei,
+        die allein scheitert, wird als "fehler" gemerkt und erst nach einer Änderung erneut versucht.
+        """
+        try:
+            self._stapel_erkennen(dateien, abbrechen_flag)
+        except Exception as e:
+            if len(dateien) == 1:
+                pfad, inhalt, groesse, geaendert = dateien[0]
+                self._merken(pfad, groesse, geaendert, inhalt, "fehler")
+                self.conn.commit()
+                self._status(f"[!] Überwachung: {pfad} fehlgeschlagen, nächster Versuch erst nach einer Änderung: {e}")
+                return
+            self._status(f"[!] Überwachung: Stapel fehlgeschlagen ({e}), Dateien werden einzeln wiederholt")
+            for datei in dateien:
+                if abbrechen_flag and abbrechen_flag():
+                    return
+                self.stapel_verarbeiten([datei], abbrechen_flag)
+
+    def _stapel_erkennen(self, dateien, abbrechen_flag=None):
+        from ocr_engine import starte_ocr
+
+        self._status(f"[Überwachung] {len(dateien)} neue Datei(en): "
+                     + ", ".join(os.path.basename(d[0]) for d in dateien[:5])
+                     + (" …" if len(dateien) > 5 else ""))
+        optionen = dict(self.ocr_optionen, formate=["txt"], full_doc=False)
+        starte_ocr([d[0] for d in dateien], self.suchbegriffe, output_dir=self.lauf_ordner,
+                   status_signal=self.status_signal, abbrechen_flag=abbrechen_flag, **optionen)
+        if abbrechen_flag and abbrechen_flag():
+            return  # nicht als erledigt merken; das Journal setzt beim nächsten Start fort
+
+        # Trefferzeilen des Stapels an die laufende Trefferliste anhängen (blockweise kopiert)
+        stapel_treffer = os.path.join(self.lauf_ordner, "treffer_ausgabe.txt")
+        if os.path.isfile(stapel_treffer) and os.path.getsize(stapel_treffer):
+            with open(self.treffer_pfad, "a", encoding="utf-8") as ziel, \
+                    open(stapel_treffer, encoding="utf-8") as quelle:
+                ziel.write(f"# {time.strftime('%Y-%m-%d %H:%M:%S')} – {len(dateien)} Datei(en)\n")
+                shutil.copyfileobj(quelle, ziel)
+
+        for pfad, inhalt, groesse, geaendert in dateien:
+            self._merken(pfad, groesse, geaendert, inhalt, "erledigt")
+            self.conn.execute("INSERT OR REPLACE INTO inhalte VALUES (?, ?, ?)", (inhalt, pfad, time.time()))
+        self.conn.commit()
+
+        # das Journal wird nur für einen unterbrochenen Stapel gebraucht; sonst wüchse es mit jeder Datei
+        for endung in ("", "-wal", "-shm"):
+            try:
+                os.remove(os.path.join(self.lauf_ordner, journal_dateiname + endung))
+            except OSError:
+                pass
+
+    def laufen(self, abbrechen_flag=None):
+        """Pollt bis abbrechen_flag() wahr wird; neue Dateien werden in Stapeln zu höchstens `stapel` erkannt."""
+        self._status(f"[Überwachung] {self.ordner} alle {self.intervall:g} s, "
+                     f"Dateien gelten nach {self.ruhezeit:g} s ohne Änderung als fertig")
+        try:
+            while not (abbrechen_flag and abbrechen_flag()):
+                try:
+                    fertig = self.durchsuchen()
+                    for i in range(0, len(fertig), self.stapel):
+                        if abbrechen_flag and abbrechen_flag():
+                            break
+                        self.stapel_verarbeiten(fertig[i:i + self.stapel], abbrechen_flag)
+                except Exception as e:
+                    # z. B. Freigabe kurz nicht erreichbar: melden und beim nächsten Durchgang weitermachen
+                    self._status(f"[!] Überwachung: Durchgang fehlgeschlagen: {e}")
+                # in kleinen Schritten warten, damit ein Abbruch schnell greift
+                ende = time.monotonic() + self.intervall
+                while time.monotonic() < ende and not (abbrechen_flag and abbrechen_flag()):
+                    time.sleep(min(0.5, self.intervall))
+        finally:
+            self.conn.close()
@@ -1,4 +1,6 @@
 # utils.py
+import os
+import time
 from PIL import Image, ImageEnhance, ImageFilter
 import cv2
 import numpy as np
@@ -8,6 +10,20 @@ bildformate = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
 pdfformate = (".pdf",)
 output_txt_file = "treffer_ausgabe.txt"
 max_seiten_pro_word_datei = 20
+pdf_dpi = 300
+pdf_seiten_fenster = 4  # so viele PDF-Seiten werden gleichzeitig gerastert
+textebene_min_zeichen = 50  # ab so vielen Buchstaben gilt die Textebene einer PDF-Seite als brauchbar
+seiten_speicher_budget = 1024 * 1024 * 1024  # Seiten in Arbeit, darüber wird unkomprimiert ausgelagert
+app_daten_ordner = os.path.join(os.path.expanduser("~"), ".ocr_suchtool")
+cache_max_bytes = 512 * 1024 * 1024
+kaskade_min_konfidenz = 70  # Kaskade: darunter wird die Seite mit dem nächsten Modell erneut erkannt
+kaskade_min_woerterbuch = 0.2  # ebenso, wenn weniger Wörter im Grundwortschatz stehen
+leerseite_max_tinte = 0.0005  # Anteil dunkler Pixel, bis zu dem eine Seite ohne Zeichen "leer" statt "ohne_text" heißt
+leerseite_min_zeichen = 1  # schon ein zeichengroßer Fleck schickt die Seite zur OCR (ein Wort, "Nr. 17")
+leerseite_kontrast = 40  # so viel dunkler als das Papier zählt ein Pixel als Tinte
+adaptiv_vorschau_dpi = 100  # adaptive Auflösung: Vorschau zum Schätzen von Schriftgröße und Textbereich
+adaptiv_zeichenhoehe = 24  # Ziel für die mittlere Zeichenhöhe in Pixeln beim Rastern für die OCR
+adaptiv_dpi_grenzen = (150, 400)
 
 
 # ---------- Text-Utils ----------
@@ -15,22 +31,122 @@ def bereinige_zeile(zeile: str) -> str:
     return zeile.strip().replace("\t", " ")
 
 
-def ist_treffer(zeile: str, suchbegriffe: list) -> list:
+def ist_treffer(zeile: str, suchbegriffe) -> list:
+    if isinstance(suchbegriffe, StichwortMatcher):
+        return suchbegriffe.treffer(zeile)
     zeile_lc = zeile.lower()
     return [wort for wort in suchbegriffe if wort in zeile_lc]
 
 
+def kleinschreibung(zeile: str) -> str:
+    # wie str.lower(), aber längentreu, damit Trefferpositionen auf die Originalzeile passen
+    zeile_lc = zeile.lower()
+    if len(zeile_lc) == len(zeile):
+        return zeile_lc
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in zeile)
+
+
+class StichwortMatcher:
+    """
+    Aho-Corasick-Automat über alle Suchbegriffe (einmal pro Lauf aufbauen).
+    - findet jeden Begriff mit allen Fundstellen in einem Durchlauf pro Zeile
+    - Fehlerkanten sind in die Übergangstabelle eingerechnet (DFA), pro Zeichen ein Lookup
+    - bei wenigen Begriffen ist str.find je Begriff schneller, dann wird direkt gesucht
+    - Begriffe werden wie bei ist_treffer kleingeschrieben verglichen
+    """
+
+    direktsuche_bis = 32
+
+    def __init__(self, suchbegriffe):
+        self.suchbegriffe = list(suchbegriffe)
+        # einmal kleinschreiben, damit Direktsuche und Automat gleich vergleichen
+        self.muster = [kleinschreibung(w) for w in self.suchbegriffe]
+        self.laengen = [len(w) for w in self.muster]
+        self.automat = len(self.suchbegriffe) > self.direktsuche_bis
+        if self.automat:
+            self._automat_bauen()
+
+    def _automat_bauen(self):
+        goto = [{}]
+        ausgabe = [[]]
+        for idx, wort in enumerate(self.muster):
+            knoten = 0
+            for c in wort:
+                weiter = goto[knoten].get(c)
+                if weiter is None:
+                    weiter = len(goto)
+                    goto[knoten][c] = weiter
+                    goto.append({})
+                    ausgabe.append([])
+                knoten = weiter
+            if wort:
+                ausgabe[knoten].append(idx)
+
+        # Breitensuche: Fehlerkante bestimmen, Ausgaben und Übergänge des Fehlerknotens übernehmen
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        warteschlange = list(goto[0].values())
+        for knoten in warteschlange:
+            for c, kind in goto[knoten].items():
+                if knoten:
+                    fail[kind] = delta[fail[knoten]].get(c, 0)
+                warteschlange.append(kind)
+            ausgabe[knoten] = ausgabe[knoten] + ausgabe[fail[knoten]]
+            delta[knoten] = {**delta[fail[knoten]], **goto[knoten]}
+
+        self.delta = delta
+        self.ausgabe = ausgabe
+
+    def finde(self, zeile: str) -> list:
+        """Liefert alle Fundstellen als [(start, ende, index_des_begriffs), ...]."""
+        zeile_lc = kleinschreibung(zeile)
+        funde = []
+
+        if not self.automat:
+            for idx, wort in enumerate(self.muster):
+                if not wort:
+                    continue
+                pos = zeile_lc.find(wort)
+                while pos >= 0:
+                    funde.append((pos, pos + len(wort), idx))
+                    pos = zeile_lc.find(wort, pos + 1)
+            return funde
+
+        delta, ausgabe, laengen = self.delta, self.ausgabe, self.laengen
+        knoten = 0
+        for i, c in enumerate(zeile_lc):
+            knoten = delta[knoten].get(c, 0)
+            if ausgabe[knoten]:
+                for idx in ausgabe[knoten]:
+                    funde.append((i + 1 - laengen[idx], i + 1, idx))
+        return funde
+
+    def begriffe(self, funde) -> list:
+        # getroffene Begriffe in der Reihenfolge der Suchbegriffe (wie ist_treffer)
+        return [self.suchbegriffe[i] for i in sorted({idx for _, _, idx in funde})]
+
+    def treffer(self, zeile: str) -> list:
+        if not self.automat:
+            zeile_lc = kleinschreibung(zeile)
+            return [wort for wort, muster in zip(self.suchbegriffe, self.muster) if muster and muster in zeile_lc]
+        return self.begriffe(self.finde(zeile))
+
+
 # ---------- Bild-Preprocessing ----------
-def preprocess_pillow(image_path, contrast=2.0, resize_width=2000):
+def preprocess_pillow(image_input, contrast=2.0, resize_width=2000):
     """
-    Optimierung mit Pillow:
+    Optimierung mit Pillow (Pfad oder PIL-Image):
     - Umwandeln in Graustufen
     - Kontrast erhöhen
     - Schärfen
     - Resize (Skalieren auf Zielbreite)
     - Binarisierung (Schwarz/Weiß)
     """
-    img = Image.open(image_path).convert("L")
+    if isinstance(image_input, Image.Image):
+        img = image_input.convert("L")
+    else:
+        img = Image.open(image_input).convert("L")
 
     # Kontrast erhöhen
     enhancer = ImageEnhance.Contrast(img)
@@ -76,3 +192,177 @@ def preprocess_opencv(image_input):
     img = cv2.morphologyEx(img, cv2.MORPH_OPEN, kernel)
 
     return Image.fromarray(img)
+
+
+# ---------- Preprocessing-Pipeline (NumPy/OpenCV, ein Array von Anfang bis Ende) ----------
+# Stufen je Optimierungsmodus; die Namen entsprechen den bisherigen Modi in der GUI
+preprocessing_pipelines = {
+    "pillow": ["kontrast", "schaerfen", "skalieren", "schwelle"],
+    "opencv": ["median", "otsu"],
+    "kombiniert": ["kontrast", "schaerfen", "skalieren", "schwelle", "median", "otsu"],
+}
+
+preprocessing_parameter = {
+    "kontrast": 2.0,      # Faktor wie ImageEnhance.Contrast
+    "zielbreite": 2000,   # kleinere Seiten werden auf diese Breite vergrößert, größere nie verkleinert
+    "schwelle": 128,
+}
+
+# Schärfekern von ImageFilter.SHARPEN
+_schaerfe_kern = np.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32) / 16
+
+
+def _stufe_kontrast(img, p):
+    # Kontrast um den mittleren Grauwert strecken, per Lookup-Tabelle direkt im Array
+    mittel = int(cv2.mean(img)[0] + 0.5)
+    lut = np.clip(mittel + p["kontrast"] * (np.arange(256, dtype=np.float32) - mittel), 0, 255).astype(np.uint8)
+    cv2.LUT(img, lut, dst=img)
+    return img
+
+
+def _stufe_schaerfen(img, p):
+    cv2.filter2D(img, -1, _schaerfe_kern, dst=img, borderType=cv2.BORDER_REPLICATE)
+    return img
+
+
+def _stufe_skalieren(img, p):
+    hoehe, breite = img.shape[:2]
+    if breite >= p["zielbreite"]:
+        return img
+    faktor = p["zielbreite"] / float(breite)
+    return cv2.resize(img, (p["zielbreite"], int(hoehe * faktor)), interpolation=cv2.INTER_CUBIC)
+
+
+def _stufe_schwelle(img, p):
+    cv2.threshold(img, p["schwelle"], 255, cv2.THRESH_BINARY, dst=img)
+    return img
+
+
+def _stufe_median(img, p):
+    return cv2.medianBlur(img, 3)
+
+
+def _stufe_otsu(img, p):
+    cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=img)
+    return img
+
+
+preprocessing_stufen = {
+    "kontrast": _stufe_kontrast,
+    "schaerfen": _stufe_schaerfen,
+    "skalieren": _stufe_skalieren,
+    "schwelle": _stufe_schwelle,
+    "median": _stufe_median,
+    "otsu": _stufe_otsu,
+}
+
+
+def als_graustufen_array(image_input):
+    """Pfad, PIL-Image oder Array → beschreibbares uint8-Graustufen-Array (genau eine Kopie)."""
+    if isinstance(image_input, np.ndarray):
+        img = image_input
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+        elif not img.flags.writeable:
+            img = img.copy()
+    else:
+        if not isinstance(image_input, Image.Image):
+            image_input = Image.open(image_input)
+        img = np.array(image_input.convert("L"), dtype=np.uint8)
+    if img.size == 0:
+        raise ValueError("Bild ist leer oder konnte nicht gelesen werden.")
+    return img
+
+
+def preprocess_pipeline(image_input, optimierung=None, stufen=None, parameter=None, zeiten=None):
+    """
+    Vorverarbeitung auf einem einzigen Graustufen-Array:
+    - Stufen über den Optimierungsnamen ("pillow", "opencv", "kombiniert") oder direkt als Liste
+    - Stufen arbeiten wo möglich in-place, ohne Umweg über PIL
+    - zeiten (dict) sammelt die Dauer je Stufe in Sekunden
+    """
+    if stufen is None:
+        stufen = preprocessing_pipelines.get(optimierung, [])
+    p = dict(preprocessing_parameter, **(parameter or {}))
+
+    start = time.perf_counter()
+    img = als_graustufen_array(image_input)
+    if zeiten is not None:
+        zeiten["graustufen"] = zeiten.get("graustufen", 0.0) + time.perf_counter() - start
+
+    for stufe in stufen:
+        start = time.perf_counter()
+        img = preprocessing_stufen[stufe](img, p)
+        if zeiten is not None:
+            zeiten[stufe] = zeiten.get(stufe, 0.0) + time.perf_counter() - start
+    return img
+
+
+# ---------- Leerseiten vor der OCR erkennen ----------
+def seite_ohne_text(bild, max_tinte=leerseite_max_tinte, min_zeichen=leerseite_min_zeichen,
+                    kontrast=leerseite_kontrast, rand=0.06):
+    """
+    Schnelle Vorprüfung auf einer verkleinerten Graustufenkopie (ca. 600 px breit):
+    - Ränder abschneiden (Scannerkanten, Lochung, Schatten)
+    - Tinte: Pixel deutlich dunkler als der Papierton; Staub verschwindet beim Verkleinern
+    - zeichengroße zusammenhängende Flecken zählen; übersprungen wird nur eine Seite mit weniger als
+      min_zeichen davon, der Tintenanteil unterscheidet dann nur "leer" von "ohne_text"
+    Liefert "leer", "ohne_text" oder None (Seite geht zur OCR).
+    Kleine Bilder (Ausschnitte, Etiketten) gelten nur als leer, nie als "ohne_text".
+    """
+    if bild.mode not in ("L", "RGB"):
+        bild = bild.convert("L")
+    faktor = max(1, bild.width // 600)
+    klein = bild.reduce(faktor) if faktor > 1 else bild
+    img = np.asarray(klein.convert("L"))
+    hoehe, breite = img.shape
+    img = img[int(hoehe * rand):hoehe - int(hoehe * rand), int(breite * rand):breite - int(breite * rand)]
+    if img.size == 0:
+        return "leer"
+
+    papier = float(np.percentile(img, 95))
+    tinte = img < papier - kontrast
+    _, _, stats, _ = cv2.connectedComponentsWithStats(tinte.view(np.uint8), connectivity=8)
+    flaeche, b, h = stats[1:, cv2.CC_STAT_AREA], stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT]
+    # Staubkörner bleiben nach dem Verkleinern unter 3 Pixeln, Zeichen ab etwa 6 pt nicht
+    zeichen = (flaeche >= 3) & (h >= 2) & (h <= img.shape[0] * 0.05) & (b <= img.shape[1] * 0.25)
+    if int(zeichen.sum()) >= min_zeichen:
+        return None
+    if tinte.mean() < max_tinte:
+        return "leer"
+    if max(bild.width, bild.height) >= 1000:
+        return "ohne_text"
+    return None
+
+
+# ---------- Adaptive Auflösung: Schriftgröße und Textbereich aus einer Vorschau ----------
+def textbereich_schaetzen(vorschau, min_zeichen=5):
+    """
+    Schätzt auf einer Vorschau (PIL-Image, niedrige Auflösung):
+    - die mittlere Zeichenhöhe in Pixeln (Median der zeichengroßen Flecken)
+    - den Rahmen (x0, y0, x1, y1) um alle Zeichen, mit zwei Zeichenhöhen Rand
+    Liefert (rahmen, zeichenhoehe) oder None, wenn kein Text erkennbar ist.
+    """
+    img = np.asarray(vorschau.convert("L"))
+    _, binaer = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binaer, connectivity=8)
+    stats = stats[1:]
+    b, h = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+    # Rahmenlinien, Bilder und Scannerkanten sind größer, Staub kleiner als Zeichen
+    zeichen = (stats[:, cv2.CC_STAT_AREA] >= 3) & (h >= 2) & (h <= img.shape[0] * 0.05) & (b <= img.shape[1] * 0.25)
+    if int(zeichen.sum()) < min_zeichen:
+        return None
+    stats, hoehe = stats[zeichen], float(np.median(h[zeichen]))
+    rand = int(2 * hoehe)
+    x0 = max(0, int(stats[:, cv2.CC_STAT_LEFT].min()) - rand)
+    y0 = max(0, int(stats[:, cv2.CC_STAT_TOP].min()) - rand)
+    x1 = min(img.shape[1], int((stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH]).max()) + rand)
+    y1 = min(img.shape[0], int((stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT]).max()) + rand)
+    return (x0, y0, x1, y1), hoehe
+
+
+def ziel_dpi(zeichenhoehe, vorschau_dpi=adaptiv_vorschau_dpi):
+    # Auflösung, bei der die Zeichen etwa adaptiv_zeichenhoehe Pixel hoch sind (in 25-dpi-Schritten)
+    dpi = round(vorschau_dpi * adaptiv_zeichenhoehe / max(zeichenhoehe, 1) / 25) * 25
+    unten, oben = adaptiv_dpi_grenzen
+    return int(min(max(dpi, unten), oben))
@@ -0,0 +1,271 @@
+# warteschlange.py
+import io
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from ocr_woerter import SeitenWoerter
+
+lease_dauer = 600  # Sekunden, die ein Worker eine Seite behalten darf, bevor sie neu vergeben wird
+max_versuche = 3  # so oft wird eine Seite nach abgelaufenem Lease erneut vergeben, dann gilt sie als Fehler
+worker_frist = 120  # Sekunden ohne Lebenszeichen eines Workers, nach denen der Koordinator aufgibt
+
+
+# ---------- Übertragung der Seiten ----------
+def seite_als_bytes(quelle):
+    """
+    Seite für einen anderen Rechner verpacken: Bilddateien unverändert, gerasterte Seiten als PNG
+    (schnelle Kompression; das Raster wird nur einmal übertragen).
+    """
+    if isinstance(quelle, str):
+        with open(quelle, "rb") as f:
+            return f.read()
+    puffer = io.BytesIO()
+    quelle.save(puffer, format="PNG", compress_level=1)
+    return puffer.getvalue()
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ---------- Warteschlange in einer SQLite-Datei (gemeinsames Laufwerk) ----------
+class SQLiteWarteschlange:
+    """
+    Seitenaufträge in einer SQLite-Datei, die Koordinator und Worker-Knoten gemeinsam öffnen.
+    - der Koordinator (starte_ocr mit warteschlange=...) stellt Seiten ein und holt die Ergebnisse ab
+    - Worker leasen je eine Seite für lease_s Sekunden; läuft das Lease ab (Worker abgestürzt),
+      wird die Seite neu vergeben, nach max_versuche Vergaben gilt sie als fehlgeschlagen
+    - Worker melden sich bei jedem Leasen; aktiv() sagt dem Koordinator, ob noch jemand arbeitet
+    - Rollback-Journal statt WAL: WAL braucht gemeinsamen Speicher und funktioniert nicht über Netzlaufwerke
+    """
+
+    def __init__(self, pfad, lease_s=lease_dauer, vorrat=32, abfrage_intervall=0.2, worker_frist=worker_frist):
+        self.pfad = pfad
+        self.lease_s = lease_s
+        self.worker_frist = worker_frist
+        self.vorrat = vorrat  # höchstens so viele Seiten eines Laufs gleichzeitig eingestellt
+        self.abfrage_intervall = abfrage_intervall
+        self.beschreibung = f"SQLite-Warteschlange {pfad}"
+        ordner = os.path.dirname(os.path.abspath(pfad))
+        os.makedirs(ordner, exist_ok=True)
+        # isolation_level=None: Transaktionen explizit, damit das Leasen atomar bleibt
+        self.conn = sqlite3.connect(pfad, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS auftraege (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lauf TEXT NOT NULL,
+                name TEXT NOT NULL,
+                parameter TEXT NOT NULL,
+                bild BLOB,
+                status TEXT NOT NULL DEFAULT 'offen',
+                worker TEXT,
+                frist REAL,
+                versuche INTEGER NOT NULL DEFAULT 0,
+                text TEXT,
+                woerter BLOB,
+                fehler TEXT,
+                zeiten TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS auftraege_status ON auftraege (status, id)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS worker (name TEXT PRIMARY KEY, zuletzt REAL NOT NULL)")
+
+    def einstellen(self, lauf, name, bild, parameter):
+        cur = self.conn.execute("INSERT INTO auftraege (lauf, name, parameter, bild) VALUES (?, ?, ?, ?)",
+                                (lauf, name, json.dumps(parameter), bild))
+        return cur.lastrowid
+
+    def leasen(self, worker):
+        """Nächste offene (oder verwaiste) Seite als (id, name, bild, parameter) oder None."""
+        jetzt = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO worker VALUES (?, ?)", (worker, jetzt))
+            while True:
+                zeile = self.conn.execute(
+                    "SELECT id, name, bild, parameter, versuche FROM auftraege "
+                    "WHERE status='offen' OR (status='vergeben' AND frist < ?) ORDER BY id LIMIT 1", (jetzt,)
+                ).fetchone()
+                if zeile is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                auftrag, name, bild, parameter, versuche = zeile
+                if versuche >= max_versuche:
+                    self.conn.execute(
+                        "UPDATE auftraege SET status='fertig', bild=NULL, zeiten='{}', fehler=? WHERE id=?",
+                        (f"[!] OCR fehlgeschlagen für {name}: nach {versuche} Versuchen kein Ergebnis "
+                         "(Worker abgestürzt?)", auftrag))
+                    continue
+                self.conn.execute(
+                    "UPDATE auftraege SET status='vergeben', worker=?, frist=?, versuche=versuche+1 WHERE id=?",
+                    (worker, jetzt + self.lease_s, auftrag))
+                self.conn.execute("COMMIT")
+                return auftrag, name, bild, json.loads(parameter)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def abliefern(self, auftrag, text, woerter, fehler, zeiten):
+        # kommt ein neu vergebenes Lease doppelt zurück, zählt das erste Ergebnis
+        self.conn.execute(
+            "UPDATE auftraege SET status='fertig', bild=NULL, text=?, woerter=?, fehler=?, zeiten=? "
+            "WHERE id=? AND status!='fertig'",
+            (text, woerter.als_bytes() if woerter is not None else None, fehler, json.dumps(zeiten), auftrag))
+
+    def ergebnis(self, auftrag):
+        """(text, woerter, fehler, zeiten) einer fertigen Seite oder None; der Auftrag wird dabei entfernt."""
+        zeile = self.conn.execute(
+            "SELECT text, woerter, fehler, zeiten FROM auftraege WHERE id=? AND status='fertig'", (auftrag,)
+        ).fetchone()
+        if zeile is None:
+            return None
+        self.conn.execute("DELETE FROM auftraege WHERE id=?", (auftrag,))
+        text, woerter, fehler, zeiten = zeile
+        if woerter is not None:
+            woerter = SeitenWoerter.aus_bytes(text, woerter)
+        return text, woerter, fehler, json.loads(zeiten)
+
+    def aktiv(self, frist):
+        """Hat sich in den letzten frist Sekunden ein Worker gemeldet oder ist eine Seite in Arbeit?"""
+        jetzt = time.time()
+        self.conn.execute("DELETE FROM worker WHERE zuletzt < ?", (jetzt - 86400,))  # alte Prozesse vergessen
+        zeile = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM worker WHERE zuletzt > ?) "
+            "+ (SELECT COUNT(*) FROM auftraege WHERE status='vergeben' AND frist > ?)", (jetzt - frist, jetzt)
+        ).fetchone()
+        return zeile[0] > 0
+
+    def lauf_entfernen(self, lauf):
+        # nicht abgeholte Seiten eines beendeten oder abgebrochenen Laufs
+        self.conn.execute("DELETE FROM auftraege WHERE lauf=?", (lauf,))
+
+    def schliessen(self):
+        self.conn.close()
+
+
+# ---------- Warteschlange im Speicher (Tests, ein Rechner) ----------
+class SpeicherWarteschlange:
+    """
+    Gleiche Schnittstelle wie SQLiteWarteschlange, aber im Speicher eines Prozesses:
+    zum Testen und für Worker-Threads (warteschlange_abarbeiten in threading.Thread).
+    """
+
+    def __init__(self, lease_s=lease_dauer, vorrat=32, abfrage_intervall=0.05, worker_frist=worker_frist):
+        self.lease_s = lease_s
+        self.worker_frist = worker_frist
+        self.worker = {}  # name -> letztes Leasen
+        self.vorrat = vorrat
+        self.abfrage_intervall = abfrage_intervall
+        self.beschreibung = "Warteschlange im Speicher"
+        self.auftraege = {}  # id -> dict
+        self.naechste_id = 1
+        self.sperre = threading.Lock()
+
+    def einstellen(self, lauf, name, bild, parameter):
+        with self.sperre:
+            auftrag = self.naechste_id
+            self.naechste_id += 1
+            self.auftraege[auftrag] = {"lauf": lauf, "name": name, "bild": bild, "parameter": parameter,
+                                       "status": "offen", "frist": None, "versuche": 0}
+            return auftrag
+
+    def leasen(self, worker):
+        jetzt = time.time()
+        with self.sperre:
+            self.worker[worker] = jetzt
+            for auftrag, a in sorted(self.auftraege.items()):
+                if a["status"] == "offen" or (a["status"] == "vergeben" and a["frist"] < jetzt):
+                    if a["versuche"] >= max_versuche:
+                        a.update(status="fertig", bild=None, ergebnis=(
+                            None, None, f"[!] OCR fehlgeschlagen für {a['name']}: nach {a['versuche']} "
+                                        "Versuchen kein Ergebnis (Worker abgestürzt?)", {}))
+                        continue
+                    a.update(status="vergeben", worker=worker, frist=jetzt + self.lease_s, versuche=a["versuche"] + 1)
+                    return auftrag, a["name"], a["bild"], a["parameter"]
+        return None
+
+    def abliefern(self, auftrag, text, woerter, fehler, zeiten):
+        with self.sperre:
+            a = self.auftraege.get(auftrag)
+            if a and a["status"] != "fertig":
+                a.update(status="fertig", bild=None, ergebnis=(text, woerter, fehler, zeiten))
+
+    def ergebnis(self, auftrag):
+        with self.sperre:
+            a = self.auftraege.get(auftrag)
+            if a is None or a["status"] != "fertig":
+                return None
+            del self.auftraege[auftrag]
+            return a["ergebnis"]
+
+    def aktiv(self, frist):
+        jetzt = time.time()
+        with self.sperre:
+            return (any(zuletzt > jetzt - frist for zuletzt in self.worker.values())
+                    or any(a["status"] == "vergeben" and a["frist"] > jetzt for a in self.auftraege.values()))
+
+    def lauf_entfernen(self, lauf):
+        with self.sperre:
+            for auftrag in [i for i, a in self.auftraege.items() if a["lauf"] == lauf]:
+                del self.auftraege[auftrag]
+
+    def schliessen(self):
+        pass
+
+
+# ---------- Worker-Knoten ----------
+def warteschlange_abarbeiten(warteschlange, name=None, abbrechen_flag=None, leerlauf_ende=None):
+    """
+    Leased Seiten aus der Warteschlange, erkennt sie mit ocr_seite und liefert die Ergebnisse ab,
+    bis abbrechen_flag() wahr wird (oder nach leerlauf_ende Sekunden ohne Auftrag).
+    Gibt die Anzahl erkannter Seiten zurück.
+    """
+    from ocr_engine import bild_laden, ocr_seite
+
+    name = name or worker_name()
+    erledigt = 0
+    leerlauf_seit = time.monotonic()
+    while not (abbrechen_flag and abbrechen_flag()):
+        auftrag = warteschlange.leasen(name)
+        if auftrag is None:
+            if leerlauf_ende is not None and time.monotonic() - leerlauf_seit > leerlauf_ende:
+                break
+            time.sleep(max(warteschlange.abfrage_intervall, 0.5))
+            continue
+        auftrag, seitenname, bild, parameter = auftrag
+        parameter = dict(parameter)
+        rahmen = parameter.pop("rahmen", None)
+        try:
+            quelle = bild_laden(io.BytesIO(bild))
+            if rahmen:
+                quelle.info["rahmen"] = tuple(rahmen)  # adaptiv gerastert, siehe bild_optimieren
+        except Exception as e:
+            warteschlange.abliefern(auftrag, None, None, f"[!] Seite konnte nicht gelesen werden: {seitenname}: {e}", {})
+            continue
+        try:
+            text, woerter, fehler, zeiten = ocr_seite(quelle, name=seitenname, **parameter)
+        except Exception as e:
+            # z. B. Tesseract fehlt: als Seitenfehler abliefern, statt das Lease verfallen zu lassen
+            text, woerter, fehler, zeiten = None, None, f"[!] OCR fehlgeschlagen für {seitenname}: {e}", {}
+            print(fehler)
+        warteschlange.abliefern(auftrag, text, woerter, fehler, zeiten)
+        erledigt += 1
+        leerlauf_seit = time.monotonic()
+    return erledigt
+
+
+def worker_prozess(pfad, stopp, leerlauf_ende=None):
+    # Einstieg für multiprocessing.Process: eigene Verbindung je Prozess, Ende über stopp (Event)
+    from ocr_engine import ocr_worker_init
+
+    ocr_worker_init()
+    warteschlange = SQLiteWarteschlange(pfad)
+    try:
+        warteschlange_abarbeiten(warteschlange, abbrechen_flag=stopp.is_set, leerlauf_ende=leerlauf_ende)
+    finally:
+        warteschlange.schliessen()